@@ -0,0 +1,50 @@
+"""
+bench_batch.py:
+- batch evaluation throughput: in-process vs process pool at several worker counts
+- run from repo root: python benchmarks/bench_batch.py [numExpressions]
+"""
+
+from pathlib import Path
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from batch import evaluateExpressions, evaluateExpressionsParallel
+
+
+def buildExpressions(numExpressions, seed = 0):
+    """ Yields (lineNumber, expression) pairs: distinct random chains, so the expression cache doesn't hide the work. """
+
+    rng = random.Random(seed)
+    for lineNumber in range(1, numExpressions + 1):
+        terms = [str(rng.randint(1, 9999)) for _ in range(rng.randint(2, 12))]
+        yield lineNumber, ''.join(term + rng.choice('+-*/') for term in terms[:-1]) + terms[-1]
+
+
+def timeRun(records):
+    """ Drains a record generator, returning (elapsed seconds, record count). """
+
+    start = time.perf_counter()
+    count = sum(1 for _ in records)
+    return time.perf_counter() - start, count
+
+
+def main():
+    """ """
+
+    numExpressions = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    elapsed, count = timeRun(evaluateExpressions(buildExpressions(numExpressions)))
+    baseline = count / elapsed
+    print(f'{"in-process":>12}: {baseline:>10,.0f} expressions/s')
+
+    for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        elapsed, count = timeRun(evaluateExpressionsParallel(buildExpressions(numExpressions), workers = workers, chunkSize = 2000))
+        rate = count / elapsed
+        print(f'{workers:>4} workers: {rate:>10,.0f} expressions/s ({rate / baseline:.2f}x in-process)')
+
+
+if __name__ == '__main__':
+    main()
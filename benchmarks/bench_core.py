@@ -0,0 +1,61 @@
+"""
+bench_core.py:
+- key-event throughput of the headless CalculatorCore (no display needed)
+- run from repo root: python benchmarks/bench_core.py
+"""
+
+from pathlib import Path
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core import CalculatorCore
+
+
+def buildSession(numEvents, seed = 0):
+    """ Builds a scripted session of (method name, argument) key events: short numbers joined by operators, '=' now and then. """
+
+    rng = random.Random(seed)
+    events = []
+    while len(events) < numEvents:
+        for _ in range(rng.randint(1, 6)):
+            events.append(('pressDigit', rng.choice('0123456789')))
+        events.append(('pressOp', '=' if rng.random() < 0.15 else rng.choice('+-*/')))
+        if rng.random() < 0.05:
+            events.append(('clearAll', None))
+    return events[:numEvents]
+
+
+def runSession(events, livePreview):
+    """ Replays events through a fresh core, printing throughput. """
+
+    core = CalculatorCore(livePreview = livePreview)
+    notifications = []
+    core.subscribe(notifications.append)
+
+    # resolve bound methods up front: measure the core, not attribute lookups
+    calls = [(getattr(core, name), argument) for name, argument in events]
+    start = time.perf_counter()
+    for method, argument in calls:
+        if argument is None:
+            method()
+        else:
+            method(argument)
+    elapsed = time.perf_counter() - start
+
+    print(f'livePreview={livePreview}: {len(events)} events in {elapsed:.3f}s: {len(events) / elapsed:,.0f} events/s '
+          f'({elapsed / len(events) * 1e6:.2f}us/event, {len(notifications)} subscriber notifications)')
+
+
+def main():
+    """ """
+
+    events = buildSession(200000)
+    runSession(events, livePreview = False)
+    runSession(events, livePreview = True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+bench_display.py:
+- Tk display updates saved by the Calculator's DisplayModel (coalescing per event-loop tick + skipping unchanged text)
+- replays a scripted key session through the headless core into a DisplayModel w/ stand-in StringVars (no display needed)
+- run from repo root: python benchmarks/bench_display.py
+"""
+
+from pathlib import Path
+import random
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_core import buildSession
+from calculator import DisplayModel
+from core import CalculatorCore
+
+
+class CountingVar():
+    """ Stand-in for a Tk StringVar: counts set() calls. """
+
+    def __init__(self, value = ''):
+        """ """
+        self.value = value
+        self.sets = 0
+
+    def get(self):
+        """ """
+        return self.value
+
+    def set(self, value):
+        """ """
+        self.value = value
+        self.sets += 1
+
+
+class IdleQueue():
+    """ Stand-in for Tk's idle queue: callbacks run when the test 'ends a tick'. """
+
+    def __init__(self):
+        """ """
+        self.callbacks = []
+
+    def after_idle(self, callback):
+        """ """
+        self.callbacks.append(callback)
+        return len(self.callbacks)
+
+    def runIdle(self):
+        """ """
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+def main(numEvents = 100000, maxEventsPerTick = 1, seed = 0):
+    """ Replays events, ending an event-loop tick after every 1..maxEventsPerTick events. """
+
+    idleQueue = IdleQueue()
+    stringVars = {'input': CountingVar('0'), 'operation': CountingVar(), 'preview': CountingVar()}
+    displayModel = DisplayModel(idleQueue, stringVars)
+
+    def onCoreStateChange(core): # same as Calculator.onCoreStateChange
+        displayModel.update('input', core.inputDisplay)
+        displayModel.update('operation', core.operationDisplay)
+        displayModel.update('preview', core.previewDisplay)
+
+    core = CalculatorCore()
+    core.subscribe(onCoreStateChange)
+
+    rng = random.Random(seed)
+    untilTick = rng.randint(1, maxEventsPerTick)
+    for name, argument in buildSession(numEvents, seed):
+        method = getattr(core, name)
+        method() if argument is None else method(argument)
+        untilTick -= 1
+        if not untilTick:
+            idleQueue.runIdle()
+            untilTick = rng.randint(1, maxEventsPerTick)
+    idleQueue.runIdle()
+
+    stats = displayModel.stats()
+    print(f'{numEvents} events, up to {maxEventsPerTick} per tick: {stats["requested"]} updates requested, '
+          f'{stats["tkUpdates"]} StringVar sets, {stats["saved"]} saved ({stats["saved"] / max(1, stats["requested"]):.0%}), '
+          f'{stats["commits"]} commits')
+
+
+if __name__ == '__main__':
+    main(maxEventsPerTick = 1)
+    main(maxEventsPerTick = 4) # e.g. key repeat / replayed input
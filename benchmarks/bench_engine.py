@@ -0,0 +1,62 @@
+"""
+bench_engine.py:
+- compares engine.py against simpleeval.simple_eval on long chained expressions
+- run from repo root: python benchmarks/bench_engine.py
+"""
+
+from pathlib import Path
+import random
+import sys
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from engine import compileExpression, defaultCache, evaluateCompiled, evaluateExpression
+
+try:
+    from simpleeval import simple_eval
+except ImportError:
+    simple_eval = None
+
+
+def buildChain(numTerms, seed = 0):
+    """ Builds a chained operation string like the ones mathPressed joins, e.g. '12+3.5*7-...'. """
+
+    rng = random.Random(seed)
+    parts = [str(rng.randint(1, 999))]
+    for _ in range(numTerms - 1):
+        parts.append(rng.choice('+-*/'))
+        parts.append(str(rng.randint(1, 999)) if rng.random() < 0.7 else f'{rng.uniform(1, 999):.3f}')
+    return ''.join(parts)
+
+
+def main():
+    """ """
+
+    print(f'{"terms":>6} {"engine (cold)":>15} {"compiled only":>15} {"cache hit":>11} {"simple_eval":>12} {"speedup":>8}')
+    for numTerms in (10, 50, 90, 300):
+        expression = buildChain(numTerms)
+        repeat = max(20, 20000 // numTerms)
+
+        def engineCold():
+            defaultCache.clear()
+            evaluateExpression(expression)
+
+        compiled = compileExpression(expression)
+        engineColdTime = min(timeit.repeat(engineCold, number = repeat, repeat = 5)) / repeat
+        compiledTime = min(timeit.repeat(lambda: evaluateCompiled(compiled), number = repeat, repeat = 5)) / repeat
+        cacheHitTime = min(timeit.repeat(lambda: evaluateExpression(expression), number = repeat, repeat = 5)) / repeat
+
+        if simple_eval:
+            simpleTime = min(timeit.repeat(lambda: simple_eval(expression), number = repeat, repeat = 5)) / repeat
+            simpleStr, speedupStr = f'{simpleTime * 1e6:10.1f}us', f'{simpleTime / engineColdTime:7.1f}x'
+        else:
+            simpleStr, speedupStr = f'{"n/a":>12}', f'{"n/a":>8}'
+
+        print(f'{numTerms:>6} {engineColdTime * 1e6:13.1f}us {compiledTime * 1e6:13.1f}us {cacheHitTime * 1e6:9.1f}us {simpleStr} {speedupStr}')
+
+    print(f'cache: {defaultCache.stats()}')
+
+
+if __name__ == '__main__':
+    main()
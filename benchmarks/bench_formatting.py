@@ -0,0 +1,85 @@
+"""
+bench_formatting.py:
+- result display formatting (getResultDisplayStr) per value kind: cold (memo cleared each call) vs memoized (repeated value),
+  next to the previous Decimal / '%E'-string approach, kept here as a reference
+- huge ints: formatting time vs digit count (sci notation from leading digits; no decimal string is built)
+- run from repo root: python benchmarks/bench_formatting.py
+"""
+
+from pathlib import Path
+import sys
+import time
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from formatting import formatResult, formatResultCached, getResultDisplayStr
+
+
+VALUES = {
+    'short int': [7, 123456, -98765],
+    'long int': [9876543210, -12345678901, 10**15 + 7],
+    'short float': [0.5, -2.25, 3.125],
+    'long float': [3.14159265358979, 123456.789012, 6.02214076e23, 1 / 3],
+    'tiny float': [-2.5e-3, 1.5e-300, 0.000123456789],
+    'int > float range': [3**700, -(7**400)],
+}
+
+
+def referenceResultDisplayStr(currentResult):
+    """ The previous formatter: decimal strings, Decimal + '%E' conversions, exponent re-parsed from strings. """
+
+    from decimal import Decimal
+
+    if isinstance(currentResult, float) and currentResult.is_integer():
+        currentResult = int(currentResult)
+    maxDigits = 8 if currentResult < 0 else 9
+    if len(str(currentResult)) <= maxDigits:
+        return str(currentResult)
+    sciNotation = '%E' % Decimal(f'{currentResult}')
+    exponentSign, exponentValue = sciNotation.split('E')[1][0], sciNotation.split('E')[1][1:]
+    if exponentValue == '00' or (exponentSign == '-' and exponentValue[1] < '4'):
+        allowedDigits = maxDigits - len(str(int(currentResult)))
+        return '{:.{precision}f}'.format(currentResult, precision = allowedDigits).rstrip('0')
+    valueStr = str(currentResult)
+    allowedDigits = maxDigits - (2 if isinstance(currentResult, float) else 3) - len(str(len(valueStr) - 1))
+    sciNotation = f'{Decimal(valueStr):.{allowedDigits}E}'
+    significand = sciNotation.split('E')[0].rstrip('0').rstrip('.')
+    return significand + 'e' + sciNotation.split('E')[1]
+
+
+def timePerValue(function, values, repeats = 5):
+    """ Returns the best mean microseconds per value over repeats (None if function fails on any of them). """
+
+    try:
+        for value in values:
+            function(value)
+    except Exception:
+        return None
+    loops = 2000
+    run = lambda: [function(value) for value in values]
+    return min(timeit.repeat(run, number = loops, repeat = repeats)) / loops / len(values) * 1e6
+
+
+def main():
+    """ """
+
+    def cold(value):
+        formatResultCached.cache_clear()
+        return getResultDisplayStr(value)
+
+    print(f'{"values":<20} {"previous":>10} {"cold":>10} {"memoized":>10}  (us/value)')
+    for kind, values in VALUES.items():
+        timings = [timePerValue(function, values) for function in (referenceResultDisplayStr, cold, getResultDisplayStr)]
+        print(f'{kind:<20} ' + ' '.join(f'{timing:10.2f}' if timing is not None else f'{"fails":>10}' for timing in timings))
+
+    print('\nhuge ints (sci notation from leading digits):')
+    for exponent in (2000, 20000, 200000, 2000000): # 3**exponent: ~0.48 * exponent digits
+        value = 3**exponent
+        start = time.perf_counter()
+        displayStr = formatResult(value)
+        print(f'  3**{exponent:<8} {(time.perf_counter() - start) * 1e3:8.2f} ms  -> {displayStr}')
+
+
+if __name__ == '__main__':
+    main()
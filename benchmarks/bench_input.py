@@ -0,0 +1,50 @@
+"""
+bench_input.py:
+- per-keystroke cost of number entry vs the length of the number being typed (headless core, no display needed)
+- each keystroke types + backspaces a digit at the end of an n-digit number, w/ live preview on
+- integers longer than Python's int -> str digit limit get no live preview (the engine can't parse them), so those rows
+  are labeled: they skip the preview rather than showing its cost
+- run from repo root: python benchmarks/bench_input.py
+"""
+
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core import CalculatorCore
+
+
+def timeKeystrokes(numDigits, fractional, repeats = 1000):
+    """ Returns mean microseconds per keystroke while editing the end of a numDigits-long number. """
+
+    core = CalculatorCore()
+    core.numberPressed('1')
+    core.mathPressed('+')
+    if fractional:
+        core.numberPressed('0')
+        core.numberPressed('.')
+    for index in range(numDigits):
+        core.numberPressed(str(index % 9 + 1))
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        core.numberPressed('7')
+        core.clearLast()
+    return (time.perf_counter() - start) / (2 * repeats) * 1e6
+
+
+def main():
+    """ """
+
+    intDigitsLimit = sys.get_int_max_str_digits()
+    for fractional in (False, True):
+        print('fractional (0.123...)' if fractional else 'integer (123...)')
+        for numDigits in (10, 100, 800, 2000, 4000, 10000):
+            note = '  (no preview: past the int digit limit)' if not fractional and intDigitsLimit and numDigits > intDigitsLimit else ''
+            print(f'  {numDigits:>6} digits: {timeKeystrokes(numDigits, fractional):7.1f} us/keystroke{note}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+bench_modes.py:
+- mode-switch cost of the Tk Calculator view: first show (finishing the staged build) vs. pooled re-show,
+  + memory growth over repeated switching
+- needs a display; run from repo root (image paths are relative): python benchmarks/bench_modes.py
+"""
+
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+import customtkinter as ctk
+
+from calculator import *
+
+
+def switchTo(root, calculator, mode):
+    """ Switches mode + flushes pending geometry/redraw work, returning elapsed ms. """
+
+    start = time.perf_counter()
+    calculator.showMode(mode)
+    root.update()
+    return (time.perf_counter() - start) * 1000
+
+
+def main(rounds = 50):
+    """ """
+
+    root = ctk.CTk()
+    root.geometry(f'{WINDOW_SIZE[0]}x{WINDOW_SIZE[1]}')
+    root.userSettings = {'defaultCalcMode': CalcMode.CM_STANDARD.value}
+    calculator = Calculator(root) # no update() yet: the staged build's idle steps would build every mode
+
+    modes = [CalcMode.CM_PROGRAMMING, CalcMode.CM_SCIENTIFIC, CalcMode.CM_STANDARD]
+    for mode in modes:
+        print(f'first show    {mode.value:<12} {switchTo(root, calculator, mode):8.2f} ms')
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    timings = sorted(switchTo(root, calculator, modes[i % len(modes)]) for i in range(rounds * len(modes)))
+    growth = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    print(f'pooled switch p50 {timings[len(timings) // 2]:.2f} ms, max {timings[-1]:.2f} ms ({len(timings)} switches)')
+    print(f'python heap growth over {len(timings)} switches: {growth / 1024:.1f} KiB')
+    root.destroy()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+bench_parentheses.py:
+- scaling of implicit-multiplication parsing on parenthesis-heavy operations
+- legacy two-pass parseParentheses (kept here for reference) vs engine.insertImplicitMultiplication
+- run from repo root: python benchmarks/bench_parentheses.py
+"""
+
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from engine import insertImplicitMultiplication
+
+
+def legacyParseParentheses(currentCumulativeOperation):
+    """ Former Calculator.parseParentheses: re-slices the whole string on every insertion (O(n^2)). """
+
+    outerIndex = 0
+    while outerIndex < 2:
+        isLeft = outerIndex
+        parenth = '(' if isLeft else ')'
+        parenthPosList = [pos for pos, char in enumerate(currentCumulativeOperation) if char is parenth]
+        parenthCount = len(parenthPosList)
+
+        for innerIndex, parenthPos in enumerate(parenthPosList):
+            if (parenthPos > 0):
+                if currentCumulativeOperation[parenthPos - 1].isnumeric():
+                    if (parenthPos != len(currentCumulativeOperation) - 1):
+                        if currentCumulativeOperation[parenthPos + 1].isnumeric():
+                            posAdjustment = 0 if isLeft else 1
+                            slice = parenthPos + posAdjustment
+                            currentCumulativeOperation = currentCumulativeOperation[:slice] + '*' + currentCumulativeOperation[slice:]
+                            if innerIndex != parenthCount:
+                                for eachIndex in range(0, parenthCount):
+                                        parenthPosList[eachIndex] += 1
+        outerIndex += 1
+
+    return currentCumulativeOperation
+
+
+def timeCall(function, argument):
+    """ Best-of-3 wall time of function(argument), in milliseconds. """
+
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        function(argument)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    """ """
+
+    print(f'{"parens":>7} {"chars":>8} {"legacy":>11} {"single-pass":>12} {"speedup":>9}')
+    for numGroups in (100, 500, 1000, 2000, 4000):
+        operation = '1' + '(2)3' * numGroups # each group adds a pair of implicit '*'s
+        legacyTime = timeCall(legacyParseParentheses, operation)
+        singlePassTime = timeCall(insertImplicitMultiplication, operation)
+        print(f'{numGroups * 2:>7} {len(operation):>8} {legacyTime:9.2f}ms {singlePassTime:10.2f}ms {legacyTime / singlePassTime:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+bench_startup.py:
+- reproducible GUI startup benchmark: launches the app N times (CALCAPP_STARTUP_BENCHMARK=1), each run sends itself
+  one key + exits, and reports median wall time from launch to window mapped / calculator interactive / first key handled
+- per-module import breakdown of app.py via -X importtime (needs no display)
+- --max-first-key-ms fails (exit code 1) when the median time to first handled key regresses past it
+- run from repo root: python benchmarks/bench_startup.py [--runs 5] [--imports-only] [--max-first-key-ms N]
+"""
+
+import argparse
+import os
+from pathlib import Path
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+
+ROOT = Path(__file__).resolve().parent.parent
+MILESTONES = ('imports done', 'window mapped', 'calculator interactive (display + digit pad)', 'all modes built', 'first key handled')
+MARK_PATTERN = re.compile(r'\[startup\]\s+([\d.]+) ms\s+(.*)')
+IMPORT_TIME_PATTERN = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def runOnce(timeout):
+    """ Launches the app once, returning {milestone: (wall ms since launch, in-app ms since app.py started)}. """
+
+    environment = dict(os.environ, CALCAPP_STARTUP_BENCHMARK = '1')
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, 'src/app.py'], cwd = ROOT, env = environment,
+                               stderr = subprocess.PIPE, stdout = subprocess.DEVNULL, text = True)
+    marks = {}
+    try:
+        for line in process.stderr:
+            match = MARK_PATTERN.match(line)
+            if match:
+                marks.setdefault(match.group(2).strip(), ((time.perf_counter() - start) * 1000, float(match.group(1))))
+            if time.perf_counter() - start > timeout:
+                break
+        process.wait(timeout = max(0.1, timeout - (time.perf_counter() - start)))
+    finally:
+        if process.poll() is None:
+            process.kill()
+    return marks
+
+
+def importBreakdown(top):
+    """ Prints the slowest imports when importing app.py (w/o starting the GUI). """
+
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd = ROOT / 'src',
+                            capture_output = True, text = True)
+    imports = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match:
+            selfTime, cumulativeTime, indent, module = match.groups()
+            imports.append((module, int(selfTime) / 1000, int(cumulativeTime) / 1000, len(indent)))
+    if not imports:
+        print(result.stderr.strip() or 'no import timing output')
+        return
+
+    # entries are listed children-first: app's subtree is everything after the previous top-level (interpreter startup) entry
+    appIndex = max(index for index, entry in enumerate(imports) if entry[0] == 'app')
+    subtreeStart = max((index + 1 for index, entry in enumerate(imports[:appIndex]) if entry[3] == imports[appIndex][3]), default = 0)
+    subtree = imports[subtreeStart:appIndex + 1]
+
+    print(f'import app: {imports[appIndex][2]:.1f} ms total')
+    print('direct imports of app, by cumulative time:')
+    directImports = [entry for entry in subtree if entry[3] == imports[appIndex][3] + 2]
+    for module, selfTime, cumulativeTime, _ in sorted(directImports, key = lambda entry: -entry[2])[:top]:
+        print(f'  {cumulativeTime:8.1f} ms  {module}')
+    print(f'top {top} modules by self time:')
+    for module, selfTime, cumulativeTime, _ in sorted(subtree, key = lambda entry: -entry[1])[:top]:
+        print(f'  {selfTime:8.1f} ms  {module}')
+
+
+def main():
+    """ """
+
+    parser = argparse.ArgumentParser(description = 'Measure GUI startup time + import costs.')
+    parser.add_argument('--runs', type = int, default = 5, help = 'GUI launches (default: 5)')
+    parser.add_argument('--timeout', type = float, default = 30.0, help = 'seconds per launch (default: 30)')
+    parser.add_argument('--top', type = int, default = 15, help = 'modules listed in the import breakdown (default: 15)')
+    parser.add_argument('--imports-only', action = 'store_true', help = 'only report the import breakdown (no display needed)')
+    parser.add_argument('--max-first-key-ms', type = float, help = 'exit w/ code 1 if median launch -> first key handled exceeds this')
+    args = parser.parse_args()
+
+    importBreakdown(args.top)
+    if args.imports_only:
+        return 0
+
+    runs = [runOnce(args.timeout) for _ in range(args.runs)]
+    print(f'\nmedian over {args.runs} launches (wall ms since launch / in-app ms since app.py started):')
+    for milestone in MILESTONES:
+        timings = [run[milestone] for run in runs if milestone in run]
+        if not timings:
+            print(f'  {milestone:<46} (not reached)')
+            continue
+        print(f'  {milestone:<46} {statistics.median(wall for wall, _ in timings):8.1f} / '
+              f'{statistics.median(inApp for _, inApp in timings):8.1f}  ({len(timings)}/{args.runs} runs)')
+
+    firstKey = [run['first key handled'][0] for run in runs if 'first key handled' in run]
+    if args.max_first_key_ms is not None:
+        if len(firstKey) < args.runs or statistics.median(firstKey) > args.max_first_key_ms:
+            print(f'FAIL: launch -> first key handled over {args.max_first_key_ms:.0f} ms (or not reached)')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
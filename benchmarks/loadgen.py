@@ -0,0 +1,103 @@
+"""
+loadgen.py: load generator for src/server.py
+- opens several connections, each pipelining a window of requests
+- reports requests/s and p50/p99 latency (send -> response)
+- run from repo root, w/ the server running: python benchmarks/loadgen.py [--requests N] [--connections C] [--window W]
+"""
+
+import argparse
+import asyncio
+from collections import deque
+import json
+import random
+import sys
+import time
+
+
+def buildExpressions(numRequests, repeatRatio, seed = 0):
+    """ Random operation strings; repeatRatio of them re-use an earlier expression (exercises server-side caching). """
+
+    rng = random.Random(seed)
+    expressions = []
+    for _ in range(numRequests):
+        if expressions and rng.random() < repeatRatio:
+            expressions.append(rng.choice(expressions))
+        else:
+            terms = [str(rng.randint(1, 9999)) for _ in range(rng.randint(2, 12))]
+            expressions.append(''.join(term + rng.choice('+-*/') for term in terms[:-1]) + terms[-1])
+    return expressions
+
+
+async def runConnection(args, expressions, latencies, errors):
+    """ Sends expressions over one connection, keeping up to args.window requests outstanding. """
+
+    if args.unix:
+        reader, writer = await asyncio.open_unix_connection(args.unix)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+
+    window = asyncio.Semaphore(args.window)
+    sendTimes = deque()
+
+    async def send():
+        for requestId, expression in enumerate(expressions):
+            await window.acquire()
+            sendTimes.append(time.perf_counter())
+            writer.write(json.dumps({'id': requestId, 'expression': expression, 'format': args.format}).encode() + b'\n')
+            await writer.drain()
+
+    async def receive():
+        for _ in expressions:
+            line = await reader.readline()
+            latencies.append(time.perf_counter() - sendTimes.popleft()) # responses arrive in request order
+            window.release()
+            if json.loads(line)['error'] is not None:
+                errors.append(line)
+
+    await asyncio.gather(send(), receive())
+    writer.close()
+    await writer.wait_closed()
+
+
+def percentile(sortedValues, fraction):
+    """ """
+
+    return sortedValues[min(len(sortedValues) - 1, int(fraction * len(sortedValues)))]
+
+
+async def run(args):
+    """ """
+
+    expressions = buildExpressions(args.requests, args.repeat)
+    perConnection = [expressions[index::args.connections] for index in range(args.connections)]
+    latencies, errors = [], []
+
+    start = time.perf_counter()
+    await asyncio.gather(*(runConnection(args, share, latencies, errors) for share in perConnection))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f'{len(latencies)} requests over {args.connections} connections (window {args.window}) in {elapsed:.2f}s')
+    print(f'throughput: {len(latencies) / elapsed:,.0f} requests/s')
+    print(f'latency: p50 {percentile(latencies, 0.50) * 1000:.2f}ms, p99 {percentile(latencies, 0.99) * 1000:.2f}ms, '
+          f'max {latencies[-1] * 1000:.2f}ms')
+    print(f'error responses: {len(errors)}')
+
+
+def main():
+    """ """
+
+    parser = argparse.ArgumentParser(description = 'Load generator for the calculator evaluation server.')
+    parser.add_argument('--host', default = '127.0.0.1')
+    parser.add_argument('--port', type = int, default = 8765)
+    parser.add_argument('--unix', help = 'connect to this Unix socket path instead of TCP')
+    parser.add_argument('--requests', type = int, default = 20000)
+    parser.add_argument('--connections', type = int, default = 4)
+    parser.add_argument('--window', type = int, default = 32, help = 'pipelined requests outstanding per connection')
+    parser.add_argument('--repeat', type = float, default = 0.5, help = 'fraction of repeated expressions (default: 0.5)')
+    parser.add_argument('--format', choices = ('raw', 'display', 'sci'), default = 'display')
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+replay_trace.py:
+- replays a recorded input trace (CALCAPP_TRACE_RECORD=path python src/app.py; see src/inputtrace.py) as fast as possible
+- headless (default): through a fresh CalculatorCore, no display needed; --tk: against the real app window
+  (launches src/app.py w/ CALCAPP_TRACE_REPLAY set; each event's timing includes display updates + redraw)
+- reports throughput, per-event latency (overall + per event type), and any divergence between the recorded and
+  replayed final display strings (exit code 1 if any)
+- background evaluations aren't rerun: their recorded outcomes (result, error, timeout) are fed back in place,
+  so cancelled / superseded / timed out evaluations replay as they happened
+- run from repo root: python benchmarks/replay_trace.py TRACE [--tk] [--repeat N] [--json]
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from core import CalculatorCore
+from inputtrace import DISPLAY_NAMES, REPLAY_REPORT_PREFIX, TRACE_REPLAY_ENV, ReplayBackend, getReplayReport, readTrace, replayEvents
+
+
+def replayHeadless(trace):
+    """ Replays trace through a fresh core (background evaluations completed by the trace's worker events); returns the report. """
+
+    core = CalculatorCore()
+    if trace.recordsEvaluations:
+        core.evaluationBackend = ReplayBackend()
+    latenciesNs = replayEvents(core, trace.events)
+    return getReplayReport(trace, latenciesNs, dict(zip(DISPLAY_NAMES, core.getDisplayState())))
+
+
+def replayTk(path, timeout):
+    """ Replays the trace at path in the app's window (subprocess); returns the report it prints. """
+
+    environment = dict(os.environ, **{TRACE_REPLAY_ENV: str(Path(path).resolve())})
+    result = subprocess.run([sys.executable, 'src/app.py'], cwd = ROOT, env = environment,
+                            capture_output = True, text = True, timeout = timeout)
+    for line in result.stdout.splitlines():
+        if line.startswith(REPLAY_REPORT_PREFIX):
+            return json.loads(line[len(REPLAY_REPORT_PREFIX):])
+    raise RuntimeError(f'app exited w/o a replay report (code {result.returncode}):\n{result.stderr.strip()}')
+
+
+def printReport(report, label):
+    """ """
+
+    latency = report['latencyUs']
+    print(f'{label}: {report["events"]} events in {report["seconds"]:.3f}s: {report["eventsPerSecond"]:,.0f} events/s '
+          f'(recorded session: {report["recordedSeconds"]:.1f}s)')
+    print(f'  latency us: mean {latency["mean"]:.1f}, p50 {latency["p50"]:.1f}, p90 {latency["p90"]:.1f}, '
+          f'p99 {latency["p99"]:.1f}, max {latency["max"]:.1f}')
+    print(f'  {"event":<18} {"count":>7} {"mean us":>9} {"p99 us":>9}')
+    for name, stats in report['byEvent'].items():
+        print(f'  {name:<18} {stats["count"]:>7} {stats["meanUs"]:>9.1f} {stats["p99Us"]:>9.1f}')
+
+    if not report['checked']:
+        reason = 'trace has no recorded final state' if report['traceVersion'] >= 2 else "version 1 trace: background evaluations weren't recorded"
+        print(f'  final display: not checked ({reason})')
+    elif not report['divergence']:
+        print('  final display: matches recording')
+    else:
+        print('  final display: DIVERGED')
+        for name, texts in report['divergence'].items():
+            print(f'    {name}: recorded {texts["recorded"]!r}, replayed {texts["replayed"]!r}')
+
+
+def main():
+    """ """
+
+    parser = argparse.ArgumentParser(description = 'Replay a recorded input trace, reporting throughput, latency, + divergence.')
+    parser.add_argument('trace', help = 'trace file (recorded w/ CALCAPP_TRACE_RECORD=path)')
+    parser.add_argument('--tk', action = 'store_true', help = 'replay against the real app window (needs a display)')
+    parser.add_argument('--repeat', type = int, default = 1, help = 'replays (headless: fresh core each; the fastest is reported)')
+    parser.add_argument('--timeout', type = float, default = 300.0, help = 'seconds per Tk replay (default: 300)')
+    parser.add_argument('--json', action = 'store_true', help = 'print the report as JSON')
+    args = parser.parse_args()
+
+    trace = readTrace(args.trace)
+    if args.tk:
+        reports = [replayTk(args.trace, args.timeout) for _ in range(args.repeat)]
+    else:
+        reports = [replayHeadless(trace) for _ in range(args.repeat)]
+    report = min(reports, key = lambda report: report['seconds'])
+    report['divergence'] = next((report['divergence'] for report in reports if report['divergence']), {}) # any run
+
+    if args.json:
+        print(json.dumps(report, indent = 4, ensure_ascii = False))
+    else:
+        printReport(report, 'Tk replay' if args.tk else 'headless replay')
+    return 1 if report['divergence'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
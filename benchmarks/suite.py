@@ -0,0 +1,197 @@
+"""
+suite.py:
+- headless micro/macro benchmark suite (no display needed): parseParentheses on growing inputs, full '='
+  evaluation of long chains, display formatters across int/float/huge-int/tiny-float inputs (char-count + pixel-width fitted), and scripted key sessions
+  driven through the calculator logic (CalculatorCore, which the Tk Calculator forwards every input event to)
+- inputs come from fixed seeds, so runs are comparable; each case reports its best per-op time over several repeats
+- --save NAME stores results as benchmarks/baselines/NAME.json; --compare NAME flags cases slower than that baseline by
+  more than --threshold (exit code 1 if any), + cases that newly fail
+- run from repo root: python benchmarks/suite.py [--filter TEXT] [--quick] [--save NAME] [--compare NAME] [--threshold 0.1]
+"""
+
+import argparse
+import json
+from pathlib import Path
+import platform
+import sys
+import time
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_core import buildSession
+from bench_engine import buildChain
+from core import CalculatorCore
+from displayfit import DISPLAY_GLYPHS, DisplayFit
+from engine import defaultCache, evaluateExpression
+from formatting import convertToSciNotation, fitResultCached, formatResultCached, getResultDisplayStr, roundToMaxDigits
+
+
+BASELINE_DIR = Path(__file__).resolve().parent / 'baselines'
+SEED = 0
+
+# formatter inputs by kind (fixed, so runs compare like for like)
+FORMATTER_INPUTS = {
+    'int': [7, 123456789, 9876543210, -12345678901, 10**15 + 7],
+    'float': [3.14159265358979, -2.5e-3, 123456.789012, 6.02214076e23, 1 / 3],
+    'hugeInt': [3**2000, -(7**900), 2**4000 + 1],
+    'tinyFloat': [1.5e-300, -4.9e-324, 2.2250738585072014e-308, 1e-12],
+}
+
+# pixel-width fit like the app's input display (proportional font: narrow punctuation, wider digits)
+DISPLAY_FIT = DisplayFit({glyph: 9 if glyph in '.() ' else 17 for glyph in DISPLAY_GLYPHS}, 370)
+
+# roundToMaxDigits only sees values whose scientific exponent is 0 or slightly negative (see getResultDisplayStr)
+ROUNDING_INPUTS = {
+    'float': [1.23456789123, -3.14159265358, 9.87654321987],
+    'smallFloat': [0.000123456789, -0.0056789123456, 0.0987654321],
+}
+
+
+def parenthesesCase(numGroups):
+    """ parseParentheses (implicit multiplication, '2(3)' -> '2*(3)') on an operation w/ numGroups parenthesized groups. """
+
+    operation = '1' + '(2)3' * numGroups
+    core = CalculatorCore()
+    return lambda: core.parseParentheses(operation), 1
+
+
+def evaluationCase(numTerms):
+    """ Full '=' path for a numTerms-long chain: parse parentheses, evaluate (cold cache), format the result. """
+
+    operation = buildChain(numTerms, SEED)
+    core = CalculatorCore()
+
+    def evaluate():
+        defaultCache.clear()
+        getResultDisplayStr(evaluateExpression(core.parseParentheses(operation)))
+    return evaluate, 1
+
+
+def formatterCase(formatter, values):
+    """ One formatter over a fixed set of values (display format caches cleared per pass: times formatting, not cache hits). """
+
+    def formatValues():
+        formatResultCached.cache_clear()
+        fitResultCached.cache_clear()
+        for value in values:
+            formatter(value)
+    return formatValues, len(values)
+
+
+def sessionCase(numEvents, livePreview):
+    """ Scripted key session (digits, operators, '=', clear) replayed through a fresh CalculatorCore. """
+
+    events = buildSession(numEvents, SEED)
+
+    def replay():
+        core = CalculatorCore(livePreview = livePreview)
+        for name, argument in events:
+            method = getattr(core, name)
+            method() if argument is None else method(argument)
+    return replay, numEvents
+
+
+def getCases():
+    """ Returns {case name: setup function returning (callable, ops per call)}, in run order. """
+
+    cases = {}
+    for numGroups in (100, 1000, 10000):
+        cases[f'parentheses/{numGroups}groups'] = lambda numGroups = numGroups: parenthesesCase(numGroups)
+    for numTerms in (10, 100, 1000):
+        cases[f'evaluate/chain{numTerms}'] = lambda numTerms = numTerms: evaluationCase(numTerms)
+    for formatter in (getResultDisplayStr, convertToSciNotation):
+        for kind, values in FORMATTER_INPUTS.items():
+            cases[f'format/{formatter.__name__}/{kind}'] = lambda formatter = formatter, values = values: formatterCase(formatter, values)
+    for kind, values in FORMATTER_INPUTS.items():
+        cases[f'format/fitted/{kind}'] = lambda values = values: formatterCase(lambda value: getResultDisplayStr(value, DISPLAY_FIT), values)
+    for kind, values in ROUNDING_INPUTS.items():
+        cases[f'format/roundToMaxDigits/{kind}'] = lambda values = values: formatterCase(roundToMaxDigits, values)
+    for livePreview in (False, True):
+        cases[f'session/livePreview={livePreview}'] = lambda livePreview = livePreview: sessionCase(5000, livePreview)
+    return cases
+
+
+def runCase(setup, repeats, minTime):
+    """ Returns {'bestUs', 'medianUs'} per op (best/median over repeats), or {'error'} if the case raises. """
+
+    try:
+        function, opsPerCall = setup()
+        function() # warm up (+ fail fast)
+        timer = timeit.Timer(function)
+        loops = 1
+        while True: # calibrate: each repeat runs for at least minTime
+            if timer.timeit(loops) >= minTime:
+                break
+            loops *= 2
+        times = sorted(timer.repeat(repeat = repeats, number = loops))
+    except Exception as error:
+        return {'error': f'{type(error).__name__}: {error}'}
+    perOp = [elapsed / loops / opsPerCall * 1e6 for elapsed in times]
+    return {'bestUs': perOp[0], 'medianUs': perOp[len(perOp) // 2]}
+
+
+def compareResults(results, baseline, threshold):
+    """ Prints each case vs baseline; returns the number of regressions (slower by > threshold, or newly failing). """
+
+    regressions = 0
+    print(f'\n{"case":<46} {"baseline":>11} {"now":>11} {"change":>8}')
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f'{name:<46} {"(new)":>11}')
+            continue
+        if 'error' in result or 'error' in previous:
+            status = 'still failing' if 'error' in result and 'error' in previous else \
+                     'NOW FAILING' if 'error' in result else 'now passing'
+            regressions += status == 'NOW FAILING'
+            print(f'{name:<46} {status:>32}')
+            continue
+        change = result['bestUs'] / previous['bestUs'] - 1
+        flag = 'REGRESSION' if change > threshold else 'faster' if change < -threshold else ''
+        regressions += flag == 'REGRESSION'
+        print(f'{name:<46} {previous["bestUs"]:9.2f}us {result["bestUs"]:9.2f}us {change:+7.1%}  {flag}')
+    return regressions
+
+
+def main():
+    """ """
+
+    parser = argparse.ArgumentParser(description = 'Headless benchmark suite for the calculator engine, formatters, and core.')
+    parser.add_argument('--filter', default = '', help = 'only run cases whose name contains this')
+    parser.add_argument('--quick', action = 'store_true', help = 'fewer, shorter repeats (noisier)')
+    parser.add_argument('--save', metavar = 'NAME', help = 'store results as benchmarks/baselines/NAME.json')
+    parser.add_argument('--compare', metavar = 'NAME', help = 'compare against benchmarks/baselines/NAME.json')
+    parser.add_argument('--threshold', type = float, default = 0.10, help = 'regression threshold, as a fraction (default: 0.10)')
+    args = parser.parse_args()
+
+    repeats, minTime = (3, 0.02) if args.quick else (7, 0.1)
+    results = {}
+    for name, setup in getCases().items():
+        if args.filter not in name:
+            continue
+        result = results[name] = runCase(setup, repeats, minTime)
+        if 'error' in result:
+            print(f'{name:<46} FAILED ({result["error"]})')
+        else:
+            print(f'{name:<46} {result["bestUs"]:10.2f}us/op  (median {result["medianUs"]:.2f}us)')
+
+    if args.save:
+        BASELINE_DIR.mkdir(exist_ok = True)
+        path = BASELINE_DIR / f'{args.save}.json'
+        metadata = {'python': platform.python_version(), 'platform': platform.platform(), 'seed': SEED,
+                    'created': time.strftime('%Y-%m-%d %H:%M:%S')}
+        path.write_text(json.dumps({'metadata': metadata, 'results': results}, indent = 4))
+        print(f'\nsaved baseline: {path}')
+
+    if args.compare:
+        baseline = json.loads((BASELINE_DIR / f'{args.compare}.json').read_text())
+        regressions = compareResults(results, baseline['results'], args.threshold)
+        print(f'\n{regressions} regression(s) over {args.threshold:.0%}' if regressions else f'\nno regressions over {args.threshold:.0%}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
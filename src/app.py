@@ -6,20 +6,33 @@ app.py:
 --- sets up app menu options (mode drop-down, settings)
 --- captures relevant keyboard events
 --- creates instance of Calculator + runs main loop
+- w/ --batch, runs the GUI-free command-line evaluator instead (see batch.py)
+- user settings are kept in memory + saved in the background (see settings.py)
+- w/ CALCAPP_STARTUP_TIMELINE=1, prints a startup timeline to stderr (see startup.py)
+- w/ CALCAPP_INSTRUMENTATION=1, records hot-path timings, exported at exit + on Ctrl+Shift+I (see instrumentation.py)
+- w/ CALCAPP_TRACE_RECORD=path, records input events to a trace; w/ CALCAPP_TRACE_REPLAY=path, replays one + exits (see inputtrace.py)
 """
 
+import sys
+from startup import startupTimeline
+if __name__ == '__main__' and '--batch' in sys.argv[1:]: # command-line batch mode: skip GUI imports entirely
+    from batch import main
+    sys.argv.remove('--batch')
+    sys.exit(main())
+
 import customtkinter as ctk
-import darkdetect
 from functools import partial
 import json
 import os
-from pathlib import Path
-try: # windows only
-    from ctypes import windll, byref, sizeof, c_int
-except:
-    pass
+from tkinter import TclError
 
 from calculator import *
+from inputtrace import (REPLAY_REPORT_PREFIX, SOURCE_BUTTON, SOURCE_KEY, SOURCE_PASTE, TRACE_REPLAY_ENV, ReplayBackend, getReplayReport,
+                        readTrace, replayEvents, traceRecorder)
+from instrumentation import instrumentation, instrumented
+from keydispatch import KeyDispatcher
+from settings import SettingsStore
+startupTimeline.mark('imports done')
 
 
 class App(ctk.CTk):
@@ -31,11 +44,12 @@ class App(ctk.CTk):
         # setup window
         super().__init__(fg_color = (WHITE, BLACK)) 
         self.geometry(f'{WINDOW_SIZE[0]}x{WINDOW_SIZE[1]}') # default window size
-        self.resizable(False, False) # non-resizable
+        self.minsize(*MIN_WINDOW_SIZE) # resizable; fonts + output displays follow (see Calculator.relayout)
 
         # hide title and icon
         self.title('')
         self.iconbitmap('images/empty.ico')
+        startupTimeline.mark('window created')
 
         # get user settings data; if not defined, create w/ defaults
         self.loadUserSettings()
@@ -59,35 +73,150 @@ class App(ctk.CTk):
             mode = self.userSettings['defaultCalcMode'], 
             command = self.modeOptionMenuCallback) 
         
-        # create settings menu button
+        # create settings menu button (overlay is built at idle after startup, or on first click)
+        self.settingsMenuSubFrame = None
         SettingsButton(parent = self.menuFrame, command = self.initSettingsMenu) 
+        startupTimeline.mark('menu built')
 
-        # create calculator instance
-        self.calculator = Calculator(self)
-
-        # setup keyboard event binding
+        # setup keyboard event binding (keys pressed before the calculator exists are queued, then replayed)
+        self.calculator = None
+        self.keyDispatcher = KeyDispatcher() # compiled once the calculator exists, + on mode change
+        self.pendingKeyEvents = []
+        self.firstKeyHandled = False
         keyEventSequence = '<KeyPress>'
         self.bind(keyEventSequence, self.keyEventHandle)
+        self.bind('<Control-L>', self.dumpKeyLatencies) # Ctrl+Shift+L
+        if instrumentation.enabled:
+            self.bind('<Control-I>', self.exportInstrumentation) # Ctrl+Shift+I
+        for pasteEventSequence in ('<Control-v>', '<Control-V>', '<Command-v>'):
+            try:
+                self.bind(pasteEventSequence, self.pasteEventHandle)
+            except TclError: # e.g. no Command modifier on this platform
+                pass
+
+        # create calculator instance once the window is up (its build continues in idle-time chunks)
+        if startupTimeline.enabled:
+            self.bind('<Map>', self.onFirstMap, add = '+')
+        self.after_idle(self.initCalculator)
 
         # run
+        startupTimeline.mark('mainloop starting')
         self.mainloop()
 
+        # save any setting change still waiting on its debounce timer
+        self.userSettings.flush()
+
+    def initCalculator(self):
+        """ Creates the calculator instance, then replays any key events queued in the meantime. """
+
+        self.calculator = Calculator(self)
+        self.keyDispatcher.rebuild(self.calculator)
+        startupTimeline.mark('calculator interactive (display + digit pad)')
+
+        for event in self.pendingKeyEvents:
+            self.keyEventHandle(event)
+        self.pendingKeyEvents.clear()
+
+        # settings overlay: build in idle time, so opening it later is instant
+        self.after_idle(self.buildSettingsMenu)
+
+        if startupTimeline.benchmark: # measure time to first handled key w/o a human at the keyboard
+            self.after_idle(self.event_generate, '<KeyPress-1>')
+
+        if os.environ.get(TRACE_REPLAY_ENV): # replay a recorded trace against this window, then exit
+            self.after_idle(self.replayTrace, os.environ[TRACE_REPLAY_ENV])
+
+    def onFirstMap(self, event):
+        """ Startup timeline: marks when the window is first mapped (shown). """
+
+        if event.widget is self:
+            startupTimeline.mark('window mapped')
+            self.unbind('<Map>')
+
+    def onFirstKeyHandled(self):
+        """ Startup timeline: marks when the first key event has been handled + redrawn (benchmark runs exit here). """
+
+        startupTimeline.mark('first key handled')
+        if startupTimeline.benchmark:
+            self.destroy()
+
     def keyEventHandle(self, event):
         """ Calls appropriate function based on input keyboard event. """
 
-        lookupKey = event.keysym
+        if self.calculator is None: # still starting up
+            self.pendingKeyEvents.append(event)
+            return
+        if startupTimeline.enabled and not self.firstKeyHandled:
+            self.firstKeyHandled = True
+            self.after_idle(self.onFirstKeyHandled)
+
+        traceRecorder.source = SOURCE_KEY # (trace recording) events dispatched from here came from the keyboard
         try:
-            if 'arg' in KEY_FUNCTION_MAP[lookupKey]:
-                getattr(self.calculator, KEY_FUNCTION_MAP[lookupKey]['function'])(KEY_FUNCTION_MAP[lookupKey]['arg'])
-                
-            else: # no args passed
-                getattr(self.calculator, KEY_FUNCTION_MAP[lookupKey]['function'])()
-        except:
-            pass
+            self.keyDispatcher.dispatch(event.keysym) # unmapped keys are ignored
+        finally:
+            traceRecorder.source = SOURCE_BUTTON
+
+    def replayTrace(self, path):
+        """ Replays a recorded input trace through the calculator as fast as possible, prints a report (stdout), then exits. """
+
+        calculator: Calculator = self.calculator
+        trace = readTrace(path)
+        for mode in CalcMode: # finish the staged build first, so it isn't timed as part of the replay
+            calculator.finishBuild(mode)
+        self.update()
+
+        # background evaluations complete from the trace's recorded worker events (older traces: wait for the worker)
+        recordedEvaluations = trace.recordsEvaluations
+        if recordedEvaluations:
+            calculator.core.evaluationBackend = ReplayBackend()
+
+        def settle():
+            # wait for background evaluations (as a user would), then run display updates + redraws
+            while not recordedEvaluations and calculator.core.pendingEvaluation is not None:
+                self.after(EVALUATION_POLL_INTERVAL)
+                self.update()
+            self.update_idletasks()
+
+        latenciesNs = replayEvents(calculator, trace.events, settle)
+        finalDisplay = {name: stringVar.get() for name, stringVar in calculator.displayModel.stringVars.items()}
+        report = getReplayReport(trace, latenciesNs, finalDisplay)
+        print(REPLAY_REPORT_PREFIX + json.dumps(report, ensure_ascii = False), flush = True)
+        self.destroy()
+
+    def dumpKeyLatencies(self, event = None):
+        """ Prints per-key dispatch latencies (so far) to stderr. """
+
+        self.keyDispatcher.dumpLatencies()
+        return 'break'
+
+    def exportInstrumentation(self, event = None):
+        """ Writes hot-path timings collected so far (see instrumentation.py), noting where on stderr. """
+
+        path = instrumentation.export()
+        print(f'instrumentation exported to {path}', file = sys.stderr, flush = True)
+        return 'break'
+
+    def pasteEventHandle(self, event):
+        """ Enters the clipboard's text (e.g. '12*(2+3)-4=') into the calculator in one pass. """
+
+        if self.calculator is None:
+            return 'break'
+        try:
+            text = self.clipboard_get()
+        except TclError: # empty / non-text clipboard
+            return 'break'
+        traceRecorder.source = SOURCE_PASTE # (trace recording) tag the ingest event as a paste
+        try:
+            if not self.calculator.ingest(text):
+                self.bell() # not an operation string (e.g. '2++3'): nothing was entered
+        finally:
+            traceRecorder.source = SOURCE_BUTTON
+        return 'break' # don't also handle as a 'v' key press
 
     def changeTitleBarColor(self, isDark):
         """ If on Windows platform, changes app's title bar color to match rest of window. """
         try: # windows only
+            from ctypes import windll, byref, sizeof, c_int # deferred: not needed before the window exists
             HWND = windll.user32.GetParent(self.winfo_id()) # get current window
             DWMA_ATTRIBUTE = 35 # target color attribute of window's title bar
             TITLE_BAR_COLOR = TITLE_BAR_HEX_COLORS['dark'] if isDark else TITLE_BAR_HEX_COLORS['light'] # define color
@@ -125,32 +254,36 @@ class App(ctk.CTk):
     def modeOptionMenuCallback(self, selection):
         """ 
         Sets CalcApp's currentMode variable to be equivalent to the selected string menu option, if != current.
-        Destroy current activeFrame, inits a new one + all common/standard widgets, then any mode-specific widgets.
+        Swaps in that mode's frame (built on first selection, then reused) in place of the current activeFrame.
         """
 
         calculator: Calculator = self.calculator
         if calculator.currentMode != CalcMode(selection):
-            calculator.currentMode = CalcMode(selection)
+            calculator.showMode(CalcMode(selection))
+            self.keyDispatcher.rebuild(calculator) # mode-specific keys
+    
+    def initSettingsMenu(self):
+        """ Shows the settings menu overlay (built once, on first use if not already built at idle), synced w/ current settings. """
 
-            calculator.activeFrame.destroy()
-            calculator.initCommonStandardWidgets()
+        if self.settingsMenuSubFrame is None:
+            self.buildSettingsMenu()
+        self.syncSettingsMenu()
 
-            if calculator.currentMode != CalcMode.CM_STANDARD:
+        # show overlay; lift above frames created since it was built (e.g. pooled mode frames)
+        self.exitToAppButton.place(x = 0, y = 0, relwidth = 1, relheight = 1) # covers the whole (resizable) window
+        self.exitToAppButton.lift()
+        self.settingsMenuSubFrame.place(relx = 0.125, rely = 0.2)
+        self.settingsMenuSubFrame.lift()
 
-                match calculator.currentMode:
-                    case CalcMode.CM_PROGRAMMING:
-                        calculator.initProgrammingWidgets()
+    def buildSettingsMenu(self):
+        """ Initializes settings menu overlay widgets (hidden until initSettingsMenu places them). """
 
-                    case CalcMode.CM_SCIENTIFIC:
-                        calculator.initScientificWidgets()
-    
-    def initSettingsMenu(self):
-        """ Initializes settings menu overlay widgets. """
+        if self.settingsMenuSubFrame is not None: # already built
+            return
 
         # invisible button filling window behind settingsMenuSubFrame, allows exiting to main app
         invisibleButtonColor = BLACK if ctk.get_appearance_mode() == 'Dark' else WHITE
         self.exitToAppButton = ctk.CTkButton(self, fg_color = 'transparent', bg_color= 'transparent', hover_color = invisibleButtonColor, text = '', width = 400, height = 700, command = self.exitSettingsMenu)
-        self.exitToAppButton.place(x = 0, y = 0)
 
         # setup widget fonts
         self.smallerWidgetFont = ctk.CTkFont(family = FONT, size = 14)
@@ -159,7 +292,6 @@ class App(ctk.CTk):
         # container for actual settings menu overlay
         self.settingsMenuSubFrame = ctk.CTkFrame(self, width = 300, height = 285, border_color = (BLACK, WHITE), border_width = 2)
         self.settingsMenuSubFrame.pack_propagate(False)
-        self.settingsMenuSubFrame.place(relx = 0.125, rely = 0.2)
 
         # create appearance setting label
         self.appearanceLabel = ctk.CTkLabel(self.settingsMenuSubFrame, text = 'Appearance:', font = self.smallerWidgetFont)
@@ -171,8 +303,6 @@ class App(ctk.CTk):
                                                         font = self.smallerWidgetFont, 
                                                         selected_color = '#FF9500', 
                                                         selected_hover_color = '#FFB143')
-        # set to current mode
-        self.appearanceButton.set(ctk.get_appearance_mode())
         self.appearanceButton.pack()
 
         # create default calculator mode setting label
@@ -186,7 +316,6 @@ class App(ctk.CTk):
                                                         font = self.smallerWidgetFont, 
                                                         selected_color = '#FF9500', 
                                                         selected_hover_color = '#FFB143')
-        self.defaultModeButton.set(self.userSettings['defaultCalcMode'])
         self.defaultModeButton.pack()
 
         # create opacity setting label
@@ -196,58 +325,41 @@ class App(ctk.CTk):
         # create opacity slider
         self.opacitySlider = ctk.CTkSlider(self.settingsMenuSubFrame, width = 150, button_color = (DARK_GRAY, WHITE), button_hover_color = '#FFB143',
                                             from_ = int(0.1), to = int(1.0), command = self.setOpacitySetting)
-        self.opacitySlider.set(self.userSettings['opacity'])
         self.opacitySlider.pack(padx = 15, pady = 0, anchor = 'center')
 
         # create always on top setting switch
         self.alwaysOnTopSwitch = ctk.CTkSwitch(self.settingsMenuSubFrame, text = 'Keep app on top', 
                                                font = self.smallerWidgetFont, command = self.toggleOnTopSetting, progress_color = '#FF9500')
+        self.alwaysOnTopSwitch.pack(padx = 10, pady = 12, anchor = 'w')
+
+    def syncSettingsMenu(self):
+        """ Updates settings menu controls (+ invisible exit button color) to match current settings/appearance. """
+
+        isDark = ctk.get_appearance_mode() == 'Dark'
+        self.exitToAppButton.configure(hover_color = BLACK if isDark else WHITE)
+
+        # set controls to current values (set/select don't trigger their commands)
+        self.appearanceButton.set(ctk.get_appearance_mode())
+        self.defaultModeButton.set(self.userSettings['defaultCalcMode'])
+        self.opacitySlider.set(self.userSettings['opacity'])
         if self.userSettings['onTop']: self.alwaysOnTopSwitch.select() 
         else: self.alwaysOnTopSwitch.deselect() 
-        self.alwaysOnTopSwitch.pack(padx = 10, pady = 12, anchor = 'w')
 
     def exitSettingsMenu(self):
-        """ Cleans up when closing the settingsMenu overlay. """
-        self.settingsMenuSubFrame.destroy()
-        self.exitToAppButton.destroy()
+        """ Hides the settingsMenu overlay (kept for reuse). """
+        self.settingsMenuSubFrame.place_forget()
+        self.exitToAppButton.place_forget()
 
     def loadUserSettings(self):
-        """ Loads user settings data from external JSON file, creating w/ defaults if necessary. Updates local data accordingly. """
-        
-        defaultSettings = {'appearance': f'{"dark" if darkdetect.isDark else "light"}', 
-                           'defaultCalcMode': 'Standard', 'onTop': False,
-                           'opacity': 0.9}
-
-        # load saved settings, if present
-        settingsData = {}
-        settingsFile = Path('settings.json')
-        if settingsFile.is_file():
-            with open('settings.json', 'r') as file:
-                settingsData = json.load(file)
-        else:
-            with open('settings.json', 'w') as file:
-                json.dump(defaultSettings, file, indent = 4)
-            with open('settings.json', 'r') as file:
-                settingsData = json.load(file)
-
-        # update local settings data
-        self.userSettings = settingsData
+        """ Loads user settings (validated, w/ defaults for anything missing) into an in-memory store saved in the background. """
 
-    def saveUserSetting(self, key, value):
-        """ Updates a single user setting in external JSON file, as well as locally.  """
+        self.userSettings = SettingsStore(scheduler = self)
 
-        # update persistent settings data
-        fileName = 'settings.json'
-        with open(fileName, 'r') as file:
-            settingsData = json.load(file)
-            settingsData[key] = value
-
-        os.remove(fileName)
-        with open(fileName, 'w') as file:
-            json.dump(settingsData, file, indent = 4)
+    @instrumented('App.saveUserSetting')
+    def saveUserSetting(self, key, value):
+        """ Updates a single user setting; the store writes it to disk once changes settle (and on exit). """
 
-        # update local settings data
-        self.userSettings[key] = value
+        self.userSettings.set(key, value)
 
 
 class ModeOptionMenu(ctk.CTkOptionMenu):
@@ -0,0 +1,82 @@
+"""
+assets.py: shared image asset registry
+- each button image file (BUTTON_LAYOUT_DATA 'image path' entries) is read + decoded once
+- one CTkImage per light/dark image pair, shared by every button in every mode frame
+- CTkImage keeps its scaled PhotoImage variants per scaling factor, so shared images are resized once per DPI/scaling too
+- lazy (first getImage) by default; preload() loads everything (+ optionally pre-scales) up front
+"""
+
+import customtkinter as ctk
+
+from common import BUTTON_LAYOUT_DATA
+
+
+def getLayoutImagePaths():
+    """ Returns every distinct 'image path' entry ({'light': path, 'dark': path}) in BUTTON_LAYOUT_DATA. """
+
+    imagePaths = []
+    for modeLayout in BUTTON_LAYOUT_DATA.values():
+        for buttons in modeLayout.values():
+            for data in buttons.values():
+                if data.get('image path') and data['image path'] not in imagePaths:
+                    imagePaths.append(data['image path'])
+    return imagePaths
+
+
+class AssetRegistry():
+    """ Loads, decodes, and shares button images. """
+
+    def __init__(self):
+        """ """
+
+        self.sourceImages = {} # file path -> decoded PIL image
+        self.images = {} # (light path, dark path) -> CTkImage
+
+    def getSourceImage(self, path):
+        """ Returns the decoded image at path, reading it from disk on first use only. """
+
+        image = self.sourceImages.get(path)
+        if image is None:
+            from PIL import Image # deferred: first image buttons are built after the first frame
+            with Image.open(path) as file:
+                image = file.copy() # decodes now + releases the file handle
+            self.sourceImages[path] = image
+        return image
+
+    def getImage(self, imagePath):
+        """ Returns the shared CTkImage for an 'image path' entry ({'light': path, 'dark': path}). """
+
+        key = (imagePath['light'], imagePath['dark'])
+        image = self.images.get(key)
+        if image is None:
+            image = ctk.CTkImage( # 'dark' img contrasts with 'light' bg, & vice versa
+                light_image = self.getSourceImage(imagePath['dark']),
+                dark_image = self.getSourceImage(imagePath['light']))
+            self.images[key] = image
+        return image
+
+    def preload(self, scalingFactors = ()):
+        """ Loads every layout image now; w/ scalingFactors (needs a Tk root), also builds their scaled variants. """
+
+        for imagePath in getLayoutImagePaths():
+            image = self.getImage(imagePath)
+            for scaling in scalingFactors:
+                scaledSize = image._get_scaled_size(scaling)
+                image._get_scaled_light_photo_image(scaledSize)
+                image._get_scaled_dark_photo_image(scaledSize)
+
+    def memoryReport(self):
+        """ Returns counts + approximate pixel memory (bytes) of decoded source images and scaled variants held. """
+
+        sourceBytes = sum(image.width * image.height * len(image.getbands()) for image in self.sourceImages.values())
+        scaledVariants = [photoImage for image in self.images.values()
+                          for variants in (image._scaled_light_photo_images, image._scaled_dark_photo_images)
+                          for photoImage in variants.values()]
+        scaledBytes = sum(photoImage.width() * photoImage.height() * 4 for photoImage in scaledVariants) # RGBA
+
+        return {'sourceImages': len(self.sourceImages), 'sourceBytes': sourceBytes,
+                'ctkImages': len(self.images), 'scaledVariants': len(scaledVariants), 'scaledBytes': scaledBytes}
+
+
+# shared registry used by the calculator
+imageAssets = AssetRegistry()
@@ -0,0 +1,218 @@
+"""
+batch.py: streaming command-line evaluation (no GUI)
+- reads newline-delimited operations from a file or stdin
+- evaluates each w/ the GUI's rules (implicit multiplication, engine evaluation, optional display formatting)
+- streams results as text, CSV, or JSON lines; errors are reported per line
+- generator pipeline w/ constant memory; never imports customtkinter/PIL
+- optional multi-process evaluation: input is chunked across a process pool, output stays in input order
+
+usage: python src/app.py --batch [input] [--format text|csv|json] [--display] [--output path] [--workers N] [--chunk-size N]
+"""
+
+import argparse
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import csv
+import io
+from itertools import islice
+import json
+import os
+import sys
+
+from engine import ExpressionError, evaluateExpression, insertImplicitMultiplication
+from formatting import getResultDisplayStr
+
+
+OUTPUT_FORMATS = ('text', 'csv', 'json')
+CSV_FIELDS = ('line', 'expression', 'result', 'error')
+LARGE_INT_BITS = 53 # ints beyond a JSON double's exact range are emitted as strings
+
+
+def readExpressions(stream):
+    """ Yields (lineNumber, expression) for each non-blank line of stream. """
+
+    for lineNumber, line in enumerate(stream, start = 1):
+        expression = line.strip()
+        if expression:
+            yield lineNumber, expression
+
+
+def evaluateRecord(lineNumber, expression, display = False):
+    """ Evaluates a single operation, returning its result record (never raises for bad input). """
+
+    try:
+        result = evaluateExpression(insertImplicitMultiplication(expression))
+        if display:
+            result = getResultDisplayStr(result)
+        elif isinstance(result, int) and result.bit_length() > LARGE_INT_BITS:
+            result = str(result) # emitted as a string (also raises ValueError past Python's int->str digit limit)
+        return {'line': lineNumber, 'expression': expression, 'result': result, 'error': None}
+    except (ExpressionError, ValueError) as error: # ValueError: e.g. int too large to convert to str
+        return {'line': lineNumber, 'expression': expression, 'result': None, 'error': str(error) or type(error).__name__}
+
+
+def evaluateExpressions(expressions, display = False):
+    """ Yields a result record per (lineNumber, expression). """
+
+    for lineNumber, expression in expressions:
+        yield evaluateRecord(lineNumber, expression, display)
+
+
+def chunked(items, chunkSize):
+    """ Yields successive lists of up to chunkSize items. """
+
+    iterator = iter(items)
+    while chunk := list(islice(iterator, chunkSize)):
+        yield chunk
+
+
+def evaluateChunk(chunk, display = False):
+    """ Evaluates a chunk of (lineNumber, expression) pairs; runs inside a worker process. """
+
+    return [evaluateRecord(lineNumber, expression, display) for lineNumber, expression in chunk]
+
+
+def failedChunkRecords(chunk, error):
+    """ Error records for every line of a chunk whose worker failed. """
+
+    return [{'line': lineNumber, 'expression': expression, 'result': None, 'error': f'worker failed: {error!r}'}
+            for lineNumber, expression in chunk]
+
+
+def evaluateExpressionsParallel(expressions, display = False, workers = None, chunkSize = 1000):
+    """
+    Yields a result record per (lineNumber, expression), in input order, evaluating chunks across a process pool.
+    At most two chunks per worker are in flight, so memory stays bounded regardless of input size.
+    A failed chunk only produces error records for its own lines. A broken pool (crashed worker) can't say which
+    chunk crashed it: it's replaced, the chunk being collected is retried alone (+ bisected down to the lines that
+    break a fresh pool on their own), then the other chunks in flight are resubmitted.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    chunks = chunked(expressions, chunkSize)
+    pending = deque() # (chunk, future), in input order
+    executor = ProcessPoolExecutor(max_workers = workers)
+
+    def submit(chunk):
+        try:
+            future = executor.submit(evaluateChunk, chunk, display)
+        except BrokenProcessPool as error: # broke since the last collected chunk: handled when this one is collected
+            future = Future()
+            future.set_exception(error)
+        pending.append((chunk, future))
+
+    def replaceExecutor():
+        nonlocal executor
+        executor.shutdown(wait = False, cancel_futures = True)
+        executor = ProcessPoolExecutor(max_workers = workers)
+
+    def evaluateAlone(chunk):
+        """ Evaluates chunk w/ nothing else in flight; if it breaks the pool, only its lines that do so on their own fail. """
+
+        try:
+            return executor.submit(evaluateChunk, chunk, display).result()
+        except BrokenProcessPool as error:
+            replaceExecutor()
+            if len(chunk) == 1:
+                return failedChunkRecords(chunk, error)
+            middle = len(chunk) // 2
+            return evaluateAlone(chunk[:middle]) + evaluateAlone(chunk[middle:])
+        except Exception as error:
+            return failedChunkRecords(chunk, error)
+
+    try:
+        for chunk in islice(chunks, workers * 2):
+            submit(chunk)
+
+        while pending:
+            chunk, future = pending.popleft()
+            try:
+                records = future.result()
+            except BrokenProcessPool:
+                # pool is unusable + any chunk in flight may have crashed it: replace it, retry this chunk alone,
+                # then resubmit the rest (a crash among them breaks the pool again + is isolated the same way)
+                replaceExecutor()
+                inFlight = [pendingChunk for pendingChunk, _ in pending]
+                pending.clear()
+                records = evaluateAlone(chunk)
+                for pendingChunk in inFlight:
+                    submit(pendingChunk)
+            except Exception as error: # e.g. MemoryError, unpicklable result
+                records = failedChunkRecords(chunk, error)
+
+            yield from records
+
+            # keep the pipeline full: one chunk out, one chunk in
+            nextChunk = next(chunks, None)
+            if nextChunk is not None:
+                submit(nextChunk)
+    finally:
+        executor.shutdown(wait = False, cancel_futures = True)
+
+
+def formatRecords(records, outputFormat = 'text'):
+    """ Yields one output line (w/o newline) per record, in the requested format. """
+
+    if outputFormat == 'json':
+        for record in records:
+            yield json.dumps(record, ensure_ascii = False)
+
+    elif outputFormat == 'csv':
+        # reuse a single row buffer so csv quoting rules apply without holding output in memory
+        rowBuffer = io.StringIO()
+        writer = csv.writer(rowBuffer, lineterminator = '')
+        writer.writerow(CSV_FIELDS)
+        for record in records:
+            yield rowBuffer.getvalue()
+            rowBuffer.seek(0)
+            rowBuffer.truncate()
+            writer.writerow(['' if record[field] is None else record[field] for field in CSV_FIELDS])
+        yield rowBuffer.getvalue()
+
+    else: # text: result, or error, per line
+        for record in records:
+            yield f"ERROR: {record['error']}" if record['error'] is not None else str(record['result'])
+
+
+def parseArgs(argv):
+    """ """
+
+    parser = argparse.ArgumentParser(prog = 'app.py --batch', description = 'Evaluate newline-delimited calculator operations.')
+    parser.add_argument('input', nargs = '?', default = '-', help = "input file (default: '-' = stdin)")
+    parser.add_argument('--format', choices = OUTPUT_FORMATS, default = 'text', help = 'output format (default: text)')
+    parser.add_argument('--display', action = 'store_true', help = 'format results as the calculator display would')
+    parser.add_argument('--output', default = '-', help = "output file (default: '-' = stdout)")
+    parser.add_argument('--workers', type = int, default = 1, help = 'evaluation processes (default: 1 = in-process; 0 = one per CPU)')
+    parser.add_argument('--chunk-size', type = int, default = 1000, help = 'lines per worker task (default: 1000)')
+    return parser.parse_args(argv)
+
+
+def main(argv = None):
+    """ Command-line entry point; returns the process exit code. """
+
+    args = parseArgs(sys.argv[1:] if argv is None else argv)
+
+    inputStream = sys.stdin if args.input == '-' else open(args.input, 'r', encoding = 'utf-8')
+    outputStream = sys.stdout if args.output == '-' else open(args.output, 'w', encoding = 'utf-8', newline = '')
+    try:
+        expressions = readExpressions(inputStream)
+        if args.workers == 1:
+            records = evaluateExpressions(expressions, args.display)
+        else:
+            records = evaluateExpressionsParallel(expressions, args.display, args.workers or None, max(1, args.chunk_size))
+        for outputLine in formatRecords(records, args.format):
+            outputStream.write(outputLine + '\n')
+    except BrokenPipeError: # e.g. piped into head
+        pass
+    finally:
+        if inputStream is not sys.stdin:
+            inputStream.close()
+        if outputStream is not sys.stdout:
+            outputStream.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
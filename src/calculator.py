@@ -1,16 +1,31 @@
 """
 calculator.py: 
-- handles domain-specific app functionality
-- creates/manages two output displays + mode-dependent buttons
+- Tk view over the headless CalculatorCore (core.py)
+- creates/manages output displays + mode-dependent buttons
+- each mode's frame is built once + kept alive; mode switches just swap which frame is packed
+- staged build: display + digit pad first, then remaining buttons + other modes' frames in idle-time chunks
+- forwards input events to the core, mirrors its display state into StringVars
+  (through a DisplayModel: one commit per event-loop tick, changed text only)
+- output displays are fitted to their rendered width: glyph widths measured once per font (see displayfit.py)
+- resizable: grid weights stretch the layout; fonts scale w/ the window (cached per size bucket), relaid out
+  at most once per RELAYOUT_INTERVAL during a drag-resize
+- runs potentially slow evaluations on a background worker (worker.py), polling for results via after()
+- w/ CALCAPP_TRACE_RECORD set, records forwarded input events (+ background evaluation outcomes) to a trace file (see inputtrace.py)
 """
 
+from collections import deque
+
 import customtkinter as ctk
-from decimal import Decimal
-import math
-from PIL import Image
-from simpleeval import simple_eval
+from tkinter import TclError
 
+from assets import imageAssets
 from buttons import *
+from core import CORE_EVENTS, CalculatorCore
+from displayfit import DisplayFit, measureGlyphs
+from inputtrace import SOURCE_BUTTON, SOURCE_WORKER, traceRecorder
+from instrumentation import instrumentation, instrumented
+from startup import startupTimeline
+from worker import EvaluationWorker
 
 
 class Calculator():
@@ -24,285 +39,218 @@ class Calculator():
         # set calculator operating mode
         self.currentMode = CalcMode(self.app.userSettings['defaultCalcMode'])
 
-        # data
+        # headless logic/state; input events (numberPressed, mathPressed, ...) are forwarded straight to it
+        self.core = CalculatorCore()
+        # (w/ trace recording on, each forwarded event is logged first; see inputtrace.py)
+        for eventName in CORE_EVENTS:
+            event = getattr(self.core, eventName)
+            setattr(self, eventName, traceRecorder.wrap(eventName, event) if traceRecorder.enabled else event)
+        if traceRecorder.enabled:
+            traceRecorder.start(self.core, self.currentMode.value)
+
+        # background evaluation: keeps the window responsive during big results; Escape cancels
+        self.evaluationWorker = EvaluationWorker(
+            timeLimit = self.app.userSettings.get('evaluationTimeLimit', EVALUATION_BUDGET['timeLimit']),
+            maxPowerBits = self.app.userSettings.get('evaluationMaxPowerBits', EVALUATION_BUDGET['maxPowerBits']))
+        self.core.evaluationBackend = self.evaluationWorker
+        self.evaluationPollJob = None
+
+        # display data, kept in sync w/ core state
         self.cumulativeInputDisplayString = ctk.StringVar(value = '0')
         self.cumulativeOperationDisplayString = ctk.StringVar(value = '')
-        self.cumulativeNumInputList = []
-        self.lastCumulativeNumInputList = []
-        self.cumulativeOperationList = []
-
-        # data flags
-        self.lastInputWasNum = False
-        self.lastOperationWasEval = False
-        self.skipAddingLastNumInputToOperation = False
-
-        # create default (Standard mode) activeFrame + setup its widgets
-        self.initCommonStandardWidgets()
-        # create any additional widgets if applicable
-        if self.currentMode is not CalcMode.CM_STANDARD:
-            modeInitFunction = self.initProgrammingWidgets if self.currentMode is CalcMode.CM_PROGRAMMING else self.initScientificWidgets
-            modeInitFunction()
-
-    def clearAll(self):
-        """ Resets output and data to default state. """
-
-        # clear display output - set to defaults
-        self.cumulativeInputDisplayString.set('0') 
-        self.cumulativeOperationDisplayString.set('')
-
-        # clear data
-        self.cumulativeNumInputList.clear()
-        self.cumulativeOperationList.clear()
-
-    def clearLast(self):
-        """ Removes single most recent input (number or operator). """
-
-        # if last input was '=', do nothing
-        if self.lastOperationWasEval and not self.lastInputWasNum:
-            return 
-
-        if self.lastInputWasNum:
-            # remove last num input from data
-            if len(self.cumulativeNumInputList) > 0:
-                *self.cumulativeNumInputList,_ = self.cumulativeNumInputList
-
-                # handle case where -(num value) had all numvalues backspaced out, so only '-' left in list
-                if len(self.cumulativeNumInputList) == 1 and self.cumulativeNumInputList[0] == '-':
-                    self.cumulativeNumInputList.clear()
-                    self.cumulativeInputDisplayString.set('0')
-                
-                # if still values present, update display output appropriately
-                if len(self.cumulativeNumInputList) > 0:
-                    cumulativeNumInputToDisplay = ''.join(self.cumulativeNumInputList) 
-                    self.cumulativeInputDisplayString.set(cumulativeNumInputToDisplay)
-                else: # if now empty, set to 0 default display value
-                    self.cumulativeInputDisplayString.set('0')
-
-        # if there's been no input at all, do nothing
-        elif len(self.cumulativeOperationList) == 0: 
-            return
+        self.previewDisplayString = ctk.StringVar(value = '')
+        self.displayModel = DisplayModel(self.app, {
+            'input': self.cumulativeInputDisplayString,
+            'operation': self.cumulativeOperationDisplayString,
+            'preview': self.previewDisplayString})
+        self.core.subscribe(self.onCoreStateChange)
+        instrumentation.registerCounters('displayModel', self.displayModel.stats)
+
+        # button images: one shared set for all mode frames; optionally loaded + pre-scaled up front (default: on first use)
+        if PRELOAD_IMAGE_ASSETS:
+            imageAssets.preload(scalingFactors = [ctk.ScalingTracker.get_widget_scaling(self.app)])
+
+        # per-mode frame pool: CalcMode -> built frame (all bound to the shared display StringVars)
+        self.modeFrames = {}
+        self.activeFrame = None
+
+        # window resizing: fonts scaled to the window, display fits for the current fonts + width, throttled relayout
+        self.scaledFonts = ScaledFonts()
+        self.displayFitKey = None
+        self.laidOutSize = None
+        self.relayoutJob = None
+        self.resizeCounters = {'configureEvents': 0, 'relayouts': 0, 'fontSwaps': 0}
+        instrumentation.registerCounters('resize', lambda: dict(self.resizeCounters, fontsCreated = len(self.scaledFonts.fonts)))
+
+        # staged build: current mode's steps first, then every other mode's
+        self.pendingBuildSteps = deque(self.getBuildSteps(self.currentMode))
+        for mode in CalcMode:
+            if mode is not self.currentMode:
+                self.pendingBuildSteps.extend(self.getBuildSteps(mode))
+
+        # build + show just enough to be usable now (output displays, digit pad); the rest is built from idle callbacks
+        for _ in range(FIRST_FRAME_BUILD_STEPS):
+            self.runBuildStep(*self.pendingBuildSteps.popleft())
+        self.activeFrame = self.modeFrames[self.currentMode]
+        self.activeFrame.pack(side = 'bottom', expand = True, fill = 'both', anchor = 's')
+        self.updateDisplayFits()
+        self.app.bind('<Configure>', self.onWindowConfigure, add = '+')
+        self.app.after_idle(self.runNextBuildStep)
+
+    def getBuildSteps(self, mode):
+        """ Returns mode's frame build steps, as (mode, init function) pairs in build order. """
+
+        steps = [self.initModeFrame, self.initOutputLabels, self.initNumberButtons, self.initOperatorButtons, self.initMathButtons]
+        if mode is CalcMode.CM_PROGRAMMING:
+            steps.append(self.initProgrammingWidgets)
+        elif mode is CalcMode.CM_SCIENTIFIC:
+            steps.append(self.initScientificWidgets)
+        return [(mode, step) for step in steps]
+
+    @instrumented('Calculator.runBuildStep')
+    def runBuildStep(self, mode, step):
+        """ Runs a single build step against mode's frame + fonts, w/o changing which mode is shown. """
+
+        shownFrame, shownMode = self.activeFrame, self.currentMode
+        self.activeFrame, self.currentMode = self.modeFrames.get(mode), mode
+        self.smallerWidgetFont, self.largerWidgetFont, self.previewWidgetFont = self.getModeFonts(mode) # at the current scale
+        try:
+            step()
+        finally:
+            self.activeFrame, self.currentMode = shownFrame, shownMode
+        startupTimeline.mark(f'built {mode.value}: {step.__name__}')
+
+    def runNextBuildStep(self):
+        """ Idle callback: runs one pending build step, then yields to the event loop (input, redraws) before the next. """
+
+        if self.pendingBuildSteps:
+            self.runBuildStep(*self.pendingBuildSteps.popleft())
+        if self.pendingBuildSteps:
+            self.app.after_idle(self.runNextBuildStep)
+        else:
+            startupTimeline.mark('all modes built')
+
+    def finishBuild(self, mode):
+        """ Runs pending build steps (in order) until mode's frame is complete, e.g. when it's selected mid-build. """
+
+        while any(stepMode is mode for stepMode, _ in self.pendingBuildSteps):
+            self.runBuildStep(*self.pendingBuildSteps.popleft())
+
+    def showMode(self, mode):
+        """ Makes mode's (pooled) frame the activeFrame, finishing its build first if needed; hides the previous one. """
+
+        self.finishBuild(mode)
+        if self.activeFrame is not None:
+            self.activeFrame.pack_forget()
+        self.currentMode = mode
+        self.activeFrame = self.modeFrames[mode]
+        self.activeFrame.pack(side = 'bottom', expand = True, fill = 'both', anchor = 's')
+        self.resizeCounters['fontSwaps'] += self.scaledFonts.rescale(self.activeFrame.winfo_children()) # built at another scale?
+        self.updateDisplayFits()
 
-        else: # last input was non-(=) math operator
-            
-            # remove last operator input from data
-            *self.cumulativeOperationList,_ = self.cumulativeOperationList
+    def getModeFonts(self, mode):
+        """ Returns mode's (smaller, larger, preview) fonts, scaled to the window. """
 
-            # update relevant data
-            self.cumulativeNumInputList = list(self.lastCumulativeNumInputList) # restore previous, prior to clear when math operated pressed
-            self.skipAddingLastNumInputToOperation = True # avoiding duplicates
+        sizes = FONT_SIZES[mode.value]
+        return (self.scaledFonts.get(sizes['smallerFont']), self.scaledFonts.get(sizes['largerFont']),
+                self.scaledFonts.get(sizes['previewFont']))
 
-            # update display output
-            self.cumulativeOperationDisplayString.set(' '.join(self.cumulativeOperationList))
-        
-    def percentage(self):
-        """ Divides current number input / result value by 100. """
+    def getWindowSize(self):
+        """ Window size in unscaled pixels (like WINDOW_SIZE, + font measurements); WINDOW_SIZE until it's mapped. """
 
-        if self.cumulativeNumInputList:
-            # get current number input as float
-            currentNumInputFloat = float(''.join(self.cumulativeNumInputList))
+        width, height = self.app.winfo_width(), self.app.winfo_height()
+        if width <= 1:
+            return WINDOW_SIZE
+        scaling = ctk.ScalingTracker.get_window_scaling(self.app)
+        return round(width / scaling), round(height / scaling)
 
-            # convert to percentage
-            currentPercentFloat = currentNumInputFloat / 100
-            self.cumulativeNumInputList[0] = str(currentPercentFloat)
+    def updateDisplayFits(self):
+        """ Fits the output displays to the current mode's fonts + window width (glyph widths measured once per font). """
 
-            # update display output
-            self.cumulativeInputDisplayString.set(''.join(self.cumulativeNumInputList))
+        _, largerFont, previewFont = self.getModeFonts(self.currentMode)
+        width = self.getWindowSize()[0] - 2 * OUTPUT_LABEL_PADX # labels span the window
+        fitKey = (str(largerFont), str(previewFont), width)
+        if fitKey != self.displayFitKey: # unchanged (e.g. height-only resize): keep the core's fits
+            self.displayFitKey = fitKey
+            self.setDisplayFits(DisplayFit(measureGlyphs(largerFont), width),
+                                DisplayFit(measureGlyphs(previewFont), width, reserved = '= '))
 
-    def invert(self):
-        """ Flips sign of current number input / result. """
+    def onWindowConfigure(self, event):
+        """ Window resized/moved: schedules a relayout, unless one is already due (so a drag-resize relayouts once per interval). """
 
-        # get current number input as float and as str
-        currentNumInputFloat = float(''.join(self.cumulativeNumInputList))
-        currentNumInputStr = ''.join(self.cumulativeNumInputList)
+        if event.widget is not self.app: # (the window's binding also sees every child widget's Configure events)
+            return
+        self.resizeCounters['configureEvents'] += 1
+        if self.relayoutJob is None:
+            self.relayoutJob = self.app.after(RELAYOUT_INTERVAL, self.relayout)
 
-        if currentNumInputStr: # if input exists
-            isPositive = True if currentNumInputFloat > 0 else False
-            # flip sign + update data
-            flippedNumInput = list('-' + currentNumInputStr) if isPositive else list(currentNumInputStr[1:])
-            self.cumulativeNumInputList = flippedNumInput
-        
-            # update display output
-            # set base str object to deal with
-            formattedStr = ''.join(self.cumulativeNumInputList)
-            # if positive, and adding a '-' will push us outside maximum window width, shorten first
-            if isPositive and len(currentNumInputStr) > 9:
-                formattedStr = self.getResultDisplayStr(float(''.join(flippedNumInput)))
-   
-            # check for pre-existing sci notation
-            if 'e' in self.cumulativeInputDisplayString.get():
-                sciNotation = self.cumulativeInputDisplayString.get()
-                if isPositive:
-                    if len(sciNotation) > 9:
-                    # break up and format shortened string
-                        significand = sciNotation.split('e')[0].rstrip('0').rstrip('.')
-                        exponentSign = sciNotation.split('e')[1][0]
-                        exponentValue = sciNotation.split('e')[1][1:]
-                        
-                        significandLength = len(significand)
-                        # less 2 to get the number of fractional digits
-                        significandPrecision = significandLength - 2
-                        roundedSignificand = round(float(significand), significandPrecision - 1)
-        
-                        formattedSciNotation = str(roundedSignificand) + 'e' + exponentSign + exponentValue
-                        flippedSciNotation = '-' + formattedSciNotation
-                    else:
-                        flippedSciNotation = '-' + sciNotation            
-                else:
-                    flippedSciNotation = sciNotation[1:]
-                self.cumulativeInputDisplayString.set(flippedSciNotation)
-            
-            else:
-                self.cumulativeInputDisplayString.set(formattedStr)
-
-    def numberPressed(self, value):
-        """ Handles numerical input. """
-
-        # each input value added to list as string
-        self.cumulativeNumInputList.append(str(value))
-        # from list, convert to displayed format (w/ new inputs added to end of list (positioned to right of last input)) 
-        cumulativeNumInputToDisplay = ''.join(self.cumulativeNumInputList) 
-        # format any instances of exponentiation prior to displaying
-        formattedDisplayString = cumulativeNumInputToDisplay.replace('**', '^')
-        # if adding another number will push us outside maximum window width, format first
-        if len(formattedDisplayString) > 9:
-            formattedDisplayString = self.getResultDisplayStr(float(formattedDisplayString))
-        self.cumulativeInputDisplayString.set(formattedDisplayString)
-
-        # update tracking data
-        self.lastInputWasNum = True
-
-    def mathPressed(self, value):
-        """
-        Handles math operator input. 
-        This includes processing duplicate inputs and additional (but different) operator inputs back to back.
-        """
-
-        # check if last input was also a non-evaluating math operation
-        if not self.lastInputWasNum and not self.lastOperationWasEval and ''.join(self.cumulativeNumInputList): # do not proceed if no num input exists:
-            if self.cumulativeOperationList[-1] == value:
-                return # can't input same operation twice
-            
-            else:
-                # replace last input operation with new operation
-                self.clearLast()
-                self.skipAddingLastNumInputToOperation = False
-
-                # update data
-                self.cumulativeOperationList.append(value)
-                self.cumulativeNumInputList.clear()
-                
-                # update display output
-                self.cumulativeInputDisplayString.set('')
-                self.cumulativeOperationDisplayString.set(' '.join(self.cumulativeOperationList))
-    
-                return
-
-        # get the cumulative number input + append to cumulative operation list
-        currentCumulativeNumInput = ''.join(self.cumulativeNumInputList)
-        if not self.skipAddingLastNumInputToOperation:
-            self.cumulativeOperationList.append(currentCumulativeNumInput)
-
-        else: # reset flag
-            self.skipAddingLastNumInputToOperation = False
-
-        # update input tracking flag
-        self.lastInputWasNum = False 
-
-        if currentCumulativeNumInput: # do not proceed if no num input exists
-            if value != '=': # special case
-
-                # update data
-                self.cumulativeOperationList.append(value)
-                self.lastCumulativeNumInputList = list(self.cumulativeNumInputList) # store in case operation is canceled
-                self.cumulativeNumInputList.clear()
-                self.lastOperationWasEval = False
-                
-                # update display output
-                self.cumulativeInputDisplayString.set('')
-                self.cumulativeOperationDisplayString.set(' '.join(self.cumulativeOperationList))
+    @instrumented('Calculator.relayout')
+    def relayout(self):
+        """ Scales the shown mode's fonts to the window size (swapping fonts only on a size bucket change) + refits the displays. """
 
-            else: # value was '='
-                
-                # get operation
-                currentCumulativeOperation = ''.join(self.cumulativeOperationList)
-                # parse
-                currentCumulativeOperation = self.parseParentheses(currentCumulativeOperation)
-                # evaluate
-                try:
-                    currentResult = simple_eval(currentCumulativeOperation)
-                    #print(currentCumulativeOperation)
-                # error catching
-                except (SyntaxError, KeyError, TypeError):
-                    self.cumulativeInputDisplayString.set('ERROR')
-                    return
-
-                # update data
-                self.lastOperationWasEval = True
-                self.cumulativeOperationList.clear()
-                self.cumulativeNumInputList = [str(currentResult)] # empty + update by creating new w/ result
-                
-                # update display output: result
-                resultDisplayStr = self.getResultDisplayStr(currentResult)
-                self.cumulativeInputDisplayString.set(resultDisplayStr)
-                # update display output: cumulative operation
-                operationDisplayStr = self.getOperationDisplayStr(currentCumulativeOperation)
-                self.cumulativeOperationDisplayString.set(operationDisplayStr)
-
-    def parseParentheses(self, currentCumulativeOperation):
-        """ 
-        Parses operation for instances of parentheses without adjacent operators, e.g., '2(3)' or '2(3)2.'
-        When such instances are found, inserts '*' operator before/after as needed.
-        """
-
-        outerIndex = 0 
-        while outerIndex < 2:
-            isLeft = outerIndex # first pass = false, 2nd pass = true
-            parenth = '(' if isLeft else ')'
-            # get indices of all parenth instances
-            parenthPosList = [pos for pos, char in enumerate(currentCumulativeOperation) if char is parenth]
-            parenthCount = len(parenthPosList)
-
-            for innerIndex, parenthPos in enumerate(parenthPosList):
-                if (parenthPos > 0): # ensure there's a left-adjacent value to check
-                    if currentCumulativeOperation[parenthPos - 1].isnumeric(): # left-adjacent numeric?
-                        # ensure there's a right-adjacent value to check
-                        if (parenthPos != len(currentCumulativeOperation) - 1):
-                            if currentCumulativeOperation[parenthPos + 1].isnumeric(): # right-adjacent numeric?
-                                # no adjacent operator found; insert '*' appropriately
-                                posAdjustment = 0 if isLeft else 1
-                                slice = parenthPos + posAdjustment
-                                currentCumulativeOperation = currentCumulativeOperation[:slice] + '*' + currentCumulativeOperation[slice:]
-                                # adjust parenthList indices to account for the insertion
-                                if innerIndex != parenthCount: # if not at end
-                                    for eachIndex in range(0, parenthCount):
-                                            parenthPosList[eachIndex] += 1
-            outerIndex += 1
-
-        return currentCumulativeOperation
-
-    def initCommonStandardWidgets(self):
-        """ Initializes common/Standard-CalcMode widgets: OutputLabels + number, operator, and math buttons. """
+        self.relayoutJob = None
+        size = self.getWindowSize()
+        if size == self.laidOutSize: # moved, not resized
+            return
+        self.laidOutSize = size
+        self.resizeCounters['relayouts'] += 1
+
+        # grid weights stretch the buttons themselves; fonts follow the smaller of the two scale factors
+        self.scaledFonts.scale = min(size[0] / WINDOW_SIZE[0], size[1] / WINDOW_SIZE[1])
+        self.resizeCounters['fontSwaps'] += self.scaledFonts.rescale(self.activeFrame.winfo_children())
+        self.updateDisplayFits()
+
+    def onCoreStateChange(self, core):
+        """ Passes the core's display strings on to the display model (committed to the output labels' Tk variables at idle). """
+
+        self.displayModel.update('input', core.inputDisplay)
+        self.displayModel.update('operation', core.operationDisplay)
+        self.displayModel.update('preview', core.previewDisplay)
+
+        # evaluation handed to the worker: poll for its result until it completes or is cancelled
+        if core.pendingEvaluation is not None and self.evaluationPollJob is None:
+            self.evaluationPollJob = self.app.after(EVALUATION_POLL_INTERVAL, self.pollEvaluation)
+
+    def pollEvaluation(self):
+        """ Checks the background worker w/o blocking; hands a finished (or timed out) result to the core. """
+
+        self.evaluationPollJob = None
+        reply = self.evaluationWorker.poll()
+        if reply is not None:
+            traceRecorder.source = SOURCE_WORKER # (trace recording) the worker's outcome (result, error, or timeout)
+            try:
+                self.completeEvaluation(*reply)
+            finally:
+                traceRecorder.source = SOURCE_BUTTON
+        elif self.core.pendingEvaluation is not None:
+            self.evaluationPollJob = self.app.after(EVALUATION_POLL_INTERVAL, self.pollEvaluation)
+
+    # common/Standard-CalcMode widget build steps: frame, OutputLabels, then number, operator, and math buttons
+    def initModeFrame(self):
+        """ Initializes the (unpacked) frame for the current CalcMode's contents + its grid layout (fonts: see getModeFonts). """
 
         # setup active frame (container for current CalcMode's contents)
         self.activeFrame = ctk.CTkFrame(self.app, fg_color = 'transparent')
-        self.activeFrame.pack(side = 'bottom', expand = True, fill = 'both', anchor = 's')
-
-        # setup widget fonts
-        self.smallerWidgetFont = ctk.CTkFont(family = FONT, size = FONT_SIZES[self.currentMode.value]['smallerFont'])
-        self.largerWidgetFont = ctk.CTkFont(family = FONT, size = FONT_SIZES[self.currentMode.value]['largerFont'])
+        self.modeFrames[self.currentMode] = self.activeFrame
 
         # setup frame grid layout
         self.activeFrame.rowconfigure(list(range(NUM_ROWS_COLUMNS[self.currentMode.value]['rows'])), weight = 1, uniform = 'a')
         self.activeFrame.columnconfigure(list(range(NUM_ROWS_COLUMNS[self.currentMode.value]['columns'])), weight = 1, uniform = 'a')
-        
+
+    def initOutputLabels(self):
+        """ Initializes OutputLabels (bound to the shared display StringVars). """
+
         # setup output labels
         OutputDisplayLabel(self.activeFrame, 0, 'se', self.smallerWidgetFont, self.cumulativeOperationDisplayString, self.currentMode) 
         OutputDisplayLabel(self.activeFrame, 1, 'e', self.largerWidgetFont, self.cumulativeInputDisplayString, self.currentMode)
+        # live result preview: top of the operation row (row 1 is fully taken by the large input display)
+        OutputDisplayLabel(self.activeFrame, 0, 'ne', self.previewWidgetFont, self.previewDisplayString, self.currentMode)
+
+    def initNumberButtons(self):
+        """ Initializes number buttons. """
 
         # get mode-relevant button layout data
         NUMBER_BUTTONS = BUTTON_LAYOUT_DATA[self.currentMode.value]['numberButtons']
-        OPERATOR_BUTTONS = BUTTON_LAYOUT_DATA[self.currentMode.value]['operatorButtons']
-        MATH_BUTTONS = BUTTON_LAYOUT_DATA[self.currentMode.value]['mathButtons']
 
         # setup number buttons
         for number, data in NUMBER_BUTTONS.items():
@@ -316,6 +264,12 @@ class Calculator():
                 font = self.smallerWidgetFont,
                 state = data['state'])
 
+    def initOperatorButtons(self):
+        """ Initializes clear, backspace, percentage, and invert buttons. """
+
+        # get mode-relevant button layout data
+        OPERATOR_BUTTONS = BUTTON_LAYOUT_DATA[self.currentMode.value]['operatorButtons']
+
         # setup clear (AC) button
         Button(parent = self.activeFrame,
             text = OPERATOR_BUTTONS['clear']['text'],
@@ -341,10 +295,8 @@ class Calculator():
             font = self.smallerWidgetFont)
         
         # setup invert (+/-) button
-        # create image
-        invertImage = ctk.CTkImage( # 'dark' img contrasts with 'light' bg, & vice versa
-            light_image = Image.open(OPERATOR_BUTTONS['invert']['image path']['dark']),
-            dark_image = Image.open(OPERATOR_BUTTONS['invert']['image path']['light']))
+        # get shared image
+        invertImage = imageAssets.getImage(OPERATOR_BUTTONS['invert']['image path'])
         # create button
         ImageButton(parent = self.activeFrame, 
                     text = OPERATOR_BUTTONS['invert']['text'],
@@ -352,14 +304,18 @@ class Calculator():
                     function = self.invert,
                     column = OPERATOR_BUTTONS['invert']['column'],
                     row = OPERATOR_BUTTONS['invert']['row'])
-        
+
+    def initMathButtons(self):
+        """ Initializes math operator buttons. """
+
+        # get mode-relevant button layout data
+        MATH_BUTTONS = BUTTON_LAYOUT_DATA[self.currentMode.value]['mathButtons']
+
         # setup math buttons
         for operator, data in MATH_BUTTONS.items():
             if data['image path']: # if image assigned (CM_STANDARD: division button only)
-                # create image
-                divisionImage = ctk.CTkImage( # 'dark' img contrasts with 'light' bg, & vice versa
-                    light_image = Image.open(data['image path']['dark']),
-                    dark_image = Image.open(data['image path']['light']))
+                # get shared image
+                divisionImage = imageAssets.getImage(data['image path'])
                 # create button
                 MathImageButton(
                     parent = self.activeFrame,
@@ -400,8 +356,8 @@ class Calculator():
         """ Initializes Scientific CalcMode widgets... """
         
         # setup widget fonts
-        self.smallestWidgetFont = ctk.CTkFont(family = FONT, size = 18)
-        self.smallestWidgetFontItalic = ctk.CTkFont(family = FONT, size = 18, slant = 'italic')
+        self.smallestWidgetFont = self.scaledFonts.get(FONT_SIZES[self.currentMode.value]['smallestFont'])
+        self.smallestWidgetFontItalic = self.scaledFonts.get(FONT_SIZES[self.currentMode.value]['smallestFont'], 'italic')
         
         # setup special number buttons
         for specialNumber, data in SCI_SPECIAL_NUMBER_BUTTONS.items():
@@ -427,143 +383,93 @@ class Calculator():
                     row = data['row'],
                     font = self.smallestWidgetFontItalic if data['font'] == 'italic' else self.smallestWidgetFont)
 
-    def exponentiate(self):
-        """ Appends an '**' operator to cumulative input, and updates display output with a formatted ('^') version. """
 
-        if self.cumulativeNumInputList: # ensure input exists
-            self.cumulativeNumInputList.append('**')
-        
-            # update display output
-            displayString = ''.join(self.cumulativeNumInputList)
-            formattedDisplayString = displayString.replace('**', '^')
-            self.cumulativeInputDisplayString.set(formattedDisplayString)
+class DisplayModel():
+    """ Buffers display text changes, committing them to bound StringVars once per event-loop tick (unchanged text skipped). """
 
-    def square(self):
-        """ Appends an '*' operator + the current cumulative input *to* the current cumulative input, and forces an immediate evaluation. """
+    def __init__(self, scheduler, stringVars):
+        """ scheduler: a Tk widget (after_idle); stringVars: display name -> StringVar. """
 
-        if self.cumulativeNumInputList: # ensure input exists
-            cumulativeInputStr = ''.join(self.cumulativeNumInputList)
-            self.cumulativeNumInputList.append('*' + cumulativeInputStr)
+        self.scheduler = scheduler
+        self.stringVars = stringVars
+        self.committed = {name: stringVar.get() for name, stringVar in stringVars.items()}
+        self.pending = {}
+        self.commitJob = None
 
-            # evaluate immediately
-            self.mathPressed('=')
+        # counters
+        self.requestedUpdates = 0 # update() calls, i.e. StringVar.set calls w/o this model
+        self.tkUpdates = 0 # StringVar.set calls actually made
+        self.commits = 0
 
-    def logarithms(self, base = None):
-        """ Evaluates base 10 or natural logarithm, rounds to keep result on screen, and updates data/display. """
+    def update(self, name, text):
+        """ Records a display's latest text; the last value per tick wins. """
 
-        if self.cumulativeNumInputList: # ensure input exists
-            try:
-                # get current number input as float
-                currentNumInputFloat = float(''.join(self.cumulativeNumInputList))
-                # evaluate log10 at maximum visible digits
-                logFunc = math.log10 if base == 10 else math.log
-                logResult = self.getResultDisplayStr(logFunc(currentNumInputFloat))
-
-            # error catching
-            except (SyntaxError, KeyError, ValueError):
-                    self.cumulativeInputDisplayString.set('ERROR')
-                    return
-
-            # update data
-            self.cumulativeNumInputList[0] = str(logResult)
-            # update display output
-            self.cumulativeInputDisplayString.set(str(logResult))
-            
-    def sciNotationFunc(self):
-        """ """
-        
-        if self.cumulativeNumInputList: # ensure have input
-            # get current number input as float
-            currentNumInputFloat = float(''.join(self.cumulativeNumInputList))
-            sciNotationResult = self.convertToSciNotation(currentNumInputFloat)
-            
-            # update display output
-            self.cumulativeInputDisplayString.set(sciNotationResult)
-            
-    def roundToMaxDigits(self, currentResult):
-        """ Formats evaluated result prior to display so as not to exceed window width. """
+        self.requestedUpdates += 1
+        self.pending[name] = text
+        if self.commitJob is None:
+            self.commitJob = self.scheduler.after_idle(self.commit)
 
-        # format evaluated result, if float
-        if isinstance(currentResult, float):
-            
-            # if result is a float, but has no fractional part, convert to int
-            if currentResult.is_integer():
-                currentResult = int(currentResult)
-  
-        numDigits = len(str(currentResult))
-        maxDigits = 8 if currentResult < 0 else 9
-        if numDigits > maxDigits:
-            allowedDigits = maxDigits - len(str(int(currentResult)))
-            currentResult = '{:.{precision}f}'.format(currentResult, precision = allowedDigits)
-
-        # strip trailing zeroes
-        currentResult = str(currentResult).rstrip('0')
-        
-        return currentResult
-    
-    def convertToSciNotation(self, value):
+    def commit(self):
+        """ Pushes pending text that differs from what's shown into the StringVars (one Tk trace + relayout each). """
+
+        self.commitJob = None
+        self.commits += 1
+        for name, text in self.pending.items():
+            if self.committed[name] != text:
+                self.committed[name] = text
+                self.stringVars[name].set(text)
+                self.tkUpdates += 1
+        self.pending.clear()
+
+    def stats(self):
+        """ Returns update counters, incl. how many Tk updates were saved by coalescing + skipping unchanged text. """
+
+        return {'requested': self.requestedUpdates, 'tkUpdates': self.tkUpdates,
+                'saved': self.requestedUpdates - self.tkUpdates, 'commits': self.commits}
+
+
+class ScaledFonts():
+    """ Fonts scaled to the window: one CTkFont per (base size, slant, scaled size bucket), created on first use + reused. """
+
+    def __init__(self):
         """ """
-        
-        # determine num digits in value, exponent once converted
-        valueStr = str(value)
-        numDigitsValue = len(valueStr)
-        exponent = numDigitsValue - 1
-        numDigitsExponent = len(str(exponent))
-        
-        # 10 chars is max visible in window; less 2 to account for 'e+' display; less 1 for '.'
-        isFloat = True if isinstance(value, float) else False
-        maxDigits = 8 if value < 0 else 9
-        nonNumericalChars = 2 if isFloat else 3
-        allowedDigits = maxDigits - nonNumericalChars - numDigitsExponent
-        
-        # get sci notation at allowed max visible digits
-        sciNotation = f"{Decimal(f'{value}'):.{allowedDigits}E}"
-        
-        # break up and format return string
-        significand = sciNotation.split('E')[0].rstrip('0').rstrip('.')
-        exponentSign = sciNotation.split('E')[1][0]
-        exponentValue = sciNotation.split('E')[1][1:]
-        if len(exponentValue) > 1 and exponentValue[0] == '0': exponentValue = exponentValue[1]
-        
-        return significand + 'e' + exponentSign + exponentValue
-             
-    def getResultDisplayStr(self, currentResult) -> str:
-        """ Formats string of evaluated result prior to display so as not to exceed window width. """
-        
-        # format evaluated result, if float
-        if isinstance(currentResult, float):
-            
-            # if result is a float, but has no fractional part, convert to int
-            if currentResult.is_integer():
-                currentResult = int(currentResult)
-                
-        # determine length; convert to sci notation for display if necessary
-        numDigits = len(str(currentResult))
-        #print(numDigits)
-        maxDigits = 8 if currentResult < 0 else 9
-        if numDigits > maxDigits:
-            
-                sciNotation =  f'%E' % Decimal(f'{currentResult}')
-                exponentSign = sciNotation.split('E')[1][0]
-                exponentValue = sciNotation.split('E')[1][1:]
-                
-                if exponentValue == '00':
-                    currentResult = self.roundToMaxDigits(currentResult)
-                elif exponentSign == '-' and exponentValue[1] < '4':
-                    currentResult = self.roundToMaxDigits(currentResult)
-                else:
-                    currentResult = self.convertToSciNotation(currentResult)
-        
-        return str(currentResult)  
-    
-    def getOperationDisplayStr(self, currentOperation) -> str:
-        """ """     
-        
-        # format any instances of exponentiation
-        formattedOperationStr = currentOperation.replace('**', '^')
-        
-        return formattedOperationStr
-        
+
+        self.scale = 1.0 # window size relative to WINDOW_SIZE
+        self.fonts = {} # (base size, slant, scaled size) -> CTkFont
+        self.baseFonts = {} # font name -> (base size, slant) (CTkFonts aren't hashable)
+
+    def getSize(self, baseSize):
+        """ baseSize at the current scale, rounded to a FONT_SIZE_STEP bucket. """
+
+        return max(FONT_SIZE_STEP, round(baseSize * self.scale / FONT_SIZE_STEP) * FONT_SIZE_STEP)
+
+    def get(self, baseSize, slant = 'roman'):
+        """ Returns the font for baseSize at the current scale. """
+
+        key = (baseSize, slant, self.getSize(baseSize))
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = ctk.CTkFont(family = FONT, size = key[2], slant = slant)
+            self.baseFonts[str(font)] = (baseSize, slant)
+        return font
+
+    def rescale(self, widgets):
+        """ Gives each widget w/ a scaled font the current scale's font (same base size + slant); returns the number swapped. """
+
+        swaps = 0
+        for widget in widgets:
+            try:
+                font = widget.cget('font')
+            except (ValueError, TclError): # no font option (e.g. frames)
+                continue
+            base = self.baseFonts.get(str(font))
+            if base is not None:
+                scaledFont = self.get(*base)
+                if scaledFont is not font:
+                    widget.configure(font = scaledFont)
+                    swaps += 1
+        return swaps
+
 
 class OutputDisplayLabel(ctk.CTkLabel):
     """ Label representing calculator output: last performed operation, operation result, etc. """
@@ -573,4 +479,4 @@ class OutputDisplayLabel(ctk.CTkLabel):
 
         # column span depends on CalcMode
         colSpan = NUM_ROWS_COLUMNS[currentMode.value]['columns']
-        self.grid(column = 0, columnspan = colSpan, row = row, sticky = anchor, padx = 15)
\ No newline at end of file
+        self.grid(column = 0, columnspan = colSpan, row = row, sticky = anchor, padx = OUTPUT_LABEL_PADX)
\ No newline at end of file
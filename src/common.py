@@ -13,7 +13,9 @@ class CalcMode(Enum):
     CM_SCIENTIFIC = "Scientific"
 
 # basic layout sizing
-WINDOW_SIZE = (400, 700)
+WINDOW_SIZE = (400, 700) # default; the window is resizable, w/ fonts scaled to its size (relative to this)
+MIN_WINDOW_SIZE = (300, 525)
+OUTPUT_LABEL_PADX = 15 # output display labels' horizontal padding (each side)
 NUM_ROWS_COLUMNS = {
     'Standard': {'rows': 7, 'columns': 4},
     'Programming': {'rows': 8, 'columns': 5},
@@ -24,10 +26,14 @@ NUM_ROWS_COLUMNS = {
 FONT = 'Helvetica'
 MODE_SWITCH_FONT_SIZE = 14
 FONT_SIZES = {
-    'Standard': {'largerFont': 70, 'smallerFont': 32},
-    'Programming': {'largerFont': 70, 'smallerFont': 32},
-    'Scientific': {'largerFont': 70, 'smallerFont': 32}
+    'Standard': {'largerFont': 70, 'smallerFont': 32, 'previewFont': 18, 'smallestFont': 18},
+    'Programming': {'largerFont': 70, 'smallerFont': 32, 'previewFont': 18, 'smallestFont': 18},
+    'Scientific': {'largerFont': 70, 'smallerFont': 32, 'previewFont': 18, 'smallestFont': 18}
 }
+FONT_SIZE_STEP = 2 # scaled font sizes are rounded to multiples of this, so fonts are reused across small resizes
+
+# window resizing: relayout (font scaling, display fitting) at most once per this many ms (~1 frame at 60 Hz)
+RELAYOUT_INTERVAL = 16
 
 # color definitions
 BLACK = '#000000'
@@ -49,10 +55,21 @@ COLORS = {
 
 BUTTON_STYLING = { 'gap': 0.5, 'corner-radius': 0}
 
+# staged startup build: steps (frame, output labels, digit pad) built synchronously when the calculator is created; the rest at idle
+FIRST_FRAME_BUILD_STEPS = 3
+
+# button images: load (+ pre-scale) all at startup, rather than on first use
+PRELOAD_IMAGE_ASSETS = False
+
+# background evaluation: default budget (user settings 'evaluationTimeLimit' / 'evaluationMaxPowerBits' override), result polling interval (ms)
+EVALUATION_BUDGET = {'timeLimit': 10.0, 'maxPowerBits': 4000000}
+EVALUATION_POLL_INTERVAL = 25
+
 # map of input keycodes to corresponding Calculator function and argument
 KEY_FUNCTION_MAP = {
     'Delete': {'function': 'clearAll'},
     'BackSpace': {'function': 'clearLast'},
+    'Escape': {'function': 'cancelEvaluation'},
     'Return': {'function': 'mathPressed', 'arg': '='},
     'plus': {'function': 'mathPressed', 'arg': '+'},
     'minus': {'function': 'mathPressed', 'arg': '-'},
@@ -189,3 +206,24 @@ BUTTON_LAYOUT_DATA = {
     'Programming': {'numberButtons': PROG_NUMBER_BUTTONS, 'mathButtons': PROG_MATH_BUTTONS, 'operatorButtons': PROG_OPERATOR_BUTTONS},
     'Scientific': {'numberButtons': SCI_NUMBER_BUTTONS, 'mathButtons': SCI_MATH_BUTTONS, 'operatorButtons': SCI_OPERATOR_BUTTONS}
 }
+
+# mode-specific key mappings (same format as KEY_FUNCTION_MAP), added to it while that mode is shown
+MODE_KEY_FUNCTION_MAPS = {
+    'Standard': {},
+    'Programming': {
+        'parenleft': {'function': 'numberPressed', 'arg': '('},
+        'parenright': {'function': 'numberPressed', 'arg': ')'},
+        # hex digit keys (a-f / A-F), only while their buttons are enabled
+        **{key: {'function': 'numberPressed', 'arg': digit}
+           for digit in 'ABCDEF' if PROG_NUMBER_BUTTONS[digit]['state'] == 'normal'
+           for key in (digit, digit.lower())}
+    },
+    'Scientific': {
+        'asciicircum': {'function': 'exponentiate'},
+        'parenleft': {'function': 'numberPressed', 'arg': '('},
+        'parenright': {'function': 'numberPressed', 'arg': ')'}
+    }
+}
+
+# key dispatch latency histogram: bucket upper bounds (microseconds); slower dispatches go in a final overflow bucket
+KEY_LATENCY_BUCKETS_US = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
@@ -0,0 +1,575 @@
+"""
+core.py: headless calculator state machine
+- owns number/operation input, data flags, evaluation, and display-string formatting
+- no Tk dependency: drive it directly (batch jobs, benchmarks) or through the Calculator view
+- subscribers are notified once per input event, only when display output changed
+- potentially slow evaluations can be handed to an evaluation backend (e.g. a background worker) + completed later
+- displays are fitted to their rendered width once the view sets DisplayFits (see displayfit.py); else character counts
+"""
+
+from functools import wraps
+import math
+
+from engine import (PREVIEW_POWER_BITS, ExpressionError, IncrementalEvaluator, evaluateExpression, insertImplicitMultiplication,
+                    isPotentiallySlow, splitEntries)
+from displayfit import DisplayFit
+from formatting import *
+from inputbuffer import InputBuffer
+from instrumentation import instrumented
+
+
+# CalculatorCore input event methods (forwarded by the Tk Calculator view), incl. the evaluation backend's results
+CORE_EVENTS = ('clearAll', 'clearLast', 'percentage', 'invert', 'numberPressed', 'mathPressed',
+               'exponentiate', 'square', 'logarithms', 'sciNotationFunc', 'cancelEvaluation', 'ingest', 'setDisplayFits',
+               'completeEvaluation')
+
+# events that act on (or leave alone) a pending (backend) evaluation instead of superseding it
+EVALUATION_EVENTS = ('completeEvaluation', 'cancelEvaluation', 'setDisplayFits')
+
+# preview display while a backend evaluation is pending
+COMPUTING_DISPLAY = 'computing\u2026'
+
+# ingested (e.g. pasted) text: display/typographic operators -> entry operators; thousands separators dropped
+INGEST_TRANSLATION = str.maketrans({'\u00D7': '*', 'x': '*', 'X': '*', '\u00F7': '/', '\u2212': '-', ',': None})
+
+
+def coreEvent(method):
+    """ Marks a CalculatorCore method as an input event: preview + subscribers update once, after the outermost event returns. """
+
+    @wraps(method)
+    def wrapper(self, *args):
+        # new input supersedes a pending backend evaluation (its result would apply to stale state)
+        if self.pendingEvaluation is not None and not self.eventDepth and method.__name__ not in EVALUATION_EVENTS:
+            self.abandonEvaluation()
+        self.eventDepth += 1
+        try:
+            return method(self, *args)
+        finally:
+            self.eventDepth -= 1
+            if not self.eventDepth:
+                self.refreshPreview()
+                self.publish()
+    return wrapper
+
+
+class CalculatorCore():
+    """ Display-independent calculator logic; the Tk Calculator is a thin view subscribed to it. """
+
+    def __init__(self, livePreview = True):
+        """ livePreview: maintain previewDisplay (running result) on every event; batch users can skip that cost. """
+
+        # display output
+        self.inputDisplay = '0'
+        self.operationDisplay = ''
+        self.previewDisplay = ''
+
+        # data
+        self.cumulativeNumInput = InputBuffer()
+        self.lastCumulativeNumInput = InputBuffer()
+        self.cumulativeOperationList = []
+        self.livePreview = livePreview
+        self.previewEvaluator = IncrementalEvaluator(PREVIEW_POWER_BITS) # folds committed operations; live preview only re-evaluates pending input
+
+        # display widths (DisplayFit per display); None: fixed character-count limits
+        self.inputFit = None
+        self.previewFit = None
+
+        # optional evaluation backend: any object w/ submit(operation) + cancel(); results come back via completeEvaluation
+        self.evaluationBackend = None
+        self.pendingEvaluation = None # operation submitted to the backend, awaiting its result
+        self.preEvaluationState = None # (operation list, flags) as they were before '=', restored if the evaluation is dropped
+
+        # data flags
+        self.lastInputWasNum = False
+        self.lastOperationWasEval = False
+        self.skipAddingLastNumInputToOperation = False
+
+        # state change notification
+        self.subscribers = []
+        self.eventDepth = 0
+        self.publishedState = self.getDisplayState()
+
+    def subscribe(self, callback):
+        """ Registers callback(core), called after any input event that changes display output. """
+
+        self.subscribers.append(callback)
+        callback(self)
+
+    def getDisplayState(self):
+        """ Returns current (input, operation, preview) display strings. """
+
+        return (self.inputDisplay, self.operationDisplay, self.previewDisplay)
+
+    def publish(self):
+        """ Notifies subscribers if display output changed since the last notification. """
+
+        state = self.getDisplayState()
+        if state != self.publishedState:
+            self.publishedState = state
+            for callback in self.subscribers:
+                callback(self)
+
+    # event-style API
+    def pressDigit(self, value):
+        """ Enters a digit, '.', or special number (e.g. pi) - same as numberPressed. """
+        self.numberPressed(value)
+
+    def pressOp(self, value):
+        """ Enters a math operator ('+', '-', '*', '/', or '=') - same as mathPressed. """
+        self.mathPressed(value)
+
+    def evaluate(self):
+        """ Evaluates the cumulative operation - same as pressing '='. """
+        self.mathPressed('=')
+
+    @coreEvent
+    def clearAll(self):
+        """ Resets output and data to default state. """
+
+        # clear display output - set to defaults
+        self.inputDisplay = '0'
+        self.operationDisplay = ''
+
+        # clear data
+        self.cumulativeNumInput.clear()
+        self.cumulativeOperationList.clear()
+
+    @coreEvent
+    def clearLast(self):
+        """ Removes single most recent input (number or operator). """
+
+        # if last input was '=', do nothing
+        if self.lastOperationWasEval and not self.lastInputWasNum:
+            return 
+
+        if self.lastInputWasNum:
+            # remove last num input from data (a '-' left on its own goes w/ it)
+            if self.cumulativeNumInput:
+                self.cumulativeNumInput.pop()
+
+                # if still values present, update display output appropriately
+                if self.cumulativeNumInput:
+                    self.inputDisplay = self.getInputDisplayStr()
+                else: # if now empty, set to 0 default display value
+                    self.inputDisplay = '0'
+
+        # if there's been no input at all, do nothing
+        elif len(self.cumulativeOperationList) == 0: 
+            return
+
+        else: # last input was non-(=) math operator
+            
+            # remove last operator input from data
+            *self.cumulativeOperationList,_ = self.cumulativeOperationList
+            self.previewEvaluator.invalidate()
+
+            # update relevant data
+            self.cumulativeNumInput = self.lastCumulativeNumInput.copy() # restore previous, prior to clear when math operated pressed
+            self.skipAddingLastNumInputToOperation = True # avoiding duplicates
+
+            # update display output
+            self.operationDisplay = ' '.join(self.cumulativeOperationList)
+        
+    @coreEvent
+    def percentage(self):
+        """ Divides current number input / result value by 100. """
+
+        if self.cumulativeNumInput:
+            # get current number input as float
+            currentNumInputFloat = self.cumulativeNumInput.value
+
+            # convert to percentage
+            currentPercentFloat = currentNumInputFloat / 100
+            self.cumulativeNumInput.set(str(currentPercentFloat))
+
+            # update display output
+            self.inputDisplay = self.cumulativeNumInput.text
+
+    @coreEvent
+    def invert(self):
+        """ Flips sign of current number input / result. """
+
+        if self.cumulativeNumInput: # if input exists
+            # get current number input as float and its length
+            currentNumInputFloat = self.cumulativeNumInput.value
+            currentNumInputLength = len(self.cumulativeNumInput)
+
+            isPositive = True if currentNumInputFloat > 0 else False
+            # flip sign + update data (zero has no sign to flip)
+            if isPositive or self.cumulativeNumInput.negative:
+                self.cumulativeNumInput.negate()
+        
+            # update display output
+            if self.inputFit is not None: # fitted to display width: reformat (keeping sci notation, if shown)
+                displayStr = self.inputDisplay
+                if 'e' in displayStr:
+                    flippedStr = displayStr[1:] if displayStr.startswith('-') else '-' + displayStr
+                    if not self.inputFit.fits(flippedStr):
+                        flippedStr = convertToSciNotation(self.cumulativeNumInput.value, self.inputFit)
+                    self.inputDisplay = flippedStr
+                else:
+                    self.inputDisplay = self.getInputDisplayStr()
+                return
+
+            # set base str object to deal with
+            formattedStr = self.cumulativeNumInput.text
+            # if positive, and adding a '-' will push us outside maximum window width, shorten first
+            if isPositive and currentNumInputLength > 9:
+                formattedStr = getResultDisplayStr(-currentNumInputFloat)
+   
+            # check for pre-existing sci notation
+            if 'e' in self.inputDisplay:
+                sciNotation = self.inputDisplay
+                if isPositive:
+                    if len(sciNotation) > 9:
+                    # break up and format shortened string
+                        significand = sciNotation.split('e')[0].rstrip('0').rstrip('.')
+                        exponentSign = sciNotation.split('e')[1][0]
+                        exponentValue = sciNotation.split('e')[1][1:]
+                        
+                        significandLength = len(significand)
+                        # less 2 to get the number of fractional digits
+                        significandPrecision = significandLength - 2
+                        roundedSignificand = round(float(significand), significandPrecision - 1)
+        
+                        formattedSciNotation = str(roundedSignificand) + 'e' + exponentSign + exponentValue
+                        flippedSciNotation = '-' + formattedSciNotation
+                    else:
+                        flippedSciNotation = '-' + sciNotation            
+                else:
+                    flippedSciNotation = sciNotation[1:]
+                self.inputDisplay = flippedSciNotation
+            
+            else:
+                self.inputDisplay = formattedStr
+
+    @instrumented('core.numberPressed')
+    @coreEvent
+    def numberPressed(self, value):
+        """ Handles numerical input. """
+
+        # each input value added to buffer (positioned to right of last input)
+        self.cumulativeNumInput.append(value)
+        self.inputDisplay = self.getInputDisplayStr()
+
+        # update tracking data
+        self.lastInputWasNum = True
+
+    @instrumented('core.mathPressed')
+    @coreEvent
+    def mathPressed(self, value):
+        """
+        Handles math operator input. 
+        This includes processing duplicate inputs and additional (but different) operator inputs back to back.
+        """
+
+        # check if last input was also a non-evaluating math operation
+        if not self.lastInputWasNum and not self.lastOperationWasEval and self.cumulativeNumInput: # do not proceed if no num input exists:
+            if self.cumulativeOperationList[-1] == value:
+                return # can't input same operation twice
+            
+            else:
+                # replace last input operation with new operation
+                self.clearLast()
+                self.skipAddingLastNumInputToOperation = False
+
+                # update data
+                self.cumulativeOperationList.append(value)
+                self.cumulativeNumInput.clear()
+                
+                # update display output
+                self.inputDisplay = ''
+                self.operationDisplay = ' '.join(self.cumulativeOperationList)
+    
+                return
+
+        # state before '=' (restored if its evaluation goes to the backend + is then cancelled/superseded)
+        if value == '=':
+            preEvaluationState = (list(self.cumulativeOperationList), self.skipAddingLastNumInputToOperation, self.lastInputWasNum)
+
+        # get the cumulative number input + append to cumulative operation list
+        currentCumulativeNumInput = self.cumulativeNumInput.text
+        if not self.skipAddingLastNumInputToOperation:
+            self.cumulativeOperationList.append(currentCumulativeNumInput)
+
+        else: # reset flag
+            self.skipAddingLastNumInputToOperation = False
+
+        # update input tracking flag
+        self.lastInputWasNum = False 
+
+        if currentCumulativeNumInput: # do not proceed if no num input exists
+            if value != '=': # special case
+
+                # update data
+                self.cumulativeOperationList.append(value)
+                self.lastCumulativeNumInput = self.cumulativeNumInput # store in case operation is canceled
+                self.cumulativeNumInput = InputBuffer()
+                self.lastOperationWasEval = False
+                
+                # update display output
+                self.inputDisplay = ''
+                self.operationDisplay = ' '.join(self.cumulativeOperationList)
+
+            else: # value was '='
+                
+                # get operation
+                currentCumulativeOperation = ''.join(self.cumulativeOperationList)
+                # parse
+                currentCumulativeOperation = self.parseParentheses(currentCumulativeOperation)
+
+                # hand potentially slow operations to the backend, if any; result arrives via completeEvaluation
+                if self.evaluationBackend is not None and isPotentiallySlow(currentCumulativeOperation):
+                    self.pendingEvaluation = currentCumulativeOperation
+                    self.preEvaluationState = preEvaluationState
+                    self.evaluationBackend.submit(currentCumulativeOperation)
+                    return
+
+                # evaluate
+                try:
+                    currentResult = evaluateExpression(currentCumulativeOperation)
+                    resultStr, resultDisplayStr = getResultText(currentResult), getResultDisplayStr(currentResult, self.inputFit)
+                # error catching
+                except (ExpressionError, ValueError): # ValueError: e.g. an operand too long to parse as an int
+                    self.inputDisplay = 'ERROR'
+                    return
+
+                self.applyEvaluationResult(currentCumulativeOperation, resultStr, resultDisplayStr)
+
+    @coreEvent
+    def ingest(self, text):
+        """
+        Enters a whole operation string (e.g. pasted) in one pass, as if typed: operands become number input,
+        '+ - * /' become operator presses, and a trailing '=' evaluates. Display/preview refresh once, at the end.
+        A leading operator continues from existing input (e.g. '*2' onto a result) or replaces a pending operator.
+        Returns False (nothing entered) if text isn't a valid operation string, incl. operator runs ('2++3') + an unmatched ')'.
+        """
+
+        text = text.translate(INGEST_TRANSLATION).strip()
+        evaluate = text.endswith('=')
+        if evaluate:
+            text = text[:-1]
+
+        pendingOperator = not self.cumulativeNumInput and bool(self.cumulativeOperationList) and not self.lastOperationWasEval
+        try:
+            entries = splitEntries(text, continuing = bool(self.cumulativeNumInput) or pendingOperator)
+        except ExpressionError:
+            return False
+
+        # an operand pasted over a shown result starts new input
+        if entries[0] and self.lastOperationWasEval and not self.lastInputWasNum:
+            self.cumulativeNumInput.clear()
+
+        self.enterOperand(entries[0])
+        if len(entries) > 1:
+            if not entries[0] and pendingOperator: # e.g. '*3' after '5 +' -> '5 * 3'
+                self.cumulativeOperationList[-1] = entries[1]
+                self.previewEvaluator.invalidate()
+                self.operationDisplay = ' '.join(self.cumulativeOperationList)
+            else:
+                self.mathPressed(entries[1]) # first operator as if pressed
+
+            # middle operand/operator pairs are always non-empty: append them directly + join the operation display once
+            # (pressing them one by one rejoins the whole operation each time)
+            middleEntries = entries[2:-1]
+            if middleEntries:
+                self.cumulativeOperationList.extend(middleEntries)
+                self.lastCumulativeNumInput = InputBuffer(middleEntries[-2])
+                self.operationDisplay = ' '.join(self.cumulativeOperationList)
+            self.enterOperand(entries[-1])
+        if evaluate:
+            self.mathPressed('=')
+        return True
+
+    def enterOperand(self, text):
+        """ Appends operand text to number input in one step (cf. numberPressed per character), updating the input display once. """
+
+        if not text:
+            return
+        self.cumulativeNumInput.extend(text) # per character, so backspace still removes one at a time
+        self.lastInputWasNum = True
+        self.inputDisplay = self.getInputDisplayStr()
+
+    def getInputDisplayStr(self):
+        """ Formats number input for display: '^' for exponentiation; shortened (as a value) if too long to fit. """
+
+        numInput = self.cumulativeNumInput
+        fit = self.inputFit
+        # numbers: length + value are kept by the buffer, so long input doesn't have to be rejoined + reparsed
+        # (input longer than fit.maxChars can't fit, so isn't measured either)
+        if numInput.isNumber():
+            if fit is None:
+                return getResultDisplayStr(numInput.value) if numInput.length > 9 else numInput.text
+            return numInput.text if numInput.length <= fit.maxChars and fit.fits(numInput.text) else getResultDisplayStr(numInput.value, fit)
+
+        formattedDisplayString = numInput.text.replace('**', '^')
+        if (len(formattedDisplayString) > 9) if fit is None else not fit.fits(formattedDisplayString):
+            try:
+                formattedDisplayString = getResultDisplayStr(float(formattedDisplayString), fit)
+            except ValueError: # not a plain value (e.g. '(2+3)'): show as entered
+                pass
+        return formattedDisplayString
+
+    def applyEvaluationResult(self, currentCumulativeOperation, resultStr, resultDisplayStr):
+        """ Updates data/display output w/ an evaluated operation's result. """
+
+        # update data
+        self.lastOperationWasEval = True
+        self.cumulativeOperationList.clear()
+        self.cumulativeNumInput.set(resultStr) # empty + update w/ result
+
+        # update display output: result
+        self.inputDisplay = resultDisplayStr
+        # update display output: cumulative operation
+        operationDisplayStr = getOperationDisplayStr(currentCumulativeOperation)
+        self.operationDisplay = operationDisplayStr
+
+    @coreEvent
+    def completeEvaluation(self, operation, resultStr, resultDisplayStr, error = None):
+        """ Applies a backend evaluation's result (or error); ignored if that evaluation is no longer pending. """
+
+        if operation != self.pendingEvaluation:
+            return
+        self.pendingEvaluation = None
+        self.preEvaluationState = None
+
+        if error is not None:
+            self.inputDisplay = 'ERROR'
+            return
+        if self.inputFit is not None: # backend formats for the character-count limits: refit from the result's text
+            resultDisplayStr = fitResultText(resultStr, self.inputFit)
+        self.applyEvaluationResult(operation, resultStr, resultDisplayStr)
+
+    @coreEvent
+    def cancelEvaluation(self):
+        """ Aborts a pending backend evaluation, leaving input as it was before '='. """
+
+        if self.pendingEvaluation is not None:
+            self.abandonEvaluation()
+
+    @coreEvent
+    def setDisplayFits(self, inputFit, previewFit):
+        """ Sets the input + preview displays' DisplayFits (or None, or their toDict() forms, e.g. from a recorded trace). """
+
+        self.inputFit = DisplayFit.fromDict(inputFit) if isinstance(inputFit, dict) else inputFit
+        self.previewFit = DisplayFit.fromDict(previewFit) if isinstance(previewFit, dict) else previewFit
+
+        # refit shown number input now (the preview refreshes after every event)
+        if self.cumulativeNumInput and self.lastInputWasNum:
+            self.inputDisplay = self.getInputDisplayStr()
+
+    def abandonEvaluation(self):
+        """ Drops the pending evaluation + stops the backend's job, restoring input as it was before '='. """
+
+        self.pendingEvaluation = None
+        self.evaluationBackend.cancel()
+
+        # '=' already appended the number input to the operation: undo that (number input itself was left as is)
+        self.cumulativeOperationList, self.skipAddingLastNumInputToOperation, self.lastInputWasNum = self.preEvaluationState
+        self.preEvaluationState = None
+        self.previewEvaluator.invalidate()
+
+    def refreshPreview(self):
+        """ Updates the live result preview, re-evaluating only the pending number input against the folded committed operation. """
+
+        if self.pendingEvaluation is not None:
+            self.previewDisplay = COMPUTING_DISPLAY
+            return
+        if not self.livePreview:
+            self.previewDisplay = ''
+            return
+
+        # sync committed state: fold newly appended operation items; rebuild only if items were removed
+        self.previewEvaluator.sync(self.cumulativeOperationList)
+
+        # only preview once an operation is underway (otherwise it would just echo the input display)
+        operationList = self.cumulativeOperationList
+        if not operationList or (self.skipAddingLastNumInputToOperation and len(operationList) == 1):
+            previewValue = None
+        else:
+            previewValue = self.getPendingPreview()
+        try:
+            previewStr = '' if previewValue is None else '= ' + getResultDisplayStr(previewValue, self.previewFit)
+        except ValueError: # e.g. int too large to convert to str
+            previewStr = ''
+        self.previewDisplay = previewStr
+
+    def getPendingPreview(self):
+        """ Previews committed state + number input; number input is passed as tokens when possible (no rejoin/re-tokenize). """
+
+        if self.skipAddingLastNumInputToOperation: # number input is already the operation's last entry (its operator was cleared)
+            return self.previewEvaluator.previewTokens(())
+        try:
+            pendingTokens = self.cumulativeNumInput.getTokens()
+        except ValueError: # not a valid number, e.g. '.'
+            return None
+        if pendingTokens is None:
+            return self.previewEvaluator.preview(self.cumulativeNumInput.text)
+        return self.previewEvaluator.previewTokens(pendingTokens)
+
+    @instrumented('core.parseParentheses')
+    def parseParentheses(self, currentCumulativeOperation):
+        """ 
+        Parses operation for implicit multiplication, e.g., '2(3)', '(2)3', ')(', '2π', 'e(', or '2log(3)'.
+        Inserts '*' operators as needed in a single linear pass over the operation's tokens.
+        """
+
+        return insertImplicitMultiplication(currentCumulativeOperation)
+
+    @coreEvent
+    def exponentiate(self):
+        """ Appends an '**' operator to cumulative input, and updates display output with a formatted ('^') version. """
+
+        if self.cumulativeNumInput: # ensure input exists
+            self.cumulativeNumInput.append('**')
+        
+            # update display output
+            displayString = self.cumulativeNumInput.text
+            formattedDisplayString = displayString.replace('**', '^')
+            self.inputDisplay = formattedDisplayString
+
+    @coreEvent
+    def square(self):
+        """ Appends an '*' operator + the current cumulative input *to* the current cumulative input, and forces an immediate evaluation. """
+
+        if self.cumulativeNumInput: # ensure input exists
+            cumulativeInputStr = self.cumulativeNumInput.text
+            self.cumulativeNumInput.append('*' + cumulativeInputStr)
+
+            # evaluate immediately
+            self.mathPressed('=')
+
+    @coreEvent
+    def logarithms(self, base = None):
+        """ Evaluates base 10 or natural logarithm, rounds to keep result on screen, and updates data/display. """
+
+        if self.cumulativeNumInput: # ensure input exists
+            try:
+                # get current number input as float
+                currentNumInputFloat = self.cumulativeNumInput.value
+                # evaluate log10 at maximum visible digits
+                logFunc = math.log10 if base == 10 else math.log
+                logResult = getResultDisplayStr(logFunc(currentNumInputFloat), self.inputFit)
+
+            # error catching
+            except (SyntaxError, KeyError, ValueError):
+                    self.inputDisplay = 'ERROR'
+                    return
+
+            # update data
+            self.cumulativeNumInput.set(str(logResult))
+            # update display output
+            self.inputDisplay = str(logResult)
+            
+    @coreEvent
+    def sciNotationFunc(self):
+        """ """
+        
+        if self.cumulativeNumInput: # ensure have input
+            # get current number input as float
+            currentNumInputFloat = self.cumulativeNumInput.value
+            sciNotationResult = convertToSciNotation(currentNumInputFloat, self.inputFit)
+            
+            # update display output
+            self.inputDisplay = sciNotationResult
+            
@@ -0,0 +1,71 @@
+"""
+displayfit.py: pixel-width display fitting
+- a DisplayFit is one output display's width budget + its font's glyph widths: text fits if its glyph widths sum within it
+- glyph widths are measured once per font family/size/weight/slant (a Tk font.measure call per glyph) + cached,
+  so fitting a string is a table lookup per character, w/o Tk round trips
+- no Tk dependency: fonts are duck-typed (cget + measure), fits can be rebuilt from plain dicts (e.g. recorded in a trace)
+- w/o a fit, formatting + core fall back to the fixed character-count limits (see formatting.py)
+"""
+
+
+# characters output displays can show (others are assumed as wide as the widest of these)
+DISPLAY_GLYPHS = '0123456789.-+e^*/() ' + 'infaERO'
+DIGITS = '0123456789'
+
+# font description -> {glyph: width}
+glyphWidthCache = {}
+
+
+def measureGlyphs(font):
+    """ Returns {glyph: width in pixels} for font (a Tk/CTk font), measured once per family/size/weight/slant. """
+
+    key = tuple(font.cget(option) for option in ('family', 'size', 'weight', 'slant'))
+    glyphWidths = glyphWidthCache.get(key)
+    if glyphWidths is None:
+        glyphWidths = glyphWidthCache[key] = {glyph: font.measure(glyph) for glyph in DISPLAY_GLYPHS}
+    return glyphWidths
+
+
+class DisplayFit():
+    """ Width budget of one output display, in its font's glyph widths. """
+
+    def __init__(self, glyphWidths, width, reserved = ''):
+        """ glyphWidths: {glyph: width}; width: available pixels; reserved: text always shown alongside (e.g. '= '). """
+
+        self.glyphWidths = dict(glyphWidths)
+        self.fullWidth = width
+        self.reserved = reserved
+        self.defaultGlyphWidth = max(self.glyphWidths.values()) # unmeasured glyphs
+        self.width = width - self.measure(reserved)
+
+        # no text longer than this can fit (lets long input skip measuring)
+        self.minGlyphWidth = max(1, min(self.glyphWidths.values()))
+        self.maxChars = max(0, self.width) // self.minGlyphWidth
+        self.minDigitWidth = max(1, min(self.glyphWidths.get(digit, self.defaultGlyphWidth) for digit in DIGITS))
+
+    def measure(self, text):
+        """ Rendered width of text. """
+
+        glyphWidths, default = self.glyphWidths, self.defaultGlyphWidth
+        return sum([glyphWidths.get(char, default) for char in text])
+
+    def fits(self, text):
+        """ True if text fits the display. """
+
+        return len(text) <= self.maxChars and self.measure(text) <= self.width
+
+    def maxDigits(self, fixedText):
+        """ Upper bound on how many digits fit beside fixedText. """
+
+        return max(0, (self.width - self.measure(fixedText)) // self.minDigitWidth)
+
+    def toDict(self):
+        """ Plain (JSON-able) form; DisplayFit.fromDict rebuilds it. """
+
+        return {'glyphWidths': self.glyphWidths, 'width': self.fullWidth, 'reserved': self.reserved}
+
+    @classmethod
+    def fromDict(cls, data):
+        """ """
+
+        return cls(data['glyphWidths'], data['width'], data.get('reserved', ''))
@@ -0,0 +1,631 @@
+"""
+engine.py:
+- calculator expression engine (replaces per-press simple_eval)
+- single-pass tokenizer + Pratt (precedence-climbing) parser
+- linear-time implicit multiplication rewriter (e.g. '2(3)' -> '2*(3)')
+- compiles operation strings to closure trees, evaluated without re-parsing
+- bounded LRU cache of normalized operation text -> compiled form + result
+"""
+
+from collections import OrderedDict
+import math
+import operator
+import re
+
+from instrumentation import instrumentation, instrumented
+
+
+# largest exact-int '**' result allowed, in bits (~1.2 million digits; estimated before computing)
+MAX_POWER_BITS = 4000000
+# tighter limit for work done on every keypress (live previews), keeping the UI thread responsive
+PREVIEW_POWER_BITS = 65536
+
+# binding powers: higher binds tighter
+BINDING_POWERS = {'+': 10, '-': 10, '*': 20, '/': 20, '%': 20, '**': 40}
+UNARY_BINDING_POWER = 30 # above * and /, below ** (so -2**2 == -(2**2))
+
+# token kinds
+TK_NUMBER = 'number'
+TK_CONSTANT = 'constant'
+TK_FUNCTION = 'function'
+TK_OPERATOR = 'operator'
+TK_LEFT_PAREN = '('
+TK_RIGHT_PAREN = ')'
+TK_END = 'end'
+
+CONSTANTS = {
+    'pi': math.pi, 'π': math.pi, '\N{MATHEMATICAL ITALIC SMALL PI}': math.pi,
+    'e': math.e, '\N{MATHEMATICAL ITALIC SMALL E}': math.e
+}
+FUNCTIONS = {'log': math.log10, 'ln': math.log}
+
+# numbers (incl. exponent notation), '**', function/constant names, or any other single character
+TOKEN_PATTERN = re.compile(r'(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|\*\*|log|ln|pi|\S', re.ASCII)
+
+# tokens w/ a fixed (kind, value), looked up directly
+FIXED_TOKENS = {
+    **{op: (TK_OPERATOR, op) for op in ('+', '-', '*', '/', '%', '**')},
+    '^': (TK_OPERATOR, '**'), # display form of exponentiation
+    '(': (TK_LEFT_PAREN, '('), ')': (TK_RIGHT_PAREN, ')'),
+    **{name: (TK_FUNCTION, function) for name, function in FUNCTIONS.items()},
+    **{name: (TK_CONSTANT, value) for name, value in CONSTANTS.items()}
+}
+NUMBER_START_CHARS = frozenset('0123456789.')
+
+# token kinds that start an implicitly multiplied operand, and kinds after which a bare number does
+IMPLICIT_OPERAND_KINDS = frozenset((TK_LEFT_PAREN, TK_CONSTANT, TK_FUNCTION))
+IMPLICIT_LEFT_KINDS = frozenset((TK_RIGHT_PAREN, TK_CONSTANT))
+
+
+class ExpressionError(Exception):
+    """ Raised when an operation string cannot be tokenized, parsed, or safely evaluated. """
+
+
+def tokenize(text):
+    """ Splits an operation string into (kind, value) tokens in a single left-to-right pass. """
+
+    tokens = []
+    append = tokens.append
+    fixedToken = FIXED_TOKENS.get
+
+    for lexeme in TOKEN_PATTERN.findall(text):
+        token = fixedToken(lexeme)
+        if token:
+            append(token)
+        elif lexeme[0] in NUMBER_START_CHARS and lexeme != '.':
+            append((TK_NUMBER, int(lexeme) if lexeme.isdigit() else float(lexeme)))
+        else:
+            raise ExpressionError(f'unexpected character {lexeme!r}')
+
+    append((TK_END, None))
+    return tokens
+
+
+def insertImplicitMultiplication(text):
+    """
+    Makes implicit multiplication explicit in a single token-level sweep (O(n), no re-slicing), e.g.
+    '2(3)' -> '2*(3)', '(1)(2)' -> '(1)*(2)', '(1)2' -> '(1)*2', '2π' -> '2*π', 'e(2)' -> 'e*(2)', '2log(100)' -> '2*log(100)'.
+    """
+
+    output = []
+    append = output.append
+    fixedToken = FIXED_TOKENS.get
+    previousKind = None
+
+    for lexeme in TOKEN_PATTERN.findall(text):
+        token = fixedToken(lexeme)
+        kind = token[0] if token else (TK_NUMBER if lexeme[0] in NUMBER_START_CHARS else None)
+
+        # same adjacency rules the parser applies (two bare numbers are left alone, e.g. '2 3' stays an error)
+        if kind in IMPLICIT_OPERAND_KINDS or kind == TK_NUMBER:
+            if previousKind in IMPLICIT_LEFT_KINDS or (previousKind == TK_NUMBER and kind != TK_NUMBER):
+                append('*')
+            elif previousKind == TK_NUMBER: # keep separated, not merged into one number
+                append(' ')
+
+        append(lexeme)
+        previousKind = kind
+
+    return ''.join(output)
+
+
+# binary operators entered as separate calculator entries (mathPressed), + token kinds that can end an operand
+ENTRY_OPERATORS = frozenset('+-*/')
+OPERAND_END_KINDS = frozenset((TK_NUMBER, TK_CONSTANT, TK_RIGHT_PAREN))
+
+
+def splitEntries(text, continuing = False):
+    """
+    Splits operation text into alternating operand/operator entries (as they'd be typed) in one token pass, e.g.
+    '12*(2+3)-4' -> ['12', '*', '(2+3)', '-', '4']; '2+' -> ['2', '+', ''].
+    Operators inside parentheses, '**'/'^', and a single '-' sign (e.g. in '2*-3' or '2^-1') stay within operands.
+    continuing: a leading operator applies to input entered before text (-> first operand is '').
+    Raises ExpressionError for unknown characters, misplaced operators, operator runs (e.g. '2++3', '2*/3', '2*^3'),
+    or an unmatched ')'.
+    """
+
+    entries = []
+    fixedToken = FIXED_TOKENS.get
+    operandStart = 0
+    depth = 0
+    previousKind = None # within the current operand
+    previousLexeme = None
+
+    for match in TOKEN_PATTERN.finditer(text):
+        lexeme = match.group()
+        token = fixedToken(lexeme)
+        if token:
+            kind = token[0]
+        elif lexeme[0] in NUMBER_START_CHARS and lexeme != '.':
+            kind = TK_NUMBER
+        else:
+            raise ExpressionError(f'unexpected character {lexeme!r}')
+
+        if depth == 0 and lexeme in ENTRY_OPERATORS:
+            if previousKind in OPERAND_END_KINDS or (continuing and previousKind is None and not entries):
+                entries.append(text[operandStart:match.start()].strip())
+                entries.append(lexeme)
+                operandStart = match.end()
+                previousKind = None
+                continue
+            # a single '-' sign may start an operand, an exponent, or a function's argument; anything else is an operator run
+            if lexeme != '-' or not (previousKind is None or previousKind == TK_FUNCTION or previousLexeme in ('**', '^')):
+                raise ExpressionError(f'unexpected {lexeme!r}')
+        elif depth == 0 and lexeme in ('**', '^') and previousKind not in OPERAND_END_KINDS: # e.g. '2*^3', '5+' then '**3'
+            raise ExpressionError(f'unexpected {lexeme!r}')
+
+        if kind == TK_LEFT_PAREN:
+            depth += 1
+        elif kind == TK_RIGHT_PAREN:
+            if not depth:
+                raise ExpressionError("unmatched ')'")
+            depth -= 1
+        previousKind = kind
+        previousLexeme = lexeme
+
+    entries.append(text[operandStart:].strip())
+    return entries
+
+
+def safePower(base, exponent, maxBits = None):
+    """ Exponentiation guarded against runaway results (by estimated size, MAX_POWER_BITS unless given) and complex results. """
+
+    # only exact int powers can run away (float powers overflow quickly instead)
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 and abs(base) > 1:
+        maxBits = MAX_POWER_BITS if maxBits is None else maxBits
+        if math.log2(abs(base)) * exponent > maxBits:
+            raise ExpressionError(f'** result would exceed {maxBits} bits')
+    result = base ** exponent
+    if isinstance(result, complex):
+        raise ExpressionError('** has no real result')
+    return result
+
+
+def isPotentiallySlow(text, maxBits = PREVIEW_POWER_BITS):
+    """
+    True if evaluating text may take noticeable time: only exact-int powers can grow huge from a few keypresses.
+    Powers of number literals are estimated (as in safePower) against maxBits (default: the live preview's budget,
+    which the UI thread already handles per keypress); any other power (e.g. '(2+3)**99', '2**3**4') counts as slow.
+    """
+
+    if '**' not in text and '^' not in text:
+        return False
+    try:
+        tokens = tokenize(text)
+    except (ExpressionError, ValueError): # fails fast when evaluated, too
+        return False
+
+    for index, (kind, value) in enumerate(tokens):
+        if kind != TK_OPERATOR or value != '**':
+            continue
+        base, exponent, following = tokens[index - 1], tokens[index + 1], tokens[min(index + 2, len(tokens) - 1)]
+        if index == 0 or exponent[0] == TK_END: # missing operand: fails fast when evaluated
+            continue
+        if base[0] != TK_NUMBER or exponent[0] != TK_NUMBER or following == FIXED_TOKENS['**']:
+            return True # size can't be told from literals
+        base, exponent = base[1], exponent[1]
+        if isinstance(base, int) and isinstance(exponent, int) and abs(base) > 1 and math.log2(abs(base)) * exponent > maxBits:
+            return True
+    return False
+
+
+BINARY_FUNCTIONS = {
+    '+': operator.add, '-': operator.sub, '*': operator.mul,
+    '/': operator.truediv, '%': operator.mod, '**': safePower
+}
+
+
+class Parser():
+    """ Pratt parser turning a token list into a tree of zero-argument closures. """
+
+    def __init__(self, tokens):
+        """ """
+
+        self.tokens = tokens
+        self.position = 0
+
+    def parse(self):
+        """ Parses the full token list, returning the root closure. """
+
+        if self.tokens[0][0] == TK_END:
+            raise ExpressionError('empty expression')
+        node = self.parseExpression(0)
+        if self.tokens[self.position][0] != TK_END:
+            raise ExpressionError(f'unexpected {self.tokens[self.position][1]!r}')
+        return node
+
+    def parseExpression(self, rightBindingPower):
+        """ Parses operators binding tighter than rightBindingPower (precedence climbing). """
+
+        tokens = self.tokens
+        first = self.parsePrefix()
+        rest = None # left-associative (function, operand) chain, folded iteratively to avoid deep recursion
+
+        while True:
+            kind, value = tokens[self.position]
+
+            if kind == TK_OPERATOR:
+                bindingPower = BINDING_POWERS[value]
+                if bindingPower <= rightBindingPower:
+                    break
+                self.position += 1
+                # '**' is right-associative: parse its right side one step looser
+                pair = (BINARY_FUNCTIONS[value], self.parseExpression(bindingPower - 1 if value == '**' else bindingPower))
+
+            # implicit multiplication, e.g. '2(3)', '(2)(3)', '2π', '2log(100)', '(2)3'
+            elif kind in IMPLICIT_OPERAND_KINDS or (kind == TK_NUMBER and tokens[self.position - 1][0] in IMPLICIT_LEFT_KINDS):
+                if BINDING_POWERS['*'] <= rightBindingPower:
+                    break
+                pair = (operator.mul, self.parseExpression(BINDING_POWERS['*']))
+
+            else:
+                break
+
+            if rest is None:
+                rest = [pair]
+            else:
+                rest.append(pair)
+
+        if rest is None:
+            return first
+        if len(rest) == 1:
+            return binaryNode(rest[0][0], first, rest[0][1])
+        return chainNode(first, tuple(rest))
+
+    def parsePrefix(self):
+        """ Parses a number, constant, parenthesized group, function call, or unary sign. """
+
+        kind, value = self.tokens[self.position]
+        self.position += 1
+
+        if kind == TK_NUMBER or kind == TK_CONSTANT:
+            return lambda: value
+
+        if kind == TK_LEFT_PAREN:
+            node = self.parseExpression(0)
+            if self.tokens[self.position][0] != TK_RIGHT_PAREN:
+                raise ExpressionError('missing closing parenthesis')
+            self.position += 1
+            return node
+
+        if kind == TK_FUNCTION:
+            return functionNode(value, self.parseExpression(UNARY_BINDING_POWER))
+
+        if kind == TK_OPERATOR and value in ('-', '+'):
+            operand = self.parseExpression(UNARY_BINDING_POWER)
+            return negateNode(operand) if value == '-' else operand
+
+        raise ExpressionError('unexpected end of expression' if kind == TK_END else f'unexpected {value!r}')
+
+
+def binaryNode(function, left, right):
+    """ Closure applying a single binary operator. """
+    return lambda: function(left(), right())
+
+def chainNode(first, rest):
+    """ Closure folding a left-associative operator chain in a loop (no recursion per term). """
+    def evaluate():
+        value = first()
+        for function, operand in rest:
+            value = function(value, operand())
+        return value
+    return evaluate
+
+def negateNode(operand):
+    """ Closure negating its operand (unary minus). """
+    return lambda: -operand()
+
+def functionNode(function, operand):
+    """ Closure applying a single-argument function (log, ln). """
+    return lambda: function(operand())
+
+
+def compileExpression(text):
+    """ Tokenizes + parses an operation string, returning a closure that evaluates it. """
+
+    return Parser(tokenize(text)).parse()
+
+
+def evaluateCompiled(compiled):
+    """ Runs a compiled expression, converting arithmetic failures into ExpressionErrors. """
+
+    try:
+        result = compiled()
+    except (ArithmeticError, ValueError) as error: # e.g. division by zero, overflow, log domain
+        raise ExpressionError(str(error)) from error
+    if isinstance(result, float) and not math.isfinite(result): # e.g. 1e308*10
+        raise ExpressionError('result out of range')
+    return result
+
+
+# display/unicode spellings that collapse to one canonical form
+NORMALIZE_TABLE = str.maketrans({'\N{MATHEMATICAL ITALIC SMALL PI}': 'π', '\N{MATHEMATICAL ITALIC SMALL E}': 'e'})
+# whitespace around operators/parentheses is insignificant (between two operands it is not, e.g. '2 3')
+OPERATOR_SPACING_PATTERN = re.compile(r' ?([-+*/%^()]) ?')
+
+def normalizeExpression(text):
+    """ Returns the canonical cache key for an operation string. """
+
+    parts = text.translate(NORMALIZE_TABLE).split()
+    text = parts[0] if len(parts) == 1 else OPERATOR_SPACING_PATTERN.sub(r'\1', ' '.join(parts))
+    return text.replace('^', '**').replace('pi', 'π')
+
+
+class ExpressionCache():
+    """
+    Bounded LRU cache between the calculator and the engine.
+    Maps normalized operation text to its compiled closure and, since every expression the engine accepts
+    is constant (no variables), to its final result as well - so a repeat evaluation is one dict lookup.
+    """
+
+    def __init__(self, maxEntries = 256, maxTextLength = 4096, maxResultBits = 4096):
+        """
+        maxEntries: least-recently-used entries are evicted beyond this count (0 disables caching)
+        maxTextLength: longer operation strings are compiled but never stored
+        maxResultBits: int results larger than this keep only their compiled form, not the value
+        """
+
+        self.entries = OrderedDict()
+        self.maxEntries = maxEntries
+        self.maxTextLength = maxTextLength
+        self.maxResultBits = maxResultBits
+
+        # counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def configure(self, maxEntries = None, maxTextLength = None, maxResultBits = None):
+        """ Updates any passed limits, evicting immediately if the cache is now over size. """
+
+        if maxEntries is not None: self.maxEntries = maxEntries
+        if maxTextLength is not None: self.maxTextLength = maxTextLength
+        if maxResultBits is not None: self.maxResultBits = maxResultBits
+        self.evictOverflow()
+
+    def clear(self):
+        """ Drops all entries and resets counters. """
+
+        self.entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """ Returns current size, limits, and hit/miss/eviction counters. """
+
+        lookups = self.hits + self.misses
+        return {'entries': len(self.entries), 'maxEntries': self.maxEntries,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'hitRate': self.hits / lookups if lookups else 0.0}
+
+    def lookup(self, text):
+        """ Returns the [compiled, result] entry for an operation string, compiling + storing on a miss. """
+
+        # already-normalized text (the usual case) hits without paying for normalization
+        key = text
+        entry = self.entries.get(key)
+        if entry is None:
+            key = normalizeExpression(text)
+            entry = self.entries.get(key)
+
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        entry = [compileExpression(key), NO_RESULT]
+        if self.maxEntries > 0 and len(key) <= self.maxTextLength:
+            self.entries[key] = entry
+            self.evictOverflow()
+        return entry
+
+    def compile(self, text):
+        """ Returns the (possibly cached) compiled closure for an operation string. """
+
+        return self.lookup(text)[0]
+
+    def evaluate(self, text):
+        """ Returns the (possibly cached) result of an operation string. """
+
+        entry = self.lookup(text)
+        if entry[1] is not NO_RESULT:
+            return entry[1]
+
+        result = evaluateCompiled(entry[0])
+        if not isinstance(result, int) or result.bit_length() <= self.maxResultBits:
+            entry[1] = result
+        return result
+
+    def evictOverflow(self):
+        """ Drops least-recently-used entries until within maxEntries. """
+
+        while len(self.entries) > self.maxEntries:
+            self.entries.popitem(last = False)
+            self.evictions += 1
+
+
+NO_RESULT = object() # sentinel: entry's result not (yet) cached
+
+# shared cache used by the calculator
+defaultCache = ExpressionCache()
+instrumentation.registerCounters('expressionCache', defaultCache.stats)
+
+
+@instrumented('engine.evaluateExpression')
+def evaluateExpression(text, cache = None):
+    """ Evaluates an operation string through the given (or the shared default) expression cache. """
+
+    return (cache or defaultCache).evaluate(text)
+
+
+# operator stack entries for the incremental evaluator: (bindingPower, function, arity, rightAssociative)
+OPEN_PAREN_ENTRY = (0, None, 0, False)
+UNARY_MINUS_ENTRY = (UNARY_BINDING_POWER, operator.neg, 1, True)
+BINARY_ENTRIES = {op: (BINDING_POWERS[op], function, 2, op == '**') for op, function in BINARY_FUNCTIONS.items()}
+
+
+class IncrementalEvaluator():
+    """
+    Shunting-yard evaluator for live result previews.
+    Committed operation text is folded eagerly into a small operand/operator stack (e.g. '1+2+3+' is held as [6], ['+']),
+    so previewing a changed pending term costs only that term plus the stack depth - not the length of the whole chain.
+    """
+
+    def __init__(self, maxPowerBits = None):
+        """ maxPowerBits: '**' result size limit, if tighter than MAX_POWER_BITS (e.g. PREVIEW_POWER_BITS). """
+
+        self.binaryEntries = BINARY_ENTRIES
+        if maxPowerBits is not None:
+            powerFunction = lambda base, exponent: safePower(base, exponent, maxPowerBits)
+            self.binaryEntries = {**BINARY_ENTRIES, '**': (BINDING_POWERS['**'], powerFunction, 2, True)}
+        self.reset()
+
+    def reset(self):
+        """ Clears all committed state. """
+
+        self.values = []
+        self.operators = []
+        self.expectOperand = True
+        self.lastKind = None
+        self.failed = False
+        self.stale = False
+        self.committedCount = 0 # number of committed items (e.g. cumulativeOperationList entries)
+
+    def rebuild(self, items):
+        """ Resets, then re-commits each item - used when committed input is removed rather than appended. """
+
+        self.reset()
+        for item in items:
+            self.commit(item)
+
+    def invalidate(self):
+        """ Marks committed state out of date (items were replaced/removed); the next sync rebuilds it. """
+
+        self.stale = True
+
+    def sync(self, items):
+        """ Brings committed state in line with items: folds only newly appended items, rebuilding if any were removed. """
+
+        if self.stale or len(items) < self.committedCount:
+            self.rebuild(items)
+        else:
+            for item in items[self.committedCount:]:
+                self.commit(item)
+
+    def commit(self, text):
+        """ Folds a committed piece of operation text (operand, operator, or partial group) into the stack. """
+
+        self.committedCount += 1
+        if self.failed:
+            return
+        try:
+            for token in tokenize(text)[:-1]: # drop TK_END
+                self.feed(token)
+        except (ExpressionError, ArithmeticError, ValueError):
+            self.failed = True
+
+    def preview(self, pendingText):
+        """ Returns the value of committed state + pending text (open groups implicitly closed), or None if incomplete/invalid. """
+
+        if self.failed:
+            return None
+        try:
+            pendingTokens = tokenize(pendingText)[:-1]
+        except (ExpressionError, ValueError):
+            return None
+        return self.previewTokens(pendingTokens)
+
+    def previewTokens(self, pendingTokens):
+        """ Same as preview, for already tokenized pending input (w/o TK_END). """
+
+        if self.failed:
+            return None
+
+        # snapshot: cost is the stack depth, which stays small for flat chains
+        saved = (self.values, self.operators, self.expectOperand, self.lastKind)
+        self.values, self.operators = list(self.values), list(self.operators)
+        try:
+            for token in pendingTokens:
+                self.feed(token)
+            return self.finish()
+        except (ExpressionError, ArithmeticError, ValueError):
+            return None
+        finally:
+            self.values, self.operators, self.expectOperand, self.lastKind = saved
+
+    def feed(self, token):
+        """ Applies a single token to the operand/operator stacks. """
+
+        kind, value = token
+
+        if kind == TK_NUMBER or kind == TK_CONSTANT:
+            if not self.expectOperand: # implicit multiplication (a bare number only after ')' or a constant)
+                if kind == TK_NUMBER and self.lastKind not in IMPLICIT_LEFT_KINDS:
+                    raise ExpressionError(f'unexpected {value!r}')
+                self.pushBinary(self.binaryEntries['*'])
+            self.values.append(value)
+            self.expectOperand = False
+
+        elif kind == TK_LEFT_PAREN or kind == TK_FUNCTION:
+            if not self.expectOperand:
+                self.pushBinary(self.binaryEntries['*'])
+            self.operators.append(OPEN_PAREN_ENTRY if kind == TK_LEFT_PAREN else (UNARY_BINDING_POWER, value, 1, True))
+            self.expectOperand = True
+
+        elif kind == TK_RIGHT_PAREN:
+            if self.expectOperand:
+                raise ExpressionError("unexpected ')'")
+            while self.operators and self.operators[-1] is not OPEN_PAREN_ENTRY:
+                self.apply(self.operators.pop())
+            if not self.operators:
+                raise ExpressionError("unexpected ')'")
+            self.operators.pop()
+
+        elif self.expectOperand: # unary sign
+            if value not in ('-', '+'):
+                raise ExpressionError(f'unexpected {value!r}')
+            if value == '-':
+                self.operators.append(UNARY_MINUS_ENTRY)
+
+        else:
+            self.pushBinary(self.binaryEntries[value])
+            self.expectOperand = True
+
+        self.lastKind = kind
+
+    def pushBinary(self, entry):
+        """ Folds any stacked operators that bind at least as tightly, then stacks the new binary operator. """
+
+        bindingPower, rightAssociative = entry[0], entry[3]
+        operators = self.operators
+        while operators:
+            topBindingPower = operators[-1][0]
+            if topBindingPower > bindingPower or (topBindingPower == bindingPower and not rightAssociative):
+                self.apply(operators.pop())
+            else:
+                break
+        operators.append(entry)
+
+    def apply(self, entry):
+        """ Applies a popped operator to the top of the value stack. """
+
+        values = self.values
+        if entry[2] == 2:
+            right = values.pop()
+            values[-1] = entry[1](values[-1], right)
+        else:
+            values[-1] = entry[1](values[-1])
+
+    def finish(self):
+        """ Folds everything remaining, implicitly closing open groups; returns the value or None if incomplete/out of range. """
+
+        if self.expectOperand:
+            return None
+        while self.operators:
+            entry = self.operators.pop()
+            if entry is not OPEN_PAREN_ENTRY:
+                self.apply(entry)
+        value = self.values[0]
+        if isinstance(value, float) and not math.isfinite(value): # e.g. 1e308*10: an error when evaluated (see evaluateCompiled)
+            return None
+        return value
@@ -0,0 +1,339 @@
+"""
+formatting.py: display-string formatting for calculator output
+- keeps results within the output display's visible width
+- rounding, scientific notation, operation formatting
+- the display form (as-is, rounded, or sci notation) is picked from the value's decimal exponent + digit count (ints),
+  not from re-parsed '%E' strings
+- huge ints are formatted from their leading digits only (never converted to a full decimal string); as number input
+  (getResultText), ints too long for str() are kept as sci notation at HUGE_INT_PRECISION digits
+- w/ a DisplayFit (see displayfit.py), results are fitted to the display's rendered width (glyph widths) instead of
+  the fixed character counts: as many digits as fit, in the same as-is / rounded / sci notation forms
+- results memoized per value (bounded), so repeated values (e.g. a running preview) skip formatting
+- pure Python (no Tk), shared by the GUI, batch CLI, etc.
+"""
+
+from functools import lru_cache
+from math import isfinite, log10
+
+from instrumentation import instrumentation, instrumented
+
+
+DISPLAY_MAX_DIGITS = 9 # characters visible in the output display (8 for negative values, + the '-')
+DISPLAY_CACHE_SIZE = 1024
+MAX_CACHED_INT_BITS = 256 # larger ints are formatted w/o memoization (not worth hashing/keeping)
+EXACT_INT_BITS = 2560 # ints up to this size are formatted from str() (quadratic); larger ones from their leading digits
+HUGE_INT_PRECISION = 50 # significant digits carried when approximating a huge int's leading digits
+
+
+def getMaxDigits(value):
+    """ Display width available for value's digits (a '-' takes one). """
+
+    return DISPLAY_MAX_DIGITS - 1 if value < 0 else DISPLAY_MAX_DIGITS
+
+
+def roundToMaxDigits(currentResult):
+    """ Formats evaluated result prior to display so as not to exceed window width. """
+
+    # format evaluated result, if float
+    if isinstance(currentResult, float):
+
+        # if result is a float, but has no fractional part, convert to int
+        if currentResult.is_integer():
+            currentResult = int(currentResult)
+
+    return roundToFit(currentResult, str(currentResult))
+
+
+@instrumented('formatting.roundToMaxDigits') # (here, not on roundToMaxDigits: formatResult calls this directly)
+def roundToFit(value, valueStr):
+    """ roundToMaxDigits, given str(value). """
+
+    maxDigits = getMaxDigits(value)
+    if len(valueStr) > maxDigits:
+        allowedDigits = maxDigits - len(str(int(value)))
+        valueStr = '{:.{precision}f}'.format(value, precision = allowedDigits)
+
+    # strip trailing zeroes
+    return valueStr.rstrip('0')
+
+
+def roundDigits(digits, numDigits):
+    """ Rounds a digit string (no leading zeros) to numDigits significant digits, half to even; returns (digits, carry). """
+
+    if len(digits) <= numDigits:
+        return digits, 0
+    kept, rest = digits[:numDigits], digits[numDigits:]
+    if rest[0] > '5' or (rest[0] == '5' and (rest.rstrip('0') != '5' or kept[-1] in '13579')):
+        kept = str(int(kept) + 1)
+        if len(kept) > numDigits: # e.g. 999.. -> 1000..
+            return kept[:numDigits], 1
+    return kept, 0
+
+
+def getFloatDigits(valueStr):
+    """ Splits a float's str() (e.g. '-0.00123', '1.5e-07') into (significant digits, decimal exponent of the first). """
+
+    mantissa, _, exponentStr = valueStr.lstrip('-').partition('e')
+    intPart, _, fracPart = mantissa.partition('.')
+    digits = intPart + fracPart
+    significant = digits.lstrip('0')
+    exponent = len(intPart) - 1 - (len(digits) - len(significant)) + (int(exponentStr) if exponentStr else 0)
+    return significant.rstrip('0'), exponent
+
+
+def approximateInt(magnitude):
+    """ Returns a positive int as a Decimal rounded to ~HUGE_INT_PRECISION digits, from its leading bits only. """
+
+    from decimal import Decimal, localcontext # deferred: only needed for huge results
+
+    shift = max(0, magnitude.bit_length() - 4 * HUGE_INT_PRECISION)
+    with localcontext() as context:
+        context.prec = HUGE_INT_PRECISION
+        return Decimal(magnitude >> shift) * Decimal(2) ** shift
+
+
+def getHugeIntDigits(magnitude, getNumDigits):
+    """
+    Returns (leading digits rounded half to even, decimal exponent) of a huge positive int, w/o a full decimal conversion.
+    getNumDigits(digit count) -> how many significant digits to keep.
+    Falls back to exact (but slower) integer arithmetic when the approximation can't decide: near a power of ten or a rounding tie.
+    """
+
+    from decimal import Decimal, ROUND_FLOOR, localcontext # deferred: only needed for huge results
+
+    approximation = approximateInt(magnitude)
+    with localcontext() as context:
+        context.prec = HUGE_INT_PRECISION
+        tolerance = Decimal(10) ** (10 - HUGE_INT_PRECISION) # relative; well above the approximation's error
+
+        # digit count: exact unless magnitude is within tolerance of a power of ten
+        count = approximation.adjusted() + 1
+        leading = approximation.scaleb(1 - count) # in [1, 10]
+        if leading < 1 + tolerance and magnitude < 10 ** (count - 1):
+            count -= 1
+        elif leading > 10 - tolerance and magnitude >= 10 ** count:
+            count += 1
+
+        # leading digits: round the approximation, unless it's within tolerance of a tie
+        numDigits = getNumDigits(count)
+        scaled = approximation.scaleb(numDigits - count)
+        kept = int(scaled.to_integral_value(rounding = ROUND_FLOOR))
+        excess = scaled - kept - Decimal('0.5') # > 0: round up
+        if abs(excess) <= tolerance * scaled:
+            divisor = 10 ** (count - numDigits)
+            kept, remainder = divmod(magnitude, divisor)
+            excess = 2 * remainder - divisor
+    if excess > 0 or (excess == 0 and kept % 2):
+        kept += 1
+    keptStr = str(kept)
+    if len(keptStr) > numDigits: # e.g. 999.. -> 1000..
+        return keptStr[:numDigits], count
+    return keptStr, count - 1
+
+
+def getResultText(value):
+    """
+    A result's text as number input: str(value), or for an int too long for str() (sys.get_int_max_str_digits, which
+    the engine's own int parsing is bound by too), its sci notation at HUGE_INT_PRECISION significant digits.
+    """
+
+    try:
+        return str(value)
+    except ValueError: # (checked before any conversion work)
+        isNegative = value < 0
+        digits, exponent = getHugeIntDigits(-value if isNegative else value, lambda count: HUGE_INT_PRECISION - 10)
+        return formatSciNotation(isNegative, digits, exponent)
+
+
+def convertToSciNotation(value, fit = None):
+    """ (fit: DisplayFit to fill, instead of the character-count limits) """
+
+    if isinstance(value, float) and not isfinite(value):
+        return str(value)
+    if fit is not None:
+        return fitSciNotation(value, fit)
+    if type(value) is int and value.bit_length() > EXACT_INT_BITS:
+        return hugeIntToSciNotation(value)
+    return toSciNotation(value, str(value))
+
+
+# timed under convertToSciNotation's name: formatResult + fitResult call these directly
+@instrumented('formatting.convertToSciNotation')
+def toSciNotation(value, valueStr):
+    """ convertToSciNotation, given str(value) (finite). """
+
+    # allowed significand digits: 10 chars is max visible in window; less 2 to account for 'e+' display; less 1 for '.'
+    # (less the digit count of the exponent, estimated from the length of str(value))
+    isFloat = isinstance(value, float)
+    nonNumericalChars = 2 if isFloat else 3
+    allowedDigits = max(0, getMaxDigits(value) - nonNumericalChars - len(str(len(valueStr) - 1)))
+
+    if isFloat:
+        digits, exponent = getFloatDigits(valueStr)
+    else:
+        digits = valueStr.lstrip('-')
+        exponent = len(digits) - 1
+    if not digits.strip('0'): # zero
+        return ('-' if valueStr.startswith('-') else '') + '0e+0'
+
+    digits, carry = roundDigits(digits, allowedDigits + 1)
+    return formatSciNotation(value < 0, digits, exponent + carry)
+
+
+@instrumented('formatting.convertToSciNotation')
+def hugeIntToSciNotation(value):
+    """ convertToSciNotation for an int too large to convert to a decimal string. """
+
+    isNegative = value < 0
+    getNumDigits = lambda count: max(0, getMaxDigits(value) - 3 - len(str(count - 1 + isNegative))) + 1
+    digits, exponent = getHugeIntDigits(-value if isNegative else value, getNumDigits)
+    return formatSciNotation(isNegative, digits, exponent)
+
+
+def formatSciNotation(isNegative, digits, exponent):
+    """ Returns e.g. '-1.2345e+11' for significant digits '123450' + exponent 11 (trailing zeros dropped). """
+
+    fraction = digits[1:].rstrip('0')
+    significand = digits[0] + '.' + fraction if fraction else digits[0]
+    return f'{"-" if isNegative else ""}{significand}e{exponent:+d}'
+
+
+@instrumented('formatting.getResultDisplayStr')
+def getResultDisplayStr(currentResult, fit = None) -> str:
+    """ Formats string of evaluated result prior to display so as not to exceed window width (fit: DisplayFit, if known). """
+
+    if type(currentResult) is int and currentResult.bit_length() > MAX_CACHED_INT_BITS:
+        return formatResult(currentResult) if fit is None else fitResult(currentResult, fit)
+    return formatResultCached(currentResult) if fit is None else fitResultCached(currentResult, fit)
+
+
+def formatResult(currentResult):
+    """ getResultDisplayStr (w/o memoization). """
+
+    # format evaluated result, if float
+    if isinstance(currentResult, float):
+
+        # if result is a float, but has no fractional part, convert to int
+        if currentResult.is_integer():
+            currentResult = int(currentResult)
+
+    # too large for a decimal string: sci notation from leading digits only
+    if type(currentResult) is int and currentResult.bit_length() > EXACT_INT_BITS:
+        return hugeIntToSciNotation(currentResult)
+
+    # determine length; fits as-is if within display width
+    resultStr = str(currentResult)
+    if len(resultStr) <= getMaxDigits(currentResult):
+        return resultStr
+
+    # too long: ints go to sci notation; floats are rounded if their exponent (at 7 significant digits) is 0 to -3
+    if isinstance(currentResult, float) and -3 <= getRoundedExponent(currentResult) <= 0:
+        return roundToFit(currentResult, resultStr)
+    return toSciNotation(currentResult, resultStr)
+
+
+def getRoundedExponent(value):
+    """ Decimal exponent of a (finite) float, once rounded to 7 significant digits. """
+
+    sciNotation = '%.6e' % value
+    return int(sciNotation[sciNotation.index('e') + 1:])
+
+
+def fitResult(currentResult, fit):
+    """ getResultDisplayStr fitted to a DisplayFit (w/o memoization). """
+
+    # whole floats as ints, unless past float precision (their sci notation str() is shorter + exact)
+    if isinstance(currentResult, float) and currentResult.is_integer() and abs(currentResult) < 1e16:
+        currentResult = int(currentResult)
+    if type(currentResult) is int and currentResult.bit_length() > EXACT_INT_BITS:
+        return fitSciNotation(currentResult, fit)
+
+    resultStr = str(currentResult)
+    if fit.fits(resultStr) or (isinstance(currentResult, float) and not isfinite(currentResult)):
+        return resultStr
+    # floats down to 0.001: rounded to as many decimals as fit (at most 17 significant digits), if the integer part fits
+    if isinstance(currentResult, float):
+        exponent = getRoundedExponent(currentResult)
+        prefix = ('-' if currentResult < 0 else '') + str(abs(int(currentResult))) + '.'
+        if exponent >= -3 and fit.fits(prefix[:-1]):
+            for precision in range(max(0, min(fit.maxDigits(prefix), 16 - exponent)), -1, -1):
+                roundedStr = '{:.{precision}f}'.format(currentResult, precision = precision)
+                if precision:
+                    roundedStr = roundedStr.rstrip('0').rstrip('.')
+                if fit.fits(roundedStr):
+                    return roundedStr
+    return fitSciNotation(currentResult, fit, resultStr)
+
+
+def fitResultText(resultText, fit):
+    """ getResultDisplayStr fitted to a DisplayFit, given the result's getResultText() (e.g. from the background worker). """
+
+    if resultText.lstrip('-').isdigit():
+        return getResultDisplayStr(int(resultText), fit)
+    value = float(resultText)
+    if isfinite(value) or 'e' not in resultText: # (inf/nan: as is)
+        return getResultDisplayStr(value, fit)
+
+    # a huge int's leading digits (past float range)
+    digits, exponent = getFloatDigits(resultText)
+    return fitSignificand(resultText.startswith('-'), exponent, len(digits), getDigitsSignificand(digits, exponent), fit)
+
+
+def getDigitsSignificand(digits, exponent):
+    """ Returns getSignificand(numDigits) -> (digits rounded to numDigits, exponent) for fitSignificand. """
+
+    def getSignificand(numDigits):
+        rounded, carry = roundDigits(digits, numDigits)
+        return rounded, exponent + carry
+    return getSignificand
+
+
+@instrumented('formatting.convertToSciNotation')
+def fitSciNotation(value, fit, valueStr = None):
+    """ Sci notation w/ as many significant digits as fit (at least 1). """
+
+    isNegative = value < 0
+    if type(value) is int and value.bit_length() > EXACT_INT_BITS:
+        magnitude = -value if isNegative else value
+        exponent = int((magnitude.bit_length() - 1) * log10(2)) # estimate (at most the actual exponent)
+        maxSignificant = HUGE_INT_PRECISION - 10
+        getSignificand = lambda numDigits: getHugeIntDigits(magnitude, lambda count: numDigits)
+    else:
+        valueStr = valueStr or str(value)
+        if isinstance(value, float):
+            digits, exponent = getFloatDigits(valueStr)
+        else:
+            digits = valueStr.lstrip('-')
+            exponent = len(digits) - 1
+        if not digits.strip('0'): # zero
+            return ('-' if valueStr.startswith('-') else '') + '0e+0'
+        maxSignificant = len(digits)
+        getSignificand = getDigitsSignificand(digits, exponent)
+    return fitSignificand(isNegative, exponent, maxSignificant, getSignificand, fit)
+
+
+def fitSignificand(isNegative, exponent, maxSignificant, getSignificand, fit):
+    """ Sci notation w/ as many of getSignificand(numDigits)'s digits as fit (at least 1); exponent: estimated. """
+
+    fixedText = f'{"-" if isNegative else ""}.e{exponent:+d}'
+    for numDigits in range(min(fit.maxDigits(fixedText), maxSignificant), 1, -1):
+        sciNotation = formatSciNotation(isNegative, *getSignificand(numDigits))
+        if fit.fits(sciNotation):
+            return sciNotation
+    return formatSciNotation(isNegative, *getSignificand(1))
+
+
+# typed: 10**16 + 1e16 are equal (+ hash alike), but format differently
+formatResultCached = lru_cache(maxsize = DISPLAY_CACHE_SIZE, typed = True)(formatResult)
+fitResultCached = lru_cache(maxsize = DISPLAY_CACHE_SIZE, typed = True)(fitResult)
+instrumentation.registerCounters('displayFormatCache', lambda: formatResultCached.cache_info()._asdict())
+instrumentation.registerCounters('fittedDisplayFormatCache', lambda: fitResultCached.cache_info()._asdict())
+
+
+def getOperationDisplayStr(currentOperation) -> str:
+    """ """
+
+    # format any instances of exponentiation
+    formattedOperationStr = currentOperation.replace('**', '^')
+
+    return formattedOperationStr
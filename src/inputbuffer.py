@@ -0,0 +1,225 @@
+"""
+inputbuffer.py: number input buffer for the calculator core
+- holds the number being entered as the pieces it was entered in (digits, '.', '**', a result, ...), so backspace removes one
+- keeps sign, decimal point, digit counts, leading significant digits, and the integer part's int value up to date
+  on each append/pop/negate, so reading the input's numeric value (display, live preview) never reparses its text
+- the joined text is built on demand + cached until the next change
+"""
+
+import sys
+
+from engine import FIXED_TOKENS, TK_NUMBER
+
+
+# significant digits kept for the float value: more than any double's rounding midpoint has, so value == float(text) exactly
+MAX_SIGNIFICANT_DIGITS = 800
+
+DIGITS = frozenset('0123456789')
+MINUS_TOKEN = FIXED_TOKENS['-']
+
+
+class InputBuffer():
+    """ The number currently being entered (e.g. cumulative number input); str(buffer) is its text. """
+
+    __slots__ = ('pieces', 'negative', 'length', 'cachedText',
+                 'otherChars', 'points', 'intDigits', 'fracDigits', 'significantCount', 'significand', 'droppedNonzero',
+                 'intValue')
+
+    def __init__(self, text = ''):
+        """ text: initial input, entered one character at a time (as if typed). """
+
+        self.clear()
+        self.extend(text)
+
+    def clear(self):
+        """ Removes all input. """
+
+        self.pieces = []
+        self.negative = False
+        self.length = 0
+        self.cachedText = ''
+
+        # numeric state (over every piece's characters)
+        self.otherChars = 0 # characters other than digits + '.' (operators, constants, exponents, ...)
+        self.points = 0
+        self.intDigits = 0
+        self.fracDigits = 0
+        self.significantCount = 0 # digits from the first nonzero digit on
+        self.significand = '' # first MAX_SIGNIFICANT_DIGITS of those
+        self.droppedNonzero = 0 # nonzero digits beyond MAX_SIGNIFICANT_DIGITS
+        self.intValue = 0 # integer part's digits as an int (w/o sign): one small multiply per digit, no reparsing
+
+    def set(self, text):
+        """ Replaces all input w/ text, as a single piece (e.g. a result). """
+
+        self.clear()
+        self.append(text)
+
+    def copy(self):
+        """ Returns an independent copy. """
+
+        duplicate = InputBuffer.__new__(InputBuffer)
+        for name in InputBuffer.__slots__:
+            setattr(duplicate, name, getattr(self, name))
+        duplicate.pieces = list(self.pieces)
+        return duplicate
+
+    def append(self, piece):
+        """ Adds a piece of input; a leading '-' on empty input sets the sign. """
+
+        if type(piece) is not str: # e.g. int digits
+            piece = str(piece)
+        if not self.length and piece.startswith('-'):
+            self.negative = True
+            self.length = 1
+            self.cachedText = None
+            piece = piece[1:]
+        if not piece:
+            return
+
+        self.pushChars(piece)
+        self.pieces.append(piece)
+        self.length += len(piece)
+        self.cachedText = None
+
+    def extend(self, text):
+        """ Adds text one character (piece) at a time. """
+
+        for char in text:
+            self.append(char)
+
+    def pop(self):
+        """ Removes the most recent piece (a sign left on its own goes w/ it); returns it, or None if empty. """
+
+        if not self.pieces:
+            if self.negative:
+                self.negative = False
+                self.length = 0
+                self.cachedText = ''
+                return '-'
+            return None
+
+        piece = self.pieces.pop()
+        self.popChars(piece)
+        self.length -= len(piece)
+        if not self.pieces and self.negative:
+            self.negative = False
+            self.length = 0
+        self.cachedText = None
+        return piece
+
+    def negate(self):
+        """ Adds or removes the leading '-'. """
+
+        self.negative = not self.negative
+        self.length += 1 if self.negative else -1
+        self.cachedText = None
+
+    def pushChars(self, piece):
+        """ Updates numeric state for an appended piece's characters. """
+
+        for char in piece:
+            if char not in DIGITS:
+                if char == '.':
+                    self.points += 1
+                else:
+                    self.otherChars += 1
+                continue
+
+            if self.points:
+                self.fracDigits += 1
+            else:
+                self.intDigits += 1
+                self.intValue = self.intValue * 10 + (ord(char) - 48)
+            if self.significantCount or char != '0':
+                self.significantCount += 1
+                if self.significantCount <= MAX_SIGNIFICANT_DIGITS:
+                    self.significand += char
+                elif char != '0':
+                    self.droppedNonzero += 1
+
+    def popChars(self, piece):
+        """ Reverts pushChars for the most recently appended piece. """
+
+        for char in reversed(piece):
+            if char not in DIGITS:
+                if char == '.':
+                    self.points -= 1
+                else:
+                    self.otherChars -= 1
+                continue
+
+            if self.significantCount: # once digits are significant, every later digit is too
+                if self.significantCount <= MAX_SIGNIFICANT_DIGITS:
+                    self.significand = self.significand[:-1]
+                elif char != '0':
+                    self.droppedNonzero -= 1
+                self.significantCount -= 1
+            if self.points:
+                self.fracDigits -= 1
+            else:
+                self.intDigits -= 1
+                self.intValue //= 10
+
+    @property
+    def text(self):
+        """ Input as entered, e.g. '-12.5' or '2**3'. """
+
+        if self.cachedText is None:
+            self.cachedText = ('-' if self.negative else '') + ''.join(self.pieces)
+        return self.cachedText
+
+    def __str__(self):
+        """ """
+        return self.text
+
+    def __len__(self):
+        """ Length of text. """
+        return self.length
+
+    def __bool__(self):
+        """ """
+        return bool(self.length)
+
+    def isNumber(self):
+        """ True if input is only digits, at most one '.', and an optional sign. """
+
+        return not self.otherChars and self.points <= 1
+
+    @property
+    def value(self):
+        """ Input as a float, same as float(text); raises ValueError if it isn't a number. """
+
+        if not self.isNumber() or not (self.intDigits or self.fracDigits):
+            return float(self.text)
+
+        significand = self.significand or '0'
+        exponent = self.significantCount - len(self.significand) - self.fracDigits # of the last kept digit
+        if self.droppedNonzero: # round as if the dropped digits were all there
+            significand += '1'
+            exponent -= 1
+        return float(f'{"-" if self.negative else ""}{significand}e{exponent}')
+
+    def getTokens(self):
+        """
+        Returns input as engine tokens (w/o re-tokenizing text) if it's a number, else None (tokenize text instead).
+        Raises ValueError if it's a number the engine would reject (e.g. '.', or too many digits for an int).
+        """
+
+        if not self.isNumber():
+            return None
+        tokens = [MINUS_TOKEN] if self.negative else []
+        if not (self.intDigits or self.fracDigits):
+            if self.points:
+                raise ValueError("'.' is not a number")
+            return tokens
+
+        if self.points:
+            number = abs(self.value)
+        else:
+            intDigitsLimit = sys.get_int_max_str_digits() # (the engine parses int literals w/ int(), bound by this)
+            if intDigitsLimit and self.intDigits > intDigitsLimit:
+                raise ValueError('too many digits')
+            number = self.intValue
+        tokens.append((TK_NUMBER, number))
+        return tokens
@@ -0,0 +1,199 @@
+"""
+inputtrace.py: input trace recording + replay
+- w/ CALCAPP_TRACE_RECORD=path set, every input event dispatched to the calculator (key presses via App.keyEventHandle,
+  button callbacks, paste) is appended to a compact text trace: one tab-separated line per event
+  (ms since recording started, source: k(ey) / b(utton) / p(aste) / w(orker), core event name, JSON args), + the final
+  display strings at exit; each line is flushed as it's written, so a crash keeps the events leading up to it
+- background evaluation outcomes (completeEvaluation: result, error, or timeout) are recorded as worker events; replays
+  feed them back through a ReplayBackend instead of evaluating, so cancels/supersedes/timeouts replay as recorded
+- disabled (default): the calculator's event functions are left unwrapped
+- w/ CALCAPP_TRACE_REPLAY=path set, the app replays a trace against its real window once interactive, then exits
+  (see benchmarks/replay_trace.py, which also replays headless through CalculatorCore)
+- replays run events back to back (as fast as possible), timing each one, + compare final display strings w/ the recorded ones
+  (version 1 traces, recorded before worker events, aren't compared: their background evaluations can't be reproduced)
+"""
+
+import atexit
+import json
+import os
+import time
+
+
+TRACE_RECORD_ENV = 'CALCAPP_TRACE_RECORD'
+TRACE_REPLAY_ENV = 'CALCAPP_TRACE_REPLAY'
+TRACE_HEADER_PREFIX = '#calcapp-trace '
+TRACE_VERSION = 2 # 2: + worker (completeEvaluation) events
+TRACE_HEADER = f'{TRACE_HEADER_PREFIX}{TRACE_VERSION}'
+TRACE_FINAL = '#final'
+REPLAY_REPORT_PREFIX = '[replay] ' # Tk replay report line (JSON) on stdout
+DISPLAY_NAMES = ('input', 'operation', 'preview')
+SOURCE_KEY, SOURCE_BUTTON, SOURCE_PASTE, SOURCE_WORKER = 'k', 'b', 'p', 'w'
+
+
+class Trace():
+    """ A loaded trace: header metadata, events as (ms, source, event name, args), and the recorded final display strings. """
+
+    def __init__(self, metadata, events, finalDisplay, version = TRACE_VERSION):
+        """ """
+
+        self.version = version
+        self.metadata = metadata
+        self.events = events
+        self.finalDisplay = finalDisplay # {display name: text}, or None if the recording didn't finish cleanly
+
+    @property
+    def durationMs(self):
+        """ Recorded session length (first to last event). """
+
+        return self.events[-1][0] - self.events[0][0] if self.events else 0.0
+
+    @property
+    def recordsEvaluations(self):
+        """ True if background evaluation outcomes were recorded (so a replay can reproduce them). """
+
+        return self.version >= 2
+
+
+def readTrace(path):
+    """ Loads a trace file; raises ValueError if it isn't one. """
+
+    with open(path, encoding = 'utf-8') as file:
+        header = file.readline().rstrip('\n').split('\t', 1)
+        version = header[0][len(TRACE_HEADER_PREFIX):]
+        if not header[0].startswith(TRACE_HEADER_PREFIX) or version not in ('1', '2'):
+            raise ValueError(f'{path}: not a calcapp trace')
+        metadata = json.loads(header[1]) if len(header) > 1 else {}
+        events = []
+        finalDisplay = None
+        for line in file:
+            fields = line.rstrip('\n').split('\t')
+            if fields[0] == TRACE_FINAL:
+                finalDisplay = json.loads(fields[1])
+            elif fields[0]:
+                events.append((float(fields[0]), fields[1], fields[2], tuple(json.loads(fields[3])) if len(fields) > 3 else ()))
+    return Trace(metadata, events, finalDisplay, int(version))
+
+
+class TraceRecorder():
+    """ Records input events to a trace file (if CALCAPP_TRACE_RECORD is set). """
+
+    def __init__(self):
+        """ """
+
+        self.path = os.environ.get(TRACE_RECORD_ENV, '')
+        self.enabled = bool(self.path) and not os.environ.get(TRACE_REPLAY_ENV)
+        self.source = SOURCE_BUTTON # set to SOURCE_KEY / SOURCE_PASTE / SOURCE_WORKER while a key press / paste / result is dispatched
+        self.file = None
+        self.core = None
+        self.origin = None
+
+    def start(self, core, mode):
+        """ Opens the trace file; core's display strings are written as the final state at exit. """
+
+        self.core = core
+        self.origin = time.perf_counter()
+        self.file = open(self.path, 'w', encoding = 'utf-8')
+        metadata = {'mode': mode, 'created': time.strftime('%Y-%m-%d %H:%M:%S')}
+        self.file.write(f'{TRACE_HEADER}\t{json.dumps(metadata)}\n')
+        atexit.register(self.finish)
+
+    def wrap(self, name, function):
+        """ Returns function, recording each call (w/ its args) as event name. """
+
+        write = self.write
+
+        def recorded(*args):
+            write(name, args)
+            return function(*args)
+        return recorded
+
+    def write(self, name, args):
+        """ Appends one event line (flushed: human-paced events, + the last ones before a crash matter most). """
+
+        elapsedMs = (time.perf_counter() - self.origin) * 1000
+        line = f'{elapsedMs:.1f}\t{self.source}\t{name}'
+        if args:
+            line += '\t' + json.dumps(args, ensure_ascii = False, default = encodeArgument, separators = (',', ':'))
+        self.file.write(line + '\n')
+        self.file.flush()
+
+    def finish(self):
+        """ Writes the final display strings + closes the trace file. """
+
+        if self.file is None:
+            return
+        finalDisplay = dict(zip(DISPLAY_NAMES, self.core.getDisplayState()))
+        self.file.write(f'{TRACE_FINAL}\t{json.dumps(finalDisplay, ensure_ascii = False)}\n')
+        self.file.close()
+        self.file = None
+
+
+def encodeArgument(value):
+    """ JSON fallback for event args: an object's toDict() form if it has one (e.g. DisplayFit), else its str(). """
+
+    return value.toDict() if hasattr(value, 'toDict') else str(value)
+
+
+class ReplayBackend():
+    """ Evaluation backend stand-in for replays: submitted evaluations stay pending until the trace's recorded worker event. """
+
+    def submit(self, operation):
+        """ """
+
+    def cancel(self):
+        """ """
+
+
+def replayEvents(target, events, settle = None):
+    """
+    Calls each event's function on target (a CalculatorCore, or a Calculator forwarding to one) back to back.
+    settle (optional) runs after each event, inside its timing (e.g. Tk display updates). Returns per-event ns.
+    """
+
+    calls = [(getattr(target, name), args) for _, _, name, args in events] # resolve up front: time the events, not lookups
+    counter = time.perf_counter_ns
+    latenciesNs = []
+    for function, args in calls:
+        start = counter()
+        function(*args)
+        if settle is not None:
+            settle()
+        latenciesNs.append(counter() - start)
+    return latenciesNs
+
+
+def getReplayReport(trace, latenciesNs, finalDisplay):
+    """ Returns throughput, latency percentiles (overall + per event name), and final display divergence for one replay. """
+
+    totalNs = sum(latenciesNs)
+    ordered = sorted(latenciesNs)
+    percentile = lambda values, p: values[min(len(values) - 1, len(values) * p // 100)] / 1000 if values else 0.0
+    byEvent = {}
+    for (_, _, name, _), latencyNs in zip(trace.events, latenciesNs):
+        byEvent.setdefault(name, []).append(latencyNs)
+
+    checked = trace.finalDisplay is not None and trace.recordsEvaluations
+    divergence = {}
+    if checked:
+        divergence = {name: {'recorded': trace.finalDisplay.get(name), 'replayed': text}
+                      for name, text in finalDisplay.items() if trace.finalDisplay.get(name) != text}
+    return {
+        'events': len(latenciesNs),
+        'seconds': totalNs / 1e9,
+        'eventsPerSecond': len(latenciesNs) / (totalNs / 1e9) if totalNs else 0.0,
+        'recordedSeconds': trace.durationMs / 1000,
+        'latencyUs': {'mean': totalNs / len(latenciesNs) / 1000 if latenciesNs else 0.0,
+                      'p50': percentile(ordered, 50), 'p90': percentile(ordered, 90), 'p99': percentile(ordered, 99),
+                      'max': ordered[-1] / 1000 if ordered else 0.0},
+        'byEvent': {name: {'count': len(values), 'meanUs': sum(values) / len(values) / 1000,
+                           'p99Us': percentile(sorted(values), 99)}
+                    for name, values in sorted(byEvent.items(), key = lambda item: -sum(item[1]))},
+        'finalDisplay': finalDisplay,
+        'checked': checked,
+        'traceVersion': trace.version,
+        'divergence': divergence,
+    }
+
+
+# shared recorder, configured from the environment on first import
+traceRecorder = TraceRecorder()
@@ -0,0 +1,155 @@
+"""
+instrumentation.py: opt-in hot-path timing counters
+- w/ CALCAPP_INSTRUMENTATION set (1, or an export path ending in .json / .csv), functions decorated w/ @instrumented(name)
+  record call counts + durations (total, mean, max, percentiles)
+- disabled (default): @instrumented returns the function itself, so instrumented code runs exactly as if undecorated
+  (decided once, at import)
+- results export as JSON or CSV (by file extension) at exit + on demand (Ctrl+Shift+I in the app); main process only
+- percentiles come from a bounded per-name sample reservoir; counts, totals and max are exact
+- other components can register counter providers (e.g. display updates saved, expression cache hits) to export alongside
+"""
+
+import atexit
+from functools import wraps
+import os
+import time
+
+
+INSTRUMENTATION_ENV = 'CALCAPP_INSTRUMENTATION'
+INSTRUMENTATION_OWNER_ENV = 'CALCAPP_INSTRUMENTATION_OWNER' # pid of the process that exports (not worker subprocesses)
+DEFAULT_EXPORT_PATH = 'instrumentation.json'
+MAX_SAMPLES = 10000 # per name; reservoir sampled beyond this
+PERCENTILES = (50, 90, 99)
+CSV_FIELDS = ('name', 'count', 'totalMs', 'meanUs') + tuple(f'p{percentile}Us' for percentile in PERCENTILES) + ('maxUs',)
+
+
+class TimingStats():
+    """ Call count, total + max duration, and a sample reservoir for one instrumented name. """
+
+    __slots__ = ('count', 'totalNs', 'maxNs', 'samples')
+
+    def __init__(self):
+        """ """
+
+        self.count = 0
+        self.totalNs = 0
+        self.maxNs = 0
+        self.samples = []
+
+
+class Instrumentation():
+    """ Collects timings from @instrumented functions (if enabled) + exports them. """
+
+    def __init__(self):
+        """ """
+
+        setting = os.environ.get(INSTRUMENTATION_ENV, '')
+        self.enabled = setting not in ('', '0')
+        self.exportPath = setting if setting.lower().endswith(('.json', '.csv')) else DEFAULT_EXPORT_PATH
+        self.stats = {}
+        self.counterProviders = {}
+        self.random = None # reservoir sampling (reproducible), created once needed
+
+    def record(self, name, elapsedNs):
+        """ Adds one call's duration. """
+
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = TimingStats()
+        stats.count += 1
+        stats.totalNs += elapsedNs
+        if elapsedNs > stats.maxNs:
+            stats.maxNs = elapsedNs
+        if len(stats.samples) < MAX_SAMPLES:
+            stats.samples.append(elapsedNs)
+        else: # keep a uniform sample of all calls
+            if self.random is None:
+                import random
+                self.random = random.Random(0)
+            index = self.random.randrange(stats.count)
+            if index < MAX_SAMPLES:
+                stats.samples[index] = elapsedNs
+
+    def registerCounters(self, name, provider):
+        """ Adds provider() (returning {counter: number}) to exports, under name. """
+
+        self.counterProviders[name] = provider
+
+    def reset(self):
+        """ Drops all recorded timings. """
+
+        self.stats.clear()
+
+    def summary(self):
+        """ Returns one row per instrumented name (see CSV_FIELDS; durations in ms/us), most total time first. """
+
+        rows = []
+        for name, stats in sorted(self.stats.items(), key = lambda item: -item[1].totalNs):
+            samples = sorted(stats.samples)
+            row = {'name': name, 'count': stats.count, 'totalMs': stats.totalNs / 1e6, 'meanUs': stats.totalNs / stats.count / 1e3}
+            for percentile in PERCENTILES:
+                row[f'p{percentile}Us'] = samples[min(len(samples) - 1, len(samples) * percentile // 100)] / 1e3
+            row['maxUs'] = stats.maxNs / 1e3
+            rows.append(row)
+        return rows
+
+    def getCounters(self):
+        """ Returns {provider name: {counter: value}} from registered providers (providers that fail are skipped). """
+
+        counters = {}
+        for name, provider in self.counterProviders.items():
+            try:
+                counters[name] = dict(provider())
+            except Exception: # e.g. provider's owner already torn down at exit
+                continue
+        return counters
+
+    def export(self, path = None):
+        """ Writes timings (+ counters) to path (default: exportPath) as JSON or CSV, by extension; returns the path. """
+
+        import csv, json # deferred: not needed unless exporting
+
+        path = path or self.exportPath
+        rows = self.summary()
+        counters = self.getCounters()
+        with open(path, 'w', newline = '') as file:
+            if path.lower().endswith('.csv'):
+                writer = csv.DictWriter(file, fieldnames = CSV_FIELDS)
+                writer.writeheader()
+                writer.writerows(rows)
+                for providerName, values in counters.items(): # counters: name + value (in the count column)
+                    for counterName, value in values.items():
+                        writer.writerow({'name': f'{providerName}.{counterName}', 'count': value})
+            else:
+                json.dump({'timings': rows, 'counters': counters}, file, indent = 4)
+        return path
+
+
+# shared collector, configured from the environment on first import
+instrumentation = Instrumentation()
+if instrumentation.enabled:
+    # only the first instrumented process exports at exit; subprocesses (evaluation worker, batch pool) inherit the owner pid
+    ownerPid = os.environ.setdefault(INSTRUMENTATION_OWNER_ENV, str(os.getpid()))
+    if ownerPid == str(os.getpid()):
+        atexit.register(instrumentation.export)
+
+
+def instrumented(name):
+    """ Decorator: times each call under name while instrumentation is enabled; otherwise returns the function unchanged. """
+
+    def decorator(function):
+        if not instrumentation.enabled:
+            return function
+
+        record = instrumentation.record
+        counter = time.perf_counter_ns
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, counter() - start)
+        return wrapper
+    return decorator
@@ -0,0 +1,108 @@
+"""
+keydispatch.py: keyboard input dispatch
+- KEY_FUNCTION_MAP (+ the shown mode's MODE_KEY_FUNCTION_MAPS entries) compiled once into keysym -> bound callable,
+  rebuilt when the calculator instance or its mode changes; a key press is then a single dict lookup + call
+- unmapped keys are ignored; errors raised by mapped functions propagate (reported by Tk) rather than being swallowed
+- every dispatch is timed into a per-key latency histogram, dumped on demand (e.g. Ctrl+Shift+L in the app)
+"""
+
+from bisect import bisect_left
+from functools import partial
+import sys
+import time
+
+from common import KEY_FUNCTION_MAP, KEY_LATENCY_BUCKETS_US, MODE_KEY_FUNCTION_MAPS
+
+
+def compileKeyMap(target, keyFunctionMap):
+    """ Resolves a key map ({keysym: {'function': name, 'arg': optional}}) against target, returning keysym -> callable. """
+
+    dispatchTable = {}
+    for keysym, entry in keyFunctionMap.items():
+        function = getattr(target, entry['function']) # raises AttributeError now, not on the key press
+        dispatchTable[keysym] = partial(function, entry['arg']) if 'arg' in entry else function
+    return dispatchTable
+
+
+class LatencyHistogram():
+    """ Per-key counts of dispatch latencies, bucketed by KEY_LATENCY_BUCKETS_US (+ an overflow bucket). """
+
+    def __init__(self, bucketBoundsUs = KEY_LATENCY_BUCKETS_US):
+        """ """
+
+        self.bucketBoundsNs = tuple(bound * 1000 for bound in bucketBoundsUs)
+        self.counts = {} # key -> [count per bucket]
+        self.totals = {} # key -> [dispatches, total ns, max ns]
+
+    def record(self, key, elapsedNs):
+        """ Adds one dispatch's latency. """
+
+        counts = self.counts.get(key)
+        if counts is None:
+            counts = self.counts[key] = [0] * (len(self.bucketBoundsNs) + 1)
+            self.totals[key] = [0, 0, 0]
+        counts[bisect_left(self.bucketBoundsNs, elapsedNs)] += 1
+        totals = self.totals[key]
+        totals[0] += 1
+        totals[1] += elapsedNs
+        if elapsedNs > totals[2]:
+            totals[2] = elapsedNs
+
+    def clear(self):
+        """ """
+
+        self.counts.clear()
+        self.totals.clear()
+
+    def summary(self):
+        """ Returns {key: {'count', 'meanUs', 'maxUs', 'buckets': {'<=50us': n, ..., '>100000us': n}}}, slowest (max) first. """
+
+        labels = [f'<={bound // 1000}us' for bound in self.bucketBoundsNs] + [f'>{self.bucketBoundsNs[-1] // 1000}us']
+        summary = {}
+        for key, (count, totalNs, maxNs) in sorted(self.totals.items(), key = lambda item: -item[1][2]):
+            summary[key] = {'count': count, 'meanUs': totalNs / count / 1000, 'maxUs': maxNs / 1000,
+                            'buckets': {label: n for label, n in zip(labels, self.counts[key]) if n}}
+        return summary
+
+    def report(self):
+        """ Returns the summary as printable text, one key per line. """
+
+        lines = [f'{"key":<14} {"count":>7} {"mean us":>9} {"max us":>9}  buckets']
+        for key, stats in self.summary().items():
+            buckets = ' '.join(f'{label}:{n}' for label, n in stats['buckets'].items())
+            lines.append(f'{key:<14} {stats["count"]:>7} {stats["meanUs"]:>9.1f} {stats["maxUs"]:>9.1f}  {buckets}')
+        return '\n'.join(lines)
+
+
+class KeyDispatcher():
+    """ Dispatches key presses (by keysym) to a calculator's functions through a precompiled table. """
+
+    def __init__(self):
+        """ """
+
+        self.dispatchTable = {}
+        self.latencies = LatencyHistogram()
+
+    def rebuild(self, calculator):
+        """ Recompiles the dispatch table for calculator + its current mode (call when either changes). """
+
+        keyFunctionMap = {**KEY_FUNCTION_MAP, **MODE_KEY_FUNCTION_MAPS[calculator.currentMode.value]}
+        self.dispatchTable = compileKeyMap(calculator, keyFunctionMap)
+
+    def dispatch(self, keysym):
+        """ Calls keysym's function, if mapped; returns whether it was. """
+
+        function = self.dispatchTable.get(keysym)
+        if function is None:
+            return False
+        start = time.perf_counter_ns()
+        try:
+            function()
+        finally:
+            self.latencies.record(keysym, time.perf_counter_ns() - start)
+        return True
+
+    def dumpLatencies(self, file = None):
+        """ Prints the latency histogram (default: to stderr). """
+
+        print(self.latencies.report(), file = file or sys.stderr, flush = True)
@@ -0,0 +1,225 @@
+"""
+server.py: local asyncio evaluation server (no GUI)
+- line-delimited JSON over localhost TCP or a Unix socket
+- requests may be pipelined; responses are written back per connection in request order
+- evaluation + formatting runs on an executor (processes by default), so the event loop never blocks
+- back-pressure: bounded in-flight requests per connection and overall; reading pauses while full
+- a crashed worker process breaks its process pool: the pool is replaced + the affected requests retried once
+
+request:  {"id": 1, "expression": "2(3)+4", "format": "raw" | "display" | "sci"}
+response: {"id": 1, "result": 10, "error": null}
+
+usage: python src/server.py [--host 127.0.0.1] [--port 8765] [--unix path] [--workers N] [--executor process|thread]
+"""
+
+import argparse
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import json
+import os
+import sys
+
+from engine import ExpressionError, evaluateExpression, insertImplicitMultiplication, normalizeExpression
+from formatting import convertToSciNotation, getResultDisplayStr
+
+
+RESULT_FORMATS = ('raw', 'display', 'sci')
+MAX_LINE_BYTES = 1024 * 1024
+LARGE_INT_BITS = 53 # raw ints beyond a JSON double's exact range are sent as strings
+
+
+def formatResult(result, resultFormat):
+    """ Converts an evaluated result to the requested response representation. """
+
+    if resultFormat == 'display':
+        return getResultDisplayStr(result)
+    if resultFormat == 'sci':
+        return convertToSciNotation(result)
+    if isinstance(result, int) and result.bit_length() > LARGE_INT_BITS:
+        return str(result)
+    return result
+
+
+def evaluateRequest(expression, resultFormat = 'raw'):
+    """ Evaluates + formats a single expression, returning (result, error); runs on the executor. """
+
+    try:
+        return formatResult(evaluateExpression(insertImplicitMultiplication(expression)), resultFormat), None
+    except (ExpressionError, ValueError) as error: # ValueError: e.g. int too large to convert to str
+        return None, str(error) or type(error).__name__
+
+
+def parseRequest(line):
+    """ Decodes + validates one request line, returning (id, expression, format); raises ValueError if invalid. """
+
+    request = json.loads(line)
+    if not isinstance(request, dict) or not isinstance(request.get('expression'), str):
+        raise ValueError("request must be an object with an 'expression' string")
+    resultFormat = request.get('format', 'raw')
+    if resultFormat not in RESULT_FORMATS:
+        raise ValueError(f"'format' must be one of {', '.join(RESULT_FORMATS)}")
+    return request.get('id'), request['expression'], resultFormat
+
+
+class EvaluationServer():
+    """ Serves evaluation requests; one reader + one writer task per connection. """
+
+    def __init__(self, executorFactory, maxPendingPerConnection = 64, maxInFlight = 256, maxCachedResponses = 4096):
+        """ executorFactory: returns a new executor (again whenever a process pool breaks). """
+
+        self.executorFactory = executorFactory
+        self.executor = executorFactory()
+        self.maxPendingPerConnection = maxPendingPerConnection
+        self.inFlight = asyncio.Semaphore(maxInFlight) # across all connections
+
+        # LRU of (normalized expression, format) -> (result, error): repeats are answered on the loop, w/o an executor round-trip
+        self.responseCache = OrderedDict()
+        self.maxCachedResponses = maxCachedResponses
+
+        # counters
+        self.requests = 0
+        self.inlineHits = 0
+        self.executorRestarts = 0
+
+    async def handleConnection(self, reader, writer):
+        """ Pipelines a connection's requests: reading stalls once maxPendingPerConnection responses are outstanding. """
+
+        pending = asyncio.Queue(maxsize = self.maxPendingPerConnection)
+        writerTask = asyncio.create_task(self.writeResponses(pending, writer))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError): # request line over MAX_LINE_BYTES
+                    await pending.put(self.immediate(None, None, 'request line too long'))
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    await pending.put(await self.dispatch(line)) # blocks while the queue is full (back-pressure)
+        except ConnectionError:
+            pass
+        finally:
+            await pending.put(None) # writer sentinel
+            await writerTask
+
+    async def dispatch(self, line):
+        """ Starts evaluating one request line, returning a future for its (id, result, error). """
+
+        self.requests += 1
+        try:
+            requestId, expression, resultFormat = parseRequest(line)
+        except ValueError as error: # includes json.JSONDecodeError
+            return self.immediate(None, None, f'invalid request: {error}')
+
+        key = (normalizeExpression(expression), resultFormat)
+        cached = self.responseCache.get(key)
+        if cached is not None:
+            self.responseCache.move_to_end(key)
+            self.inlineHits += 1
+            return self.immediate(requestId, *cached)
+
+        await self.inFlight.acquire()
+        return asyncio.ensure_future(self.collect(requestId, key, expression, resultFormat))
+
+    async def collect(self, requestId, key, expression, resultFormat):
+        """ Runs an executor evaluation (retried once if its process pool broke), remembering its response for repeat requests. """
+
+        try:
+            try:
+                result, error = await self.evaluate(expression, resultFormat)
+            except BrokenProcessPool: # a worker died (e.g. out of memory), failing everything in flight: retry on the new pool
+                result, error = await self.evaluate(expression, resultFormat)
+        except Exception as error: # e.g. this request crashes its worker process every time
+            return requestId, None, f'evaluation failed: {error!r}'
+        finally:
+            self.inFlight.release()
+
+        self.responseCache[key] = (result, error)
+        if len(self.responseCache) > self.maxCachedResponses:
+            self.responseCache.popitem(last = False)
+        return requestId, result, error
+
+    async def evaluate(self, expression, resultFormat):
+        """ Evaluates one request on the executor; if its process pool broke, replaces the pool before re-raising. """
+
+        executor = self.executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, evaluateRequest, expression, resultFormat)
+        except BrokenProcessPool:
+            if executor is self.executor: # first request to notice: replace it (others in flight just retry)
+                executor.shutdown(wait = False, cancel_futures = True)
+                self.executor = self.executorFactory()
+                self.executorRestarts += 1
+            raise
+
+    def immediate(self, requestId, result, error):
+        """ Returns an already-completed future for a response computed on the loop. """
+
+        future = asyncio.get_running_loop().create_future()
+        future.set_result((requestId, result, error))
+        return future
+
+    async def writeResponses(self, pending, writer):
+        """ Writes responses in request order, draining the transport so slow readers push back. """
+
+        try:
+            while (future := await pending.get()) is not None:
+                requestId, result, error = await future
+                writer.write(json.dumps({'id': requestId, 'result': result, 'error': error}).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            # client went away: keep consuming so the reader never blocks on a full queue
+            while (future := await pending.get()) is not None:
+                pass
+        finally:
+            writer.close()
+
+
+def parseArgs(argv):
+    """ """
+
+    parser = argparse.ArgumentParser(prog = 'server.py', description = 'Serve calculator evaluation over line-delimited JSON.')
+    parser.add_argument('--host', default = '127.0.0.1', help = 'TCP host (default: 127.0.0.1)')
+    parser.add_argument('--port', type = int, default = 8765, help = 'TCP port (default: 8765)')
+    parser.add_argument('--unix', help = 'serve on this Unix socket path instead of TCP')
+    parser.add_argument('--workers', type = int, default = 0, help = 'executor workers (default: 0 = one per CPU)')
+    parser.add_argument('--executor', choices = ('process', 'thread'), default = 'process', help = 'executor type (default: process)')
+    parser.add_argument('--max-pending', type = int, default = 64, help = 'outstanding requests per connection before reading pauses')
+    return parser.parse_args(argv)
+
+
+async def serve(args):
+    """ """
+
+    workers = args.workers or os.cpu_count() or 1
+    executorClass = ProcessPoolExecutor if args.executor == 'process' else ThreadPoolExecutor
+    evaluationServer = EvaluationServer(lambda: executorClass(max_workers = workers), maxPendingPerConnection = args.max_pending)
+    try:
+        if args.unix:
+            server = await asyncio.start_unix_server(evaluationServer.handleConnection, path = args.unix, limit = MAX_LINE_BYTES)
+        else:
+            server = await asyncio.start_server(evaluationServer.handleConnection, args.host, args.port, limit = MAX_LINE_BYTES)
+
+        address = args.unix or f'{args.host}:{args.port}'
+        print(f'serving on {address} ({workers} {args.executor} workers)', file = sys.stderr)
+        async with server:
+            await server.serve_forever()
+    finally:
+        evaluationServer.executor.shutdown()
+
+
+def main(argv = None):
+    """ Command-line entry point. """
+
+    try:
+        asyncio.run(serve(parseArgs(sys.argv[1:] if argv is None else argv)))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+settings.py: persistent user settings store
+- settings live in memory; changes mark the store dirty instead of rewriting the file
+- writes are debounced (e.g. a dragged slider saves once it settles) + run when idle, and flushed on exit
+- files are written atomically: temp file in the same directory, then os.replace
+- loaded values are validated against SETTINGS_SCHEMA; missing/invalid ones fall back to defaults
+"""
+
+import atexit
+import json
+import os
+from pathlib import Path
+import tempfile
+
+from common import CalcMode, EVALUATION_BUDGET
+
+
+SETTINGS_FILE = 'settings.json'
+SAVE_DEBOUNCE_MS = 500 # wait for changes to settle before writing
+
+
+def getDefaultAppearance():
+    """ Follows the OS light/dark appearance, if detectable. """
+
+    import darkdetect # deferred: only needed (first run) to pick a default appearance
+    return 'dark' if darkdetect.isDark() else 'light'
+
+
+# key -> accepted type(s), optional choices / (min, max) range, and default (value or function returning one)
+SETTINGS_SCHEMA = {
+    'appearance': {'type': str, 'choices': ('dark', 'light', 'system'), 'default': getDefaultAppearance},
+    'defaultCalcMode': {'type': str, 'choices': tuple(mode.value for mode in CalcMode), 'default': CalcMode.CM_STANDARD.value},
+    'onTop': {'type': bool, 'default': False},
+    'opacity': {'type': (int, float), 'range': (0.0, 1.0), 'default': 0.9},
+    'evaluationTimeLimit': {'type': (int, float), 'range': (0.1, None), 'default': EVALUATION_BUDGET['timeLimit']},
+    'evaluationMaxPowerBits': {'type': int, 'range': (64, None), 'default': EVALUATION_BUDGET['maxPowerBits']}
+}
+
+
+def validateSetting(key, value):
+    """ Returns value if acceptable for key (per SETTINGS_SCHEMA), else raises ValueError. Unknown keys pass through. """
+
+    schema = SETTINGS_SCHEMA.get(key)
+    if schema is None:
+        return value
+
+    # bool is an int subclass: only accept it where bool is expected
+    if not isinstance(value, schema['type']) or (isinstance(value, bool) and schema['type'] is not bool):
+        raise ValueError(f'{key}: unexpected type {type(value).__name__}')
+    if 'choices' in schema and value not in schema['choices']:
+        raise ValueError(f'{key}: {value!r} not one of {schema["choices"]}')
+    if 'range' in schema:
+        low, high = schema['range']
+        if (low is not None and value < low) or (high is not None and value > high):
+            raise ValueError(f'{key}: {value!r} out of range')
+    return value
+
+
+def getDefaultSetting(key):
+    """ Returns key's schema default. """
+
+    default = SETTINGS_SCHEMA[key]['default']
+    return default() if callable(default) else default
+
+
+class SettingsStore():
+    """ In-memory user settings w/ debounced, atomic persistence; read like a dict (store['key'], store.get('key')). """
+
+    def __init__(self, path = SETTINGS_FILE, scheduler = None):
+        """ scheduler: a Tk widget (after/after_idle/after_cancel) used to debounce saves; w/o one, only flush() writes. """
+
+        self.path = Path(path)
+        self.scheduler = scheduler
+        self.values = {}
+        self.dirty = False
+        self.saveJob = None
+        self.writes = 0
+
+        self.load()
+        atexit.register(self.flush) # last chance, e.g. if the window is closed mid-debounce
+
+    def load(self):
+        """ Loads + validates saved settings; anything missing or invalid gets its default (and is saved back). """
+
+        savedValues = {}
+        if self.path.is_file():
+            try:
+                with open(self.path, 'r') as file:
+                    savedValues = json.load(file)
+            except (OSError, ValueError): # unreadable / corrupt: start over from defaults
+                savedValues = {}
+            if not isinstance(savedValues, dict):
+                savedValues = {}
+
+        self.values = {}
+        for key, value in savedValues.items():
+            try:
+                self.values[key] = validateSetting(key, value)
+            except ValueError:
+                pass
+        for key in SETTINGS_SCHEMA:
+            if key not in self.values:
+                self.values[key] = getDefaultSetting(key)
+                self.dirty = True
+        self.flush() # first run / repaired file: write it now
+
+    def __getitem__(self, key):
+        """ Returns a setting's current (in-memory) value. """
+        return self.values[key]
+
+    def get(self, key, default = None):
+        """ Returns a setting's current (in-memory) value, or default if unknown. """
+        return self.values.get(key, default)
+
+    def set(self, key, value):
+        """ Updates a setting in memory + schedules a (debounced) save; raises ValueError if value is invalid. """
+
+        value = validateSetting(key, value)
+        if key in self.values and self.values[key] == value:
+            return
+        self.values[key] = value
+        self.dirty = True
+        self.scheduleSave()
+
+    def scheduleSave(self):
+        """ (Re)starts the debounce timer: the save happens SAVE_DEBOUNCE_MS after the last change, once idle. """
+
+        if self.scheduler is None:
+            return
+        if self.saveJob is not None:
+            self.scheduler.after_cancel(self.saveJob)
+        self.saveJob = self.scheduler.after(SAVE_DEBOUNCE_MS, self.onSaveTimer)
+
+    def onSaveTimer(self):
+        """ Debounce timer expired: save once the event loop is idle. """
+
+        self.saveJob = self.scheduler.after_idle(self.flush)
+
+    def flush(self):
+        """ Writes settings to disk if changed since the last write (temp file + os.replace, so never half-written). """
+
+        if self.saveJob is not None and self.scheduler is not None:
+            try:
+                self.scheduler.after_cancel(self.saveJob)
+            except Exception: # Tk already destroyed (e.g. at exit)
+                pass
+        self.saveJob = None
+        if not self.dirty:
+            return
+
+        directory = self.path.resolve().parent
+        fileDescriptor, tempPath = tempfile.mkstemp(prefix = '.settings-', suffix = '.tmp', dir = directory)
+        try:
+            with os.fdopen(fileDescriptor, 'w') as file:
+                json.dump(self.values, file, indent = 4)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tempPath, self.path)
+        except BaseException:
+            try:
+                os.remove(tempPath)
+            except OSError:
+                pass
+            raise
+        self.dirty = False
+        self.writes += 1
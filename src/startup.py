@@ -0,0 +1,41 @@
+"""
+startup.py: startup timeline
+- w/ CALCAPP_STARTUP_TIMELINE=1 set, prints elapsed ms since launch for each startup milestone to stderr
+  (imports done, window mapped, calculator interactive, each deferred build step, first key handled, ...)
+- w/ CALCAPP_STARTUP_BENCHMARK=1 (implies the above), the app also sends itself a key once interactive + exits once it's handled
+  (see benchmarks/bench_startup.py)
+- disabled: mark() returns immediately
+"""
+
+import os
+import sys
+import time
+
+
+STARTUP_TIMELINE_ENV = 'CALCAPP_STARTUP_TIMELINE'
+STARTUP_BENCHMARK_ENV = 'CALCAPP_STARTUP_BENCHMARK'
+
+
+class StartupTimeline():
+    """ Records startup milestones relative to its creation (i.e., when app.py starts importing). """
+
+    def __init__(self):
+        """ """
+
+        self.benchmark = os.environ.get(STARTUP_BENCHMARK_ENV, '') not in ('', '0')
+        self.enabled = self.benchmark or os.environ.get(STARTUP_TIMELINE_ENV, '') not in ('', '0')
+        self.origin = time.perf_counter()
+        self.marks = []
+
+    def mark(self, label):
+        """ Records + prints a milestone (if enabled). """
+
+        if not self.enabled:
+            return
+        elapsedMs = (time.perf_counter() - self.origin) * 1000
+        self.marks.append((label, elapsedMs))
+        print(f'[startup] {elapsedMs:8.1f} ms  {label}', file = sys.stderr, flush = True)
+
+
+# shared timeline, started on first import
+startupTimeline = StartupTimeline()
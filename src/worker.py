@@ -0,0 +1,112 @@
+"""
+worker.py: background evaluation for the GUI
+- evaluates potentially slow operations in a separate process, so the Tk main loop keeps repainting + taking input
+- one persistent worker process, spawned on first use + reused across evaluations
+- results are polled (non-blocking) from the main thread, e.g. via after()
+- jobs are bounded by a time budget + a '**' result size budget; cancelling/timing out terminates the process
+  (pure-Python bignum arithmetic can't be interrupted otherwise), which is respawned on next use
+"""
+
+import time
+
+import engine
+from engine import ExpressionError, evaluateExpression
+from formatting import getResultDisplayStr, getResultText
+
+
+def evaluateJob(operation):
+    """ Evaluates + formats an operation, returning (resultStr, resultDisplayStr, error); huge ints never go through str(). """
+
+    try:
+        result = evaluateExpression(operation)
+        return getResultText(result), getResultDisplayStr(result), None
+    except ExpressionError as error:
+        return None, None, str(error)
+    except ValueError: # an operand too long to parse as an int
+        return None, None, 'number too long'
+
+
+def workerMain(connection, maxPowerBits):
+    """ Worker process loop: receives (jobId, operation), replies (jobId, resultStr, resultDisplayStr, error). """
+
+    engine.MAX_POWER_BITS = maxPowerBits
+    while True:
+        try:
+            jobId, operation = connection.recv()
+        except EOFError: # parent went away
+            return
+        connection.send((jobId, *evaluateJob(operation)))
+
+
+class EvaluationWorker():
+    """ Evaluation backend for CalculatorCore: submit() + cancel(), w/ poll() driven by the view's after() loop. """
+
+    def __init__(self, timeLimit = 10.0, maxPowerBits = engine.MAX_POWER_BITS):
+        """ timeLimit: seconds before a job is abandoned; maxPowerBits: largest exact-int '**' result allowed. """
+
+        self.timeLimit = timeLimit
+        self.maxPowerBits = maxPowerBits
+
+        self.process = None
+        self.connection = None
+        self.jobId = 0
+        self.activeJob = None # (jobId, operation, start time)
+
+    def start(self):
+        """ Spawns the worker process. """
+
+        import multiprocessing # deferred: only needed on the first background evaluation
+        context = multiprocessing.get_context('spawn') # never fork a process running Tk
+        self.connection, childConnection = context.Pipe()
+        self.process = context.Process(target = workerMain, args = (childConnection, self.maxPowerBits), daemon = True)
+        self.process.start()
+        childConnection.close()
+
+    def submit(self, operation):
+        """ Starts evaluating operation in the background (any previous job must be finished or cancelled). """
+
+        if self.process is None or not self.process.is_alive():
+            self.stop()
+            self.start()
+        self.jobId += 1
+        self.connection.send((self.jobId, operation))
+        self.activeJob = (self.jobId, operation, time.monotonic())
+
+    def poll(self):
+        """ Non-blocking check on the active job: returns (operation, resultStr, resultDisplayStr, error) once done, else None. """
+
+        if self.activeJob is None:
+            return None
+        jobId, operation, startTime = self.activeJob
+
+        try:
+            while self.connection.poll():
+                replyJobId, *reply = self.connection.recv()
+                if replyJobId == jobId:
+                    self.activeJob = None
+                    return (operation, *reply)
+        except (EOFError, OSError): # worker died, e.g. out of memory
+            self.cancel()
+            return operation, None, None, 'evaluation failed'
+
+        if time.monotonic() - startTime > self.timeLimit:
+            self.cancel()
+            return operation, None, None, 'timed out'
+        return None
+
+    def cancel(self):
+        """ Aborts the active job, if any, by terminating the worker process. """
+
+        if self.activeJob is not None:
+            self.activeJob = None
+            self.stop()
+
+    def stop(self):
+        """ Terminates the worker process (e.g. on app exit); the next submit() respawns it. """
+
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join()
+            self.connection.close()
+            self.process = None
+            self.connection = None
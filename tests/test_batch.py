@@ -0,0 +1,49 @@
+"""
+test_batch.py:
+- multi-process batch evaluation: a line that crashes its worker process only fails itself; every other line
+  (incl. those in the same chunk + in chunks in flight alongside it) is still evaluated, in input order
+- run from repo root: python -m pytest tests
+"""
+
+import multiprocessing
+import os
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+import batch
+
+
+CRASH_EXPRESSION = 'crash'
+
+
+def crashingEvaluateRecord(lineNumber, expression, display = False):
+    """ evaluateRecord, except CRASH_EXPRESSION kills the worker process (as e.g. running out of memory would). """
+
+    if expression == CRASH_EXPRESSION:
+        os._exit(1)
+    return evaluateRecord(lineNumber, expression, display)
+
+
+evaluateRecord = batch.evaluateRecord
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork', reason = 'patched evaluation only reaches forked workers')
+@pytest.mark.parametrize('crashLines', [{1}, {6}, {17}, {3, 4, 14, 19}])
+def testCrashedWorkerOnlyFailsItsLine(monkeypatch, crashLines):
+    """ Crashes in the first, a middle, a later, + several chunks at once: only those lines get error records. """
+
+    monkeypatch.setattr(batch, 'evaluateRecord', crashingEvaluateRecord)
+    expressions = [(lineNumber, CRASH_EXPRESSION if lineNumber in crashLines else f'{lineNumber}+1') for lineNumber in range(1, 21)]
+
+    records = list(batch.evaluateExpressionsParallel(expressions, workers = 2, chunkSize = 4))
+
+    assert [record['line'] for record in records] == list(range(1, 21))
+    for record in records:
+        if record['line'] in crashLines:
+            assert record['result'] is None and record['error'].startswith('worker failed')
+        else:
+            assert record['result'] == record['line'] + 1 and record['error'] is None
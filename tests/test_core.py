@@ -0,0 +1,289 @@
+"""
+test_core.py:
+- CalculatorCore w/ an evaluation backend: dropping a pending evaluation (cancel, or new input superseding it)
+  leaves input as it was before '='
+- only powers too large to evaluate per keypress go to the backend
+- huge int results (past the int -> str digit limit) are shown, not ERROR, incl. from the background worker
+- live preview always equals evaluating what '=' would (w/ open groups closed) over scripted + random key sequences
+- pasting (ingest): whole operation strings, a leading operator continuing from / replacing existing input,
+  + malformed text (operator runs, an unmatched ')') rejected w/o changing state
+- run from repo root: python -m pytest tests
+"""
+
+from pathlib import Path
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core import CalculatorCore
+from engine import ExpressionError, evaluateExpression, insertImplicitMultiplication
+from formatting import getResultDisplayStr
+from worker import evaluateJob
+
+
+class RecordingBackend():
+    """ Evaluation backend stand-in: records submitted operations, never completes them. """
+
+    def __init__(self):
+        """ """
+
+        self.submitted = []
+        self.cancels = 0
+
+    def submit(self, operation):
+        """ """
+        self.submitted.append(operation)
+
+    def cancel(self):
+        """ """
+        self.cancels += 1
+
+
+def getCore():
+    """ Returns a core w/ a RecordingBackend, + the backend. """
+
+    core = CalculatorCore()
+    core.evaluationBackend = RecordingBackend()
+    return core, core.evaluationBackend
+
+
+def enterPower(core, base, exponent):
+    """ Types base ^ exponent. """
+
+    core.numberPressed(base)
+    core.exponentiate()
+    core.numberPressed(exponent)
+
+
+def testCancelThenEvaluate():
+    """ '2 ^ 99999 =', cancel, '=': the same operation is submitted again. """
+
+    core, backend = getCore()
+    enterPower(core, '2', '99999')
+    core.mathPressed('=')
+    core.cancelEvaluation()
+
+    assert backend.cancels == 1
+    assert core.cumulativeOperationList == []
+    assert core.getDisplayState() == ('2^99999', '', '')
+
+    core.mathPressed('=')
+    assert backend.submitted == ['2**99999', '2**99999']
+
+
+def testSupersedeThenEvaluate():
+    """ '1 + 2 ^ 99999 =', then typing '5' (dropping the evaluation) + '=': the edited operand is submitted. """
+
+    core, backend = getCore()
+    core.numberPressed('1')
+    core.mathPressed('+')
+    enterPower(core, '2', '99999')
+    core.mathPressed('=')
+    core.numberPressed('5')
+
+    assert backend.cancels == 1
+    assert core.cumulativeOperationList == ['1', '+']
+    assert core.inputDisplay == '2^999995'
+
+    core.mathPressed('=')
+    assert backend.submitted == ['1+2**99999', '1+2**999995']
+
+
+def testSmallPowerEvaluatesInline():
+    """ '2 ^ 3 =' is evaluated right away, w/o the backend; only large powers are handed to it. """
+
+    core, backend = getCore()
+    enterPower(core, '2', '3')
+    core.mathPressed('=')
+
+    assert backend.submitted == []
+    assert core.inputDisplay == '8'
+
+
+def testHugeResult():
+    """ Int results past Python's int -> str digit limit are shown in sci notation, not ERROR. """
+
+    core = CalculatorCore()
+    core.ingest('3^10000=')
+    assert core.inputDisplay == '1.63e+4771'
+
+
+def testHugeBackgroundResult():
+    """ '9 ^ 999999 =' goes to the backend; the worker's result (w/o a full decimal conversion) is shown. """
+
+    core, backend = getCore()
+    enterPower(core, '9', '999999')
+    core.mathPressed('=')
+    assert backend.submitted == ['9**999999']
+
+    core.completeEvaluation('9**999999', *evaluateJob('9**999999'))
+    assert core.getDisplayState() == ('4e+954241', '9^999999', '')
+
+
+def pressKeys(core, keys):
+    """ Presses each key: digits/'.'/'('/')' as number input, operators + '=', 'C' (clearLast), 'AC' (clearAll), '^'. """
+
+    for key in keys:
+        if key in ('+', '-', '*', '/', '='):
+            core.mathPressed(key)
+        elif key == 'C':
+            core.clearLast()
+        elif key == 'AC':
+            core.clearAll()
+        elif key == '^':
+            core.exponentiate()
+        else:
+            core.numberPressed(key)
+        yield key
+
+
+def getExpectedPreview(core):
+    """ Preview display computed from scratch: what '=' would evaluate now (open groups closed), once an operator was entered. """
+
+    items = list(core.cumulativeOperationList)
+    if not core.skipAddingLastNumInputToOperation: # else number input is already the list's last entry
+        items.append(core.cumulativeNumInput.text)
+    if len(items) < 2:
+        return ''
+    text = ''.join(items)
+    text += ')' * (text.count('(') - text.count(')'))
+    try:
+        return '= ' + getResultDisplayStr(evaluateExpression(insertImplicitMultiplication(text)))
+    except (ExpressionError, ValueError):
+        return ''
+
+
+def assertPreviews(keys):
+    """ Presses keys on a new core, checking the preview against full evaluation after each one. """
+
+    core = CalculatorCore()
+    for pressed, key in enumerate(pressKeys(core, keys), start = 1):
+        if core.inputDisplay == 'ERROR': # failed '=': nothing to preview against
+            break
+        assert core.previewDisplay == getExpectedPreview(core), keys[:pressed]
+    return core
+
+
+def testPreviewScripted():
+    """ Appending, swapping an operator, clearing (C, '=', AC) + open groups: the preview tracks full evaluation throughout. """
+
+    core = assertPreviews(['1', '2', '+', '3', '*', '4', '-', '5'])
+    assert core.previewDisplay == '= 19'
+
+    assertPreviews(['1', '+', '2', '*', 'C', '-', '4']) # operator cleared, then another entered
+
+    core = assertPreviews(['8', '/', '2', '5', 'C', '4']) # clearLast on number input
+    assert core.previewDisplay == '= 0.33333333'
+
+    core = assertPreviews(['2', '+', '3', '=', '*', '4']) # continuing from a result
+    assert core.previewDisplay == '= 20'
+
+    core = assertPreviews(['2', '*', '(', '3', '+', '4']) # '(3' committed, '4' pending: group closed implicitly
+    assert core.previewDisplay == '= 14'
+
+    core = assertPreviews(['2', '+', '3', '=', '*', '4', 'AC', '5', '-', '1'])
+    assert core.previewDisplay == '= 4'
+
+    core = assertPreviews(['3', '-', '2', '^', '3'])
+    assert core.previewDisplay == '= -5'
+
+
+def testPreviewAfterClearingOperator():
+    """ Once an operator is cleared, number input is the operation's last entry: previewed once, not twice (e.g. '(42.5(42.5'). """
+
+    core = assertPreviews(['(', '4', '2', '.', '5', '-', 'C'])
+    assert core.previewDisplay == ''
+    core = assertPreviews(['1', '+', '2', '*', 'C'])
+    assert core.previewDisplay == '= 3'
+
+
+def getRandomKeys(rng):
+    """ Random key sequence of operand/operator terms, w/ occasional groups, operator swaps + clears. """
+
+    keys = []
+    for _ in range(rng.randint(1, 6)):
+        if rng.random() < 0.2:
+            keys.append('(')
+        keys.extend(rng.choice('0123456789') for _ in range(rng.randint(1, 3)))
+        if rng.random() < 0.2:
+            keys.extend(('.', rng.choice('0123456789')))
+        if rng.random() < 0.15:
+            keys.append(')')
+        if rng.random() < 0.15:
+            keys.append('C')
+        keys.append(rng.choice('+-*/'))
+        if rng.random() < 0.15:
+            keys.append(rng.choice('+-*/')) # back-to-back operators
+        elif rng.random() < 0.15:
+            keys.append('C')
+    keys.extend(rng.choice('0123456789') for _ in range(rng.randint(0, 2)))
+    if rng.random() < 0.5:
+        keys.append('=')
+    return keys
+
+
+def testPreviewRandom():
+    """ Preview equals full evaluation after every key of 1000 seeded random sessions (continuing from a result, or after AC). """
+
+    rng = random.Random(3)
+    for _ in range(1000):
+        assertPreviews(getRandomKeys(rng) + rng.choice(([], ['AC'])) + getRandomKeys(rng))
+
+
+@pytest.mark.parametrize('text, display', [
+    ('12*(2+3)-4=', ('56', '12*(2+3)-4', '')),
+    ('1,234+1=', ('1235', '1234+1', '')),
+    ('3 × 4 =', ('12', '3*4', '')),
+    ('10 ÷ 4 =', ('2.5', '10/4', '')),
+    ('2*-3=', ('-6', '2*-3', '')),
+    ('2^-1=', ('0.5', '2^-1', '')),
+    ('7-2', ('2', '7 -', '= 5')),
+    ('(1+2', ('(1+2', '', '')),
+])
+def testIngest(text, display):
+    """ """
+
+    core = CalculatorCore()
+    assert core.ingest(text)
+    assert core.getDisplayState() == display
+
+
+@pytest.mark.parametrize('before, text, display', [
+    ('2+3=', '*2=', ('10', '5*2', '')), # onto a result
+    ('5+', '*3=', ('15', '5*3', '')), # replaces the pending operator
+    ('5+', '-3', ('3', '5 -', '= 2')),
+    ('5', '0+1', ('1', '50 +', '= 51')), # appends to number input
+])
+def testIngestContinuing(before, text, display):
+    """ """
+
+    core = CalculatorCore()
+    assert core.ingest(before)
+    assert core.ingest(text)
+    assert core.getDisplayState() == display
+
+
+@pytest.mark.parametrize('before, text', [
+    ('', '2++3'),
+    ('', '2+*3='),
+    ('', '2*--3'),
+    ('', '2*^3'),
+    ('', '+5'),
+    ('', '*3='),
+    ('', '2+3)='),
+    ('', ')'),
+    ('', '2+a'),
+    ('5+', '**3'),
+    ('5+', '3)'),
+])
+def testIngestRejected(before, text):
+    """ Malformed text is rejected up front: ingest returns False + state (incl. the preview) is unchanged. """
+
+    core = CalculatorCore()
+    core.ingest(before)
+    state = (core.getDisplayState(), list(core.cumulativeOperationList), core.cumulativeNumInput.text)
+    assert not core.ingest(text)
+    assert (core.getDisplayState(), list(core.cumulativeOperationList), core.cumulativeNumInput.text) == state
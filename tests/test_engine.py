@@ -0,0 +1,308 @@
+"""
+test_engine.py:
+- expression engine: precedence + associativity, unary signs, '%', log/ln/π/e, ExpressionError paths
+- parity w/ simpleeval.simple_eval (the evaluator the engine replaced) on seeded random operation chains
+- insertImplicitMultiplication rewrites, incl. nested groups
+- IncrementalEvaluator: previews match full evaluation as items are appended, swapped (sync after invalidate) + removed
+- ExpressionCache: normalized keys, LRU eviction, size limits, configure(), hit/miss/eviction counters
+- run from repo root: python -m pytest tests
+"""
+
+from pathlib import Path
+import math
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from engine import (MAX_POWER_BITS, NO_RESULT, ExpressionCache, ExpressionError, IncrementalEvaluator, evaluateExpression,
+                    insertImplicitMultiplication)
+
+
+def evaluate(text):
+    """ Evaluates text w/ a fresh cache, so results can't come from an earlier test. """
+
+    return evaluateExpression(text, ExpressionCache())
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('1+2*3', 7),
+    ('(1+2)*3', 9),
+    ('10-4-3', 3),
+    ('2*3/4', 1.5),
+    ('-2**2', -4),
+    ('(-2)**2', 4),
+    ('2**3**2', 512),
+    ('2^3^2', 512),
+    ('2**-1', 0.5),
+    ('-3+5', 2),
+    ('+4', 4),
+    ('--2', 2),
+    ('2*-3', -6),
+    ('7%3', 1),
+    ('-7%3', 2),
+    ('7.5%2', 1.5),
+    ('1+7%3*2', 3),
+    ('log(100)', 2.0),
+    ('ln(e)', 1.0),
+    ('π', math.pi),
+    ('pi', math.pi),
+    ('e', math.e),
+    ('2π', 2 * math.pi),
+    ('1.5e3+1', 1501.0),
+])
+def testEvaluate(text, expected):
+    """ """
+    assert evaluate(text) == expected
+
+
+@pytest.mark.parametrize('text, message', [
+    ('1/0', 'division by zero'),
+    ('5%0', 'modulo by zero'),
+    ('9**9**9', f'exceed {MAX_POWER_BITS} bits'),
+    ('1e999', 'out of range'),
+    ('1e308*10', 'out of range'),
+    ('(-8)**(1/3)', 'no real result'),
+    ('log(0)', 'domain'),
+    ('', 'empty'),
+    ('(1+2', 'closing parenthesis'),
+    ('2+', 'end of expression'),
+    ('2 3', 'unexpected'),
+    ('2$3', 'unexpected character'),
+])
+def testExpressionErrors(text, message):
+    """ """
+    with pytest.raises(ExpressionError, match = message):
+        evaluate(text)
+
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('2(3)', '2*(3)'),
+    ('(1)(2)', '(1)*(2)'),
+    ('(1)2', '(1)*2'),
+    ('2π', '2*π'),
+    ('2e', '2*e'),
+    ('πe', 'π*e'),
+    ('(1+2)π', '(1+2)*π'),
+    ('e(2)', 'e*(2)'),
+    ('π(1)(2)', 'π*(1)*(2)'),
+    ('2log(100)', '2*log(100)'),
+    ('2ln(e)', '2*ln(e)'),
+    ('(2)log(10)', '(2)*log(10)'),
+    ('2.5e3(2)', '2.5e3*(2)'),
+    ('2(3(4))', '2*(3*(4))'),
+    ('2(3+4(5))', '2*(3+4*(5))'),
+    ('((1)(2))(3)', '((1)*(2))*(3)'),
+    ('2+(3)', '2+(3)'), # explicit operators are left alone
+    ('log(100)', 'log(100)'),
+    ('2 3', '2 3'), # two bare numbers stay apart (+ an error when evaluated)
+])
+def testInsertImplicitMultiplication(text, expected):
+    """ """
+
+    assert insertImplicitMultiplication(text) == expected
+    if expected != '2 3':
+        assert evaluate(expected) == evaluate(text) # the parser applies the same adjacency rules
+
+def randomOperand(rng, depth):
+    """ A random int/float literal, optionally negated or a parenthesized sub-chain. """
+
+    if depth < 2 and rng.random() < 0.2:
+        return f'({randomChain(rng, depth + 1)})'
+    operand = str(rng.randint(0, 99)) if rng.random() < 0.7 else f'{rng.uniform(0, 99):.3f}'
+    return f'-{operand}' if rng.random() < 0.15 else operand
+
+
+def randomChain(rng, depth = 0):
+    """ A random operation chain of up to 8 terms. """
+
+    parts = [randomOperand(rng, depth)]
+    for _ in range(rng.randint(1, 7)):
+        parts.append(rng.choice(('+', '-', '*', '/', '%', '+', '*')))
+        parts.append(randomOperand(rng, depth))
+    if rng.random() < 0.2:
+        parts.extend(('**', str(rng.randint(0, 3))))
+    return ''.join(parts)
+
+
+def testParityWithSimpleEval():
+    """ Same result (or, for e.g. division by zero, an error from both) as simple_eval on 2000 seeded chains. """
+
+    simpleeval = pytest.importorskip('simpleeval')
+    rng = random.Random(1234)
+
+    for _ in range(2000):
+        text = randomChain(rng)
+        try:
+            expected = simpleeval.simple_eval(text)
+        except ArithmeticError:
+            with pytest.raises(ExpressionError):
+                evaluate(text)
+            continue
+        except simpleeval.NumberTooHigh: # simple_eval's own power limit (base > 4e6); the engine limits by result size
+            continue
+        if isinstance(expected, complex) or (isinstance(expected, float) and not math.isfinite(expected)):
+            continue # both reject, differently
+        assert evaluate(text) == expected, text
+
+
+def testCacheSharesNormalizedEntries():
+    """ Spellings that normalize alike ('2 ^ 3', '2**3', '2^3') are one entry: a miss, then hits. """
+
+    cache = ExpressionCache()
+    assert [cache.evaluate(text) for text in ('2 ^ 3', '2**3', '2^3')] == [8, 8, 8]
+    assert list(cache.entries) == ['2**3']
+    assert cache.stats() == {'entries': 1, 'maxEntries': 256, 'hits': 2, 'misses': 1, 'evictions': 0, 'hitRate': 2 / 3}
+
+
+def testCacheEvictsLeastRecentlyUsed():
+    """ Past maxEntries, the least recently used entry is dropped (a hit counts as a use). """
+
+    cache = ExpressionCache(maxEntries = 2)
+    cache.evaluate('1+1')
+    cache.evaluate('2+2')
+    cache.evaluate('1+1') # now most recently used
+    cache.evaluate('3+3')
+
+    assert list(cache.entries) == ['1+1', '3+3']
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 3, 1)
+
+
+def testCacheSizeLimits():
+    """ Text over maxTextLength isn't stored; int results over maxResultBits keep only their compiled form. """
+
+    cache = ExpressionCache(maxTextLength = 10, maxResultBits = 64)
+    longText = '+'.join(['1'] * 10)
+    assert cache.evaluate(longText) == 10
+    assert longText not in cache.entries
+
+    assert cache.evaluate('2**100') == 2 ** 100
+    assert cache.entries['2**100'][1] is NO_RESULT
+    assert cache.evaluate('2**100') == 2 ** 100 # recomputed from the cached closure
+    assert cache.evaluate('2**10') == 1024
+    assert cache.entries['2**10'][1] == 1024
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def testCacheConfigure():
+    """ configure() only changes the limits passed, evicting at once if over the new maxEntries; maxEntries = 0 disables storing. """
+
+    cache = ExpressionCache()
+    for text in ('1+1', '2+2', '3+3'):
+        cache.evaluate(text)
+
+    cache.configure(maxEntries = 1)
+    assert list(cache.entries) == ['3+3']
+    assert (cache.maxEntries, cache.maxTextLength, cache.maxResultBits, cache.evictions) == (1, 4096, 4096, 2)
+
+    cache.configure(maxEntries = 0)
+    cache.evaluate('4+4')
+    assert not cache.entries
+
+
+def testCacheClear():
+    """ clear() drops entries + resets the counters. """
+
+    cache = ExpressionCache(maxEntries = 1)
+    cache.evaluate('1+1')
+    cache.evaluate('1+1')
+    cache.evaluate('2+2')
+    cache.clear()
+    assert cache.stats() == {'entries': 0, 'maxEntries': 1, 'hits': 0, 'misses': 0, 'evictions': 0, 'hitRate': 0.0}
+
+
+def closeGroups(text):
+    """ Text w/ any open groups closed, as previews treat them. """
+    return text + ')' * (text.count('(') - text.count(')'))
+
+
+def splitChain(text):
+    """ Splits a chain into committed items at top-level operators, the way the calculator's operation list holds them ('**' stays in operands). """
+
+    items, start, depth = [], 0, 0
+    for index, char in enumerate(text):
+        depth += (char == '(') - (char == ')')
+        if depth == 0 and char in '+-*/%' and index > start and text[index - 1] not in '+-*/%(' and text[index + 1] != '*':
+            items.extend((text[start:index], char))
+            start = index + 1
+    items.append(text[start:])
+    return items
+
+
+def testIncrementalPreviewMatchesEvaluation():
+    """ Committing a chain pair by pair, the preview (committed + pending operand) always equals evaluating the joined text. """
+
+    rng = random.Random(99)
+    for _ in range(300):
+        items = splitChain(randomChain(rng))
+        evaluator = IncrementalEvaluator()
+        for count in range(0, len(items), 2): # committed: operand, operator pairs
+            evaluator.sync(items[:count])
+            for pending in (items[count], '', '7', '(2+3', '-1.5'):
+                text = ''.join(items[:count]) + pending
+                try:
+                    expected = evaluate(closeGroups(text))
+                except ExpressionError:
+                    expected = None
+                assert evaluator.preview(pending) == expected, text
+
+
+def testIncrementalSync():
+    """ sync() folds appended items; a swapped item is only picked up after invalidate(); removed items rebuild. """
+
+    evaluator = IncrementalEvaluator()
+    evaluator.sync(['1', '+', '2', '*'])
+    assert evaluator.preview('3') == 7
+
+    items = ['1', '+', '2', '-'] # operator swapped in place: same length, so sync alone can't tell
+    evaluator.invalidate()
+    evaluator.sync(items)
+    assert evaluator.preview('3') == 0
+
+    evaluator.sync(['1', '+']) # items removed: rebuilt
+    assert evaluator.preview('5') == 6
+    evaluator.sync([]) # cleared (e.g. '=', AC)
+    assert evaluator.preview('') is None
+    assert evaluator.preview('4') == 4
+
+
+def testIncrementalImplicitClosing():
+    """ Open groups are implicitly closed, across committed items too; an incomplete pending operand previews nothing. """
+
+    evaluator = IncrementalEvaluator()
+    evaluator.sync(['(2', '+'])
+    assert evaluator.preview('3') == 5
+    assert evaluator.preview('3)*4') == 20
+    assert evaluator.preview('(1+1') == 4
+    assert evaluator.preview('2(3') == 8 # implicit multiplication into an open group
+    assert evaluator.preview('') is None
+    assert evaluator.preview(')') is None
+
+
+def testIncrementalOutOfRange():
+    """ Results past float range preview nothing (evaluating them is an error), incl. huge sci notation operands. """
+
+    evaluator = IncrementalEvaluator()
+    evaluator.sync(['1e308', '*'])
+    assert evaluator.preview('10') is None
+    assert evaluator.preview('0.5') == 5e307
+    evaluator.sync([])
+    assert evaluator.preview('4.99e+30102') is None
+    with pytest.raises(ExpressionError):
+        evaluate('1e308*10')
+
+
+def testIncrementalPreviewPowerLimit():
+    """ A preview power limit makes oversized powers preview nothing (committed ones mark the evaluator failed). """
+
+    evaluator = IncrementalEvaluator(maxPowerBits = 64)
+    assert evaluator.preview('2**63') == 2 ** 63
+    assert evaluator.preview('2**65') is None
+    evaluator.sync(['2**65', '+'])
+    assert evaluator.failed and evaluator.preview('1') is None
+    evaluator.invalidate()
+    evaluator.sync(['2', '+'])
+    assert evaluator.preview('1') == 3
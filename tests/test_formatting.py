@@ -0,0 +1,139 @@
+"""
+test_formatting.py:
+- display formatting tables: ints, floats, tiny floats, huge ints (past float range + past str()'s digit limit), inf/nan,
+  w/ the character-count limits + fitted to a DisplayFit
+- incl. the behaviour changes of the exponent/digit-count formatter: float exponents -10..-13 in sci notation (not '0.'),
+  ints beyond float range formatted (not IndexError), convertToSciNotation(0) == '0e+0'
+- run from repo root: python -m pytest tests
+"""
+
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from displayfit import DISPLAY_GLYPHS, DisplayFit
+from formatting import convertToSciNotation, fitResultText, getResultDisplayStr, getResultText, roundToMaxDigits
+
+
+# 12 equally wide glyphs, + a proportional font where '1' + '.' are narrow
+MONOSPACE_FIT = DisplayFit({glyph: 10 for glyph in DISPLAY_GLYPHS}, 120)
+PROPORTIONAL_FIT = DisplayFit(dict({glyph: 10 for glyph in DISPLAY_GLYPHS}, **{'1': 5, '.': 4}), 90)
+
+
+def getTestId(value):
+    """ Test ids for huge ints by size (their default id, str(), may exceed the int -> str digit limit). """
+
+    if type(value) is int and value.bit_length() > 64:
+        return f'{"-" if value < 0 else ""}int{value.bit_length()}bits'
+    return None
+
+
+@pytest.mark.parametrize('value, display, sciNotation', [
+    # ints: as is while within 9 characters (8 digits + '-'), else sci notation
+    (0, '0', '0e+0'),
+    (7, '7', '7e+0'),
+    (123456789, '123456789', '1.23457e+8'),
+    (1234567890, '1.23457e+9', '1.23457e+9'),
+    (-12345678, '-1.2346e+7', '-1.2346e+7'),
+    (-123456789, '-1.2346e+8', '-1.2346e+8'),
+    (10 ** 16, '1e+16', '1e+16'),
+    (2 ** 64, '1.8447e+19', '1.8447e+19'),
+    # ints beyond float range (+ past str()'s digit limit): from leading digits
+    (10 ** 400, '1e+400', '1e+400'),
+    (-(7 ** 900), '-3.87e+760', '-3.87e+760'),
+    (3 ** 10000, '1.63e+4771', '1.63e+4771'),
+    (10 ** 5000, '1e+5000', '1e+5000'),
+    (10 ** 5000 - 1, '1e+5000', '1e+5000'), # rounds up to the next power of ten
+    # floats: whole ones as ints; exponents 0 to -3 rounded to fit, others sci notation
+    (0.5, '0.5', '5e-1'),
+    (1.0, '1', '1e+0'),
+    (-2.0, '-2', '-2e+0'),
+    (1e16, '1e+16', '1e+16'),
+    (3.14159265358979, '3.14159265', '3.14159e+0'),
+    (-3.14159265358979, '-3.141593', '-3.1416e+0'),
+    (1 / 3, '0.33333333', '3.33333e-1'),
+    (-2 / 3, '-0.6666667', '-6.6667e-1'),
+    (123.456789012, '1.23457e+2', '1.23457e+2'),
+    (0.00123456789, '0.00123457', '1.23457e-3'),
+    (0.000123456789, '1.23457e-4', '1.23457e-4'),
+    (1.7976931348623157e308, '1.798e+308', '1.79769e+308'),
+    # tiny floats (exponents -10..-13 were once rounded to '0.')
+    (1.5e-7, '1.5e-07', '1.5e-7'),
+    (1e-10, '1e-10', '1e-10'),
+    (1.23456789e-11, '1.23457e-11', '1.23457e-11'),
+    (-1.23456789e-12, '-1.2346e-12', '-1.2346e-12'),
+    (1.2e-13, '1.2e-13', '1.2e-13'),
+    (1e-20, '1e-20', '1e-20'),
+    (5e-324, '5e-324', '5e-324'),
+    # non-finite: as is
+    (float('inf'), 'inf', 'inf'),
+    (float('-inf'), '-inf', '-inf'),
+    (float('nan'), 'nan', 'nan'),
+], ids = getTestId)
+def testDisplay(value, display, sciNotation):
+    """ """
+
+    assert getResultDisplayStr(value) == display
+    assert convertToSciNotation(value) == sciNotation
+
+
+@pytest.mark.parametrize('value, expected', [(0, '0e+0'), (0.0, '0e+0'), (-0.0, '-0e+0')])
+def testZeroSciNotation(value, expected):
+    """ (was '0e+5') """
+
+    assert convertToSciNotation(value) == expected
+
+
+@pytest.mark.parametrize('value, expected', [
+    (3.14159265358979, '3.14159265'),
+    (0.1 + 0.2, '0.3'),
+    (2 / 3, '0.66666667'),
+    (123456.789, '123456.789'),
+    (5, '5'),
+    (1.5, '1.5'),
+])
+def testRoundToMaxDigits(value, expected):
+    """ """
+
+    assert roundToMaxDigits(value) == expected
+
+
+@pytest.mark.parametrize('value, monospace, proportional', [
+    (123456789012, '123456789012', '1.23457e+11'),
+    (1234567890123, '1.234568e+12', '1.2346e+12'),
+    (111111111111111, '1.111111e+14', '111111111111111'), # narrow '1's: fits as is
+    (3.141592653589793, '3.1415926536', '3.14159265'),
+    (-2 / 3, '-0.666666667', '-0.666667'),
+    (0.000123456789, '1.2345679e-4', '1.23457e-4'),
+    (1.23456789e-11, '1.234568e-11', '1.23457e-11'),
+    (1e16, '1e+16', '1e+16'),
+    (10 ** 16, '1e+16', '1e+16'),
+    (3 ** 10000, '1.6314e+4771', '1.631e+4771'),
+    (-(7 ** 900), '-3.8747e+760', '-3.9e+760'),
+    (10 ** 5000, '1e+5000', '1e+5000'),
+    (0, '0', '0'),
+    (0.0, '0', '0'),
+], ids = getTestId)
+def testFittedDisplay(value, monospace, proportional):
+    """ """
+
+    assert getResultDisplayStr(value, MONOSPACE_FIT) == monospace
+    assert getResultDisplayStr(value, PROPORTIONAL_FIT) == proportional
+    assert MONOSPACE_FIT.fits(monospace) and PROPORTIONAL_FIT.fits(proportional)
+
+
+@pytest.mark.parametrize('value, text', [
+    (12345, '12345'),
+    (-2.5, '-2.5'),
+    (10 ** 400, str(10 ** 400)),
+    (3 ** 10000, '1.631350185342625874303256729181154716812e+4771'), # past str()'s digit limit: 40 significant digits
+    (-(10 ** 5000) + 1, '-1e+5000'),
+], ids = getTestId)
+def testResultText(value, text):
+    """ A result's text (as number input / from the background worker) refits to the same display as the value itself. """
+
+    assert getResultText(value) == text
+    assert fitResultText(text, MONOSPACE_FIT) == getResultDisplayStr(value, MONOSPACE_FIT)
@@ -0,0 +1,117 @@
+"""
+test_inputbuffer.py:
+- InputBuffer's incrementally kept state (value, int value, tokens, length) always matches reparsing its text,
+  over random append/pop/negate sequences + past MAX_SIGNIFICANT_DIGITS
+- run from repo root: python -m pytest tests
+"""
+
+from pathlib import Path
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from engine import ExpressionError, tokenize
+from inputbuffer import MAX_SIGNIFICANT_DIGITS, InputBuffer
+
+
+# exactly halfway between 1.0 and the next double up: rounds to even (1.0) unless any later digit is nonzero
+HALFWAY_ABOVE_ONE = '1.00000000000000011102230246251565404236316680908203125'
+
+
+def assertMatchesText(buffer):
+    """ Checks every incrementally kept value against the same value computed from buffer.text. """
+
+    text = buffer.text
+    assert len(buffer) == len(text) and bool(buffer) == bool(text)
+
+    try:
+        expected = float(text)
+    except ValueError:
+        with pytest.raises(ValueError):
+            buffer.value
+    else:
+        assert buffer.value == expected, text
+
+    if not buffer.isNumber():
+        assert buffer.getTokens() is None
+        return
+
+    intPart = text.lstrip('-').split('.')[0]
+    assert buffer.intValue == int(intPart or '0'), text
+    try:
+        expectedTokens = tokenize(text)[:-1]
+    except (ExpressionError, ValueError):
+        with pytest.raises(ValueError):
+            buffer.getTokens()
+    else:
+        tokens = buffer.getTokens()
+        assert tokens == expectedTokens and [type(value) for _, value in tokens] == [type(value) for _, value in expectedTokens], text
+
+
+def testRandomEdits():
+    """ 500 seeded sessions of appends (digits, '.', multi-character pieces, operators), pops + negations. """
+
+    rng = random.Random(2024)
+    pieces = list('0123456789') + ['0', '0', '.', '**', 'π', '12.5', '-7', '1e5']
+    for _ in range(500):
+        buffer = InputBuffer()
+        for _ in range(rng.randint(1, 60)):
+            action = rng.random()
+            if action < 0.7:
+                buffer.append(rng.choice(pieces if rng.random() < 0.2 else '0123456789.'))
+            elif action < 0.9:
+                buffer.pop()
+            else:
+                buffer.negate()
+            assertMatchesText(buffer)
+
+        duplicate = buffer.copy() # independent of the original from here on
+        buffer.append('5')
+        assertMatchesText(duplicate)
+        assertMatchesText(buffer)
+
+
+@pytest.mark.parametrize('text', [
+    '9' * (MAX_SIGNIFICANT_DIGITS + 50),
+    '0.' + '0' * 20 + '3' * (MAX_SIGNIFICANT_DIGITS + 10),
+    '1' + '0' * (MAX_SIGNIFICANT_DIGITS + 200) + '.5',
+    HALFWAY_ABOVE_ONE + '0' * MAX_SIGNIFICANT_DIGITS + '1', # rounds up only b/c of the last (dropped) digit
+])
+def testPastSignificantDigits(text):
+    """ Digits beyond MAX_SIGNIFICANT_DIGITS still round the value correctly, typed + then backspaced one by one. """
+
+    buffer = InputBuffer()
+    for char in text:
+        buffer.append(char)
+        assertMatchesText(buffer)
+    while buffer:
+        buffer.pop()
+        assertMatchesText(buffer)
+
+
+def testDroppedDigitRounding():
+    """ The halfway case: a nonzero digit past MAX_SIGNIFICANT_DIGITS rounds up; removing it rounds back to even. """
+
+    buffer = InputBuffer(HALFWAY_ABOVE_ONE + '0' * MAX_SIGNIFICANT_DIGITS + '1')
+    assert buffer.value > 1.0
+    buffer.pop()
+    assert buffer.value == 1.0
+    buffer.negate()
+    assert buffer.value == -1.0 and buffer.text.startswith('-1.000')
+
+
+def testIntDigitLimit():
+    """ Integer input past Python's int -> str digit limit can't become an engine token (nor can the engine parse it). """
+
+    limit = sys.get_int_max_str_digits()
+    if not limit:
+        pytest.skip('no int digit limit')
+    buffer = InputBuffer('7' * (limit + 1))
+    assert buffer.intDigits == limit + 1
+    with pytest.raises(ValueError):
+        buffer.getTokens()
+    buffer.pop()
+    assert buffer.getTokens() == [('number', int('7' * limit))]
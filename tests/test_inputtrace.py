@@ -0,0 +1,112 @@
+"""
+test_inputtrace.py:
+- round trip: a session recorded through TraceRecorder (incl. background evaluations that complete, are cancelled,
+  superseded, + time out) replays headless to the recorded final display
+- run from repo root: python -m pytest tests
+"""
+
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core import CORE_EVENTS, CalculatorCore
+from inputtrace import (DISPLAY_NAMES, SOURCE_BUTTON, SOURCE_WORKER, TRACE_RECORD_ENV, ReplayBackend, TraceRecorder, getReplayReport,
+                        readTrace, replayEvents)
+from worker import evaluateJob
+
+
+class RecordedCalculator():
+    """ Stand-in for the Tk Calculator: forwards core events through a recorder (+ a backend that never completes on its own). """
+
+    def __init__(self, recorder):
+        """ """
+
+        self.core = CalculatorCore()
+        self.core.evaluationBackend = ReplayBackend()
+        for eventName in CORE_EVENTS:
+            setattr(self, eventName, recorder.wrap(eventName, getattr(self.core, eventName)))
+        self.recorder = recorder
+        recorder.start(self.core, 'Standard')
+
+    def press(self, *keys):
+        """ Digits/'.' as number input, operators + '=', '^', 'Esc' (cancel), + 'AC' (clearAll). """
+
+        for key in keys:
+            if key in ('+', '-', '*', '/', '='):
+                self.mathPressed(key)
+            elif key == '^':
+                self.exponentiate()
+            elif key == 'Esc':
+                self.cancelEvaluation()
+            elif key == 'AC':
+                self.clearAll()
+            else:
+                self.numberPressed(key)
+
+    def finishEvaluation(self, error = None):
+        """ Completes the pending evaluation (w/ the worker's real result, or error), as pollEvaluation would. """
+
+        operation = self.core.pendingEvaluation
+        self.recorder.source = SOURCE_WORKER
+        try:
+            self.completeEvaluation(operation, *(evaluateJob(operation) if error is None else (None, None, error)))
+        finally:
+            self.recorder.source = SOURCE_BUTTON
+
+
+def recordSession(monkeypatch, path):
+    """ Records a session mixing inline + background evaluations; returns the final display strings. """
+
+    monkeypatch.setenv(TRACE_RECORD_ENV, str(path))
+    calculator = RecordedCalculator(TraceRecorder())
+
+    calculator.press('2', '^', '9', '9', '9', '9', '9', '=', 'Esc') # cancelled
+    calculator.press('=')
+    calculator.finishEvaluation() # completed
+    calculator.press('AC', '1', '+', '2', '^', '9', '9', '9', '9', '9', '=')
+    calculator.finishEvaluation()
+    calculator.press('AC', '3', '^', '9', '9', '9', '9', '9', '=', '7') # superseded: '7' edits the exponent
+    calculator.press('=')
+    calculator.finishEvaluation('timed out')
+
+    finalDisplay = calculator.core.getDisplayState()
+    calculator.recorder.finish()
+    return finalDisplay
+
+
+def testRecordReplayRoundTrip(monkeypatch, tmp_path):
+    """ Recorded session -> headless replay: same final display, no divergence; worker events are tagged as such. """
+
+    path = tmp_path / 'session.trace'
+    finalDisplay = recordSession(monkeypatch, path)
+    trace = readTrace(path)
+
+    assert trace.recordsEvaluations and trace.finalDisplay == dict(zip(DISPLAY_NAMES, finalDisplay))
+    assert finalDisplay == ('ERROR', '', '') # timed out
+    assert [(source, name) for _, source, name, _ in trace.events if name == 'completeEvaluation'] == [(SOURCE_WORKER, 'completeEvaluation')] * 3
+
+    core = CalculatorCore()
+    core.evaluationBackend = ReplayBackend()
+    report = getReplayReport(trace, replayEvents(core, trace.events), dict(zip(DISPLAY_NAMES, core.getDisplayState())))
+    assert report['checked'] and report['divergence'] == {}
+
+    # w/o the recorded outcomes, '=' would evaluate inline: the '7' + timeout would then apply to a result instead
+    core = CalculatorCore()
+    replayEvents(core, trace.events)
+    assert core.getDisplayState() != finalDisplay
+
+
+def testVersion1TraceNotChecked(monkeypatch, tmp_path):
+    """ Traces from before worker events were recorded replay, but their final display isn't compared. """
+
+    path = tmp_path / 'session.trace'
+    recordSession(monkeypatch, path)
+    lines = path.read_text(encoding = 'utf-8').splitlines(keepends = True)
+    lines[0] = lines[0].replace('#calcapp-trace 2', '#calcapp-trace 1')
+    path.write_text(''.join(line for line in lines if '\tcompleteEvaluation\t' not in line), encoding = 'utf-8')
+    trace = readTrace(path)
+
+    core = CalculatorCore()
+    report = getReplayReport(trace, replayEvents(core, trace.events), dict(zip(DISPLAY_NAMES, core.getDisplayState())))
+    assert not trace.recordsEvaluations and not report['checked'] and report['divergence'] == {}
@@ -0,0 +1,188 @@
+"""
+test_settings.py:
+- SettingsStore: schema validation on load + set, corrupt/invalid files repaired w/ defaults, unknown keys kept
+- saves are debounced (many changes -> one write, driven by a fake Tk scheduler) + atomic (a failed write leaves the file as it was)
+- run from repo root: python -m pytest tests
+"""
+
+import json
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+import settings
+from settings import SAVE_DEBOUNCE_MS, SETTINGS_SCHEMA, SettingsStore, getDefaultSetting
+
+
+class FakeScheduler():
+    """ Stand-in for the Tk widget's after/after_idle/after_cancel: jobs only run when the test advances time. """
+
+    def __init__(self):
+        """ """
+
+        self.now = 0
+        self.jobs = {} # id -> (due time, function)
+        self.nextId = 0
+
+    def after(self, ms, function):
+        """ """
+
+        self.nextId += 1
+        self.jobs[self.nextId] = (self.now + ms, function)
+        return self.nextId
+
+    def after_idle(self, function):
+        """ """
+        return self.after(0, function)
+
+    def after_cancel(self, jobId):
+        """ """
+        self.jobs.pop(jobId, None)
+
+    def advance(self, ms):
+        """ Moves time forward, running jobs as they come due (incl. ones they schedule). """
+
+        self.now += ms
+        while dueJobs := sorted((due, jobId) for jobId, (due, _) in self.jobs.items() if due <= self.now):
+            self.jobs.pop(dueJobs[0][1])[1]()
+
+
+@pytest.fixture(autouse = True)
+def fixedAppearanceDefault(monkeypatch):
+    """ Default appearance w/o asking the OS (darkdetect). """
+
+    monkeypatch.setitem(SETTINGS_SCHEMA['appearance'], 'default', 'dark')
+
+
+def getDefaults():
+    """ """
+    return {key: getDefaultSetting(key) for key in SETTINGS_SCHEMA}
+
+
+def readFile(path):
+    """ """
+    return json.loads(path.read_text())
+
+
+def testFirstRunWritesDefaults(tmp_path):
+    """ """
+
+    path = tmp_path / 'settings.json'
+    store = SettingsStore(path)
+    assert readFile(path) == getDefaults() == store.values
+    assert store.writes == 1
+
+
+@pytest.mark.parametrize('key, value', [
+    ('opacity', 'high'), # wrong type
+    ('opacity', 1.5), # out of range
+    ('onTop', 1), # int where bool is expected
+    ('evaluationMaxPowerBits', True), # bool where int is expected
+    ('defaultCalcMode', 'Quantum'), # not a choice
+    ('evaluationTimeLimit', 0.01), # below the minimum
+])
+def testInvalidValues(tmp_path, key, value):
+    """ An invalid saved value falls back to its default (+ the file is repaired); set() rejects it. """
+
+    path = tmp_path / 'settings.json'
+    path.write_text(json.dumps(dict(getDefaults(), **{key: value})))
+
+    store = SettingsStore(path)
+    assert store[key] == getDefaultSetting(key)
+    assert readFile(path)[key] == getDefaultSetting(key)
+    with pytest.raises(ValueError):
+        store.set(key, value)
+
+
+def testValidAndUnknownKeysKept(tmp_path):
+    """ Valid saved values + keys the schema doesn't know (e.g. from a newer version) are kept as is, w/o a rewrite. """
+
+    path = tmp_path / 'settings.json'
+    saved = dict(getDefaults(), opacity = 0.5, onTop = True, futureSetting = [1, 2])
+    path.write_text(json.dumps(saved))
+
+    store = SettingsStore(path)
+    assert store.values == saved and store['futureSetting'] == [1, 2]
+    assert store.writes == 0
+
+
+@pytest.mark.parametrize('content', ['{"opacity": 0.5,', '[1, 2, 3]', '', '\x00\xff'])
+def testCorruptFileReset(tmp_path, content):
+    """ Unparseable or non-object files fall back to defaults + are rewritten. """
+
+    path = tmp_path / 'settings.json'
+    path.write_text(content, encoding = 'latin-1')
+
+    store = SettingsStore(path)
+    assert store.values == getDefaults() == readFile(path)
+
+
+def testDebouncedSave(tmp_path):
+    """ A burst of changes (e.g. a dragged slider) is written once, SAVE_DEBOUNCE_MS after the last one, when idle. """
+
+    path = tmp_path / 'settings.json'
+    scheduler = FakeScheduler()
+    store = SettingsStore(path, scheduler)
+    writes = store.writes
+
+    for step in range(10):
+        store.set('opacity', 0.5 + step / 100)
+        scheduler.advance(SAVE_DEBOUNCE_MS // 2) # each change restarts the timer
+    assert store.writes == writes and readFile(path)['opacity'] == getDefaultSetting('opacity')
+    assert len(scheduler.jobs) == 1
+
+    scheduler.advance(SAVE_DEBOUNCE_MS)
+    assert store.writes == writes + 1 and readFile(path)['opacity'] == 0.59
+    assert not store.dirty and not scheduler.jobs
+
+    store.set('opacity', 0.59) # unchanged: nothing scheduled
+    assert not scheduler.jobs
+
+
+def testFlushCancelsPendingSave(tmp_path):
+    """ flush() (e.g. on exit) writes now + drops the pending debounced save; a second flush w/o changes doesn't write. """
+
+    path = tmp_path / 'settings.json'
+    scheduler = FakeScheduler()
+    store = SettingsStore(path, scheduler)
+    writes = store.writes
+
+    store.set('onTop', True)
+    store.flush()
+    store.flush()
+    assert store.writes == writes + 1 and readFile(path)['onTop'] is True
+    assert not scheduler.jobs
+
+
+def testFailedWriteLeavesFileIntact(tmp_path, monkeypatch):
+    """ A write that fails midway (or whose os.replace fails) leaves the previous file + no temp files behind. """
+
+    path = tmp_path / 'settings.json'
+    store = SettingsStore(path)
+    original = path.read_text()
+
+    def failingDump(values, file, **kwargs):
+        file.write('{"opacity": ')
+        raise OSError('disk full')
+
+    store.set('opacity', 0.5)
+    with monkeypatch.context() as patch, pytest.raises(OSError):
+        patch.setattr(settings.json, 'dump', failingDump)
+        store.flush()
+    assert path.read_text() == original and store.dirty
+    assert [child.name for child in tmp_path.iterdir()] == ['settings.json']
+
+    def failingReplace(source, destination):
+        raise OSError('read-only')
+
+    with monkeypatch.context() as patch, pytest.raises(OSError):
+        patch.setattr(settings.os, 'replace', failingReplace)
+        store.flush()
+    assert path.read_text() == original
+    assert [child.name for child in tmp_path.iterdir()] == ['settings.json']
+
+    store.flush() # works again once the disk does
+    assert readFile(path)['opacity'] == 0.5 and not store.dirty